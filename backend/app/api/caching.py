@@ -0,0 +1,97 @@
+import os
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.api.encoding import MSGPACK, wants_msgpack
+from app.api.export import NDJSON
+from app.api.profiling import ProfiledRoute, profiling_requested
+from app.core.cache import CATALOG, RESULTS, Entry, get_backend
+from app.core.metrics import CACHE_REQUESTS
+
+CACHE_MAX_AGE = int(os.environ.get("CACHE_MAX_AGE", 60))
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}"
+
+
+def cache_key(request: Request, scope, generation):
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = f"{scope}:{generation}:{request.url.path}?{query}"
+    # JSON and MessagePack bodies of one page are cached side by side.
+    return f"{key}#{MSGPACK}" if wants_msgpack(request) else key
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class CachedRoute(ProfiledRoute):
+    """Route that serves GET responses from the response cache.
+
+    Cached bodies are keyed on the path, the sorted query string and the
+    generation of the data set the route reads, `scope` (and the negotiated
+    format), so a hit never touches the database and a job that bumps the
+    generation invalidates all of that data set's routes at once. Responses carry an ETag and `Cache-Control`; a
+    matching `If-None-Match` gets a 304.
+    """
+
+    scope = CATALOG
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        scope = self.scope
+
+        async def cached_handler(request: Request) -> Response:
+            # NDJSON exports are streamed and never buffered into the cache.
+            if (
+                request.method != "GET"
+                or NDJSON in request.headers.get("accept", "")
+                or profiling_requested(request)
+            ):
+                return await handler(request)
+
+            backend = get_backend()
+
+            async def call(method, *args):
+                if backend.blocking:
+                    return await run_in_threadpool(method, *args)
+                return method(*args)
+
+            key = cache_key(request, scope, await call(backend.generation, scope))
+            entry = await call(backend.get, key)
+            status = "HIT"
+
+            if entry is None:
+                response = await handler(request)
+                body = getattr(response, "body", None)
+                if response.status_code != 200 or body is None:
+                    return response
+
+                entry = Entry.build(body, response.media_type)
+                await call(backend.set, key, entry)
+                status = "MISS"
+            CACHE_REQUESTS.labels(self.path, status).inc()
+
+            headers = {
+                "ETag": entry.etag,
+                "Cache-Control": CACHE_CONTROL,
+                "X-Cache": status,
+                "Vary": "Accept",
+            }
+            if etag_matches(request.headers.get("if-none-match"), entry.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(
+                content=entry.body, media_type=entry.media_type, headers=headers
+            )
+
+        return cached_handler
+
+
+class ResultsCachedRoute(CachedRoute):
+    """Cached route over screening and trend results, which syncs leave alone."""
+
+    scope = RESULTS
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.api.caching import ResultsCachedRoute
+from app.api.models import ConjunctionOut, ConjunctionScreeningOut, Page
+from app.api.pagination import MAX_LIMIT, paginate
+from app.core.db import get_read_db
+from app.core.schemas import Conjunction, ConjunctionScreening
+
+router = APIRouter(route_class=ResultsCachedRoute)
+
+
+@router.get("/conjunctions/screenings", response_model=List[ConjunctionScreeningOut])
+def get_screenings(db: Session = Depends(get_read_db)):
+    return db.scalars(
+        select(ConjunctionScreening).order_by(ConjunctionScreening.id.desc())
+    ).all()
+
+
+@router.get(
+    "/conjunctions",
+    response_model=Page[ConjunctionOut],
+    response_model_exclude_unset=True,
+)
+def get_conjunctions(
+    screening_id: Optional[int] = Query(None, description="defaults to the latest"),
+    norad_cat_id: Optional[List[int]] = Query(None),
+    max_distance: Optional[float] = Query(None, gt=0, description="km"),
+    tca_start: Optional[datetime] = None,
+    tca_end: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    if screening_id is None:
+        screening_id = db.scalar(select(func.max(ConjunctionScreening.id)))
+        if screening_id is None:
+            return {"items": [], "next_cursor": None}
+    elif db.get(ConjunctionScreening, screening_id) is None:
+        raise HTTPException(status_code=404, detail="Screening not found")
+
+    filters = [Conjunction.screening_id == screening_id]
+    if norad_cat_id:
+        filters.append(
+            or_(
+                Conjunction.primary_norad_cat_id.in_(norad_cat_id),
+                Conjunction.secondary_norad_cat_id.in_(norad_cat_id),
+            )
+        )
+    if max_distance is not None:
+        filters.append(Conjunction.miss_distance <= max_distance)
+    if tca_start:
+        filters.append(Conjunction.tca >= tca_start)
+    if tca_end:
+        filters.append(Conjunction.tca <= tca_end)
+
+    # Rows are written in TCA order, so id order is chronological.
+    return paginate(db, Conjunction, filters, fields, cursor, limit)
@@ -0,0 +1,54 @@
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api.encoding import default
+from app.api.pagination import parse_fields
+from app.core.db import ReadSessionLocal
+
+NDJSON = "application/x-ndjson"
+# Rows fetched per round trip; also the number of lines per written chunk.
+YIELD_PER = 1000
+
+
+def wants_stream(request: Request, stream=False):
+    """Whether the client asked for the NDJSON export (`?stream=1` or Accept)."""
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+def _lines(query):
+    # The stream outlives the request's session, so it owns its own. With
+    # yield_per, PostgreSQL uses a server-side cursor and only one partition
+    # of rows is in memory at a time.
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=YIELD_PER))
+        names = list(result.keys())
+        for rows in result.tuples().partitions():
+            yield b"".join(
+                orjson.dumps(
+                    dict(zip(names, row)),
+                    default=default,
+                    option=orjson.OPT_APPEND_NEWLINE,
+                )
+                for row in rows
+            )
+    finally:
+        db.close()
+
+
+def stream_rows(model, filters, fields=None, cursor=None):
+    """Every row of `model` matching `filters` as NDJSON, ordered by key.
+
+    `cursor` works as for `paginate`, so an interrupted export can resume
+    after the last key it received.
+    """
+    columns = parse_fields(model, fields)
+    key = model.__mapper__.primary_key[0]
+
+    query = select(*columns).where(*filters).order_by(key)
+    if cursor is not None:
+        query = query.where(key > cursor)
+
+    return StreamingResponse(_lines(query), media_type=NDJSON)
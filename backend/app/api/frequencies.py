@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.models import BandQueryOut
+from app.api.orbits import MAX_EPHEMERIS_STEPS, MAX_EVALUATIONS, _as_utc
+from app.api.profiling import ProfiledRoute
+from app.core.bands import DIRECTIONS, load_band_index
+from app.core.db import get_read_db
+from app.propagation.doppler import (
+    MAX_RANGE_RATE,
+    SPEED_OF_LIGHT,
+    range_rate_bounds,
+    shifted,
+)
+from app.propagation.passes import Observer
+from app.propagation.propagator import load_propagator, utcnow
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _band(frequency, low, high):
+    if frequency is not None:
+        if low is not None or high is not None:
+            raise HTTPException(
+                status_code=400, detail="Give either frequency or low/high"
+            )
+        return frequency, frequency
+
+    if low is None and high is None:
+        raise HTTPException(
+            status_code=400, detail="One of frequency, low or high is required"
+        )
+    low = low if low is not None else 0
+    high = high if high is not None else 2**62
+    if low > high:
+        raise HTTPException(status_code=400, detail="low must not exceed high")
+    return low, high
+
+
+def _tune(db, matches, low, high, observer, times, min_elevation):
+    """Fill in the Doppler-shifted windows and drop those that miss the band."""
+    norad_cat_ids = sorted({m["norad_cat_id"] for m in matches})
+    propagator = load_propagator(db).subset(norad_cat_ids)
+    if len(propagator) * len(times) > MAX_EVALUATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request exceeds {MAX_EVALUATIONS} satellite-time evaluations",
+        )
+
+    min_rate, max_rate = range_rate_bounds(propagator, observer, times, min_elevation)
+    bounds = {
+        norad_cat_id: (min_rate[i], max_rate[i])
+        for i, norad_cat_id in enumerate(propagator.norad_cat_ids.tolist())
+    }
+
+    tuned = []
+    for match in matches:
+        rates = bounds.get(match["norad_cat_id"])
+        if rates is None or np.isnan(rates[0]):
+            continue
+
+        tuned_low, tuned_high = shifted(
+            match["low"], match["high"], match["direction"], *rates
+        )
+        if tuned_low <= high and tuned_high >= low:
+            tuned.append({**match, "tuned_low": tuned_low, "tuned_high": tuned_high})
+    return tuned
+
+
+@router.get("/frequencies", response_model=BandQueryOut)
+def get_frequencies(
+    frequency: Optional[int] = Query(None, ge=0, description="Hz"),
+    low: Optional[int] = Query(None, ge=0, description="Hz"),
+    high: Optional[int] = Query(None, ge=0, description="Hz"),
+    direction: Optional[str] = Query(None, description="downlink or uplink"),
+    mode: Optional[str] = None,
+    service: Optional[str] = None,
+    status: Optional[str] = None,
+    alive: Optional[bool] = None,
+    norad_cat_id: Optional[List[int]] = Query(None),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    alt: float = Query(0.0, description="km above the WGS84 ellipsoid"),
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+    step: float = Query(60.0, gt=0, description="seconds"),
+    min_elevation: float = Query(0.0, ge=0, lt=90),
+    db: Session = Depends(get_read_db),
+):
+    """Transmitters whose uplink or downlink overlaps a band or contains a frequency.
+
+    With `lat`/`lon`, the transmitter ranges are Doppler-shifted by the range
+    rates seen from that observer between `start` and `stop` (default: the
+    next 90 minutes) while above `min_elevation`; only satellites whose
+    shifted range still overlaps the band are returned.
+    """
+    low, high = _band(frequency, low, high)
+    if direction is not None and direction not in DIRECTIONS:
+        raise HTTPException(
+            status_code=400, detail=f"direction must be one of {', '.join(DIRECTIONS)}"
+        )
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="Give both lat and lon")
+
+    index = load_band_index(db)
+    filters = {
+        "direction": direction,
+        "mode": mode,
+        "service": service,
+        "status": status,
+        "alive": alive,
+        "norad_cat_ids": norad_cat_id,
+    }
+
+    if lat is None:
+        matches = index.query(low, high, **filters)
+    else:
+        start = _as_utc(start) if start else utcnow()
+        stop = _as_utc(stop) if stop else start + timedelta(minutes=90)
+        if stop < start:
+            raise HTTPException(status_code=400, detail="stop must be after start")
+        steps = int((stop - start).total_seconds() // step) + 1
+        if steps > MAX_EPHEMERIS_STEPS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Doppler window exceeds {MAX_EPHEMERIS_STEPS} steps",
+            )
+        times = [start + timedelta(seconds=i * step) for i in range(steps)]
+
+        # Any shift is within MAX_RANGE_RATE, so widen the lookup by that much
+        # and let the exact windows decide.
+        margin = MAX_RANGE_RATE / SPEED_OF_LIGHT
+        matches = index.query(
+            int(low * (1 - margin)), int(np.ceil(high * (1 + margin))), **filters
+        )
+        matches = _tune(
+            db, matches, low, high, Observer(lat, lon, alt), times, min_elevation
+        )
+
+    return {"low": low, "high": high, "count": len(matches), "matches": matches}
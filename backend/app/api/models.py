@@ -0,0 +1,376 @@
+from datetime import date, datetime
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None
+
+
+class SatelliteOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    intldes: Optional[str] = None
+    norad_cat_id: Optional[int] = None
+    object_type: Optional[str] = None
+    satname: Optional[str] = None
+    country: Optional[str] = None
+    launch: Optional[date] = None
+    site: Optional[str] = None
+    decay: Optional[date] = None
+
+    period: Optional[float] = None
+    inclination: Optional[float] = None
+    apogee: Optional[int] = None
+    perigee: Optional[int] = None
+
+    comment: Optional[str] = None
+    commentcode: Optional[int] = None
+
+    rcsvalue: Optional[int] = None
+    rcs_size: Optional[str] = None
+
+    file: Optional[int] = None
+
+    launch_year: Optional[int] = None
+    launch_num: Optional[int] = None
+    launch_piece: Optional[str] = None
+
+    current: Optional[str] = None
+
+    object_name: Optional[str] = None
+    object_id: Optional[str] = None
+    object_number: Optional[int] = None
+
+
+class SearchHit(BaseModel):
+    norad_cat_id: Optional[int] = None
+    satname: Optional[str] = None
+    object_name: Optional[str] = None
+    object_id: Optional[str] = None
+    intldes: Optional[str] = None
+    country: Optional[str] = None
+    object_type: Optional[str] = None
+    # 3 exact match, 2 prefix match, below 1 trigram similarity.
+    score: float
+
+
+class SearchOut(BaseModel):
+    q: str
+    results: List[SearchHit]
+
+
+class TLEOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    fetched_at: Optional[datetime] = None
+    satellite_id: Optional[int] = None
+
+    comment: Optional[str] = None
+    originator: Optional[str] = None
+    norad_cat_id: Optional[int] = None
+    object_name: Optional[str] = None
+    object_type: Optional[str] = None
+    classification_type: Optional[str] = None
+    intldes: Optional[str] = None
+
+    epoch: Optional[datetime] = None
+    epoch_microseconds: Optional[int] = None
+
+    mean_motion: Optional[float] = None
+    eccentricity: Optional[float] = None
+    inclination: Optional[float] = None
+    ra_of_asc_node: Optional[float] = None
+    arg_of_pericenter: Optional[float] = None
+    mean_anomaly: Optional[float] = None
+
+    ephemeris_type: Optional[int] = None
+    element_set_no: Optional[int] = None
+
+    rev_at_epoch: Optional[float] = None
+    bstar: Optional[float] = None
+
+    mean_motion_dot: Optional[float] = None
+    mean_motion_ddot: Optional[float] = None
+
+    file: Optional[int] = None
+
+    tle_line0: Optional[str] = None
+    tle_line1: Optional[str] = None
+    tle_line2: Optional[str] = None
+
+    object_id: Optional[str] = None
+    object_number: Optional[int] = None
+
+    semimajor_axis: Optional[float] = None
+
+    period: Optional[float] = None
+    apogee: Optional[float] = None
+    perigee: Optional[float] = None
+
+    decayed: Optional[int] = None
+
+
+class TLEHistoryOut(BaseModel):
+    norad_cat_id: int
+    start: datetime
+    stop: datetime
+    items: List[TLEOut]
+    # Pass as `start` to get the rest of the window; null on the last page.
+    next_start: Optional[datetime] = None
+
+
+class CurrentTLEOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    satellite_id: Optional[int] = None
+    norad_cat_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+    object_name: Optional[str] = None
+    epoch: Optional[datetime] = None
+
+    mean_motion: Optional[float] = None
+    eccentricity: Optional[float] = None
+    inclination: Optional[float] = None
+    ra_of_asc_node: Optional[float] = None
+    arg_of_pericenter: Optional[float] = None
+    mean_anomaly: Optional[float] = None
+    bstar: Optional[float] = None
+    mean_motion_dot: Optional[float] = None
+    mean_motion_ddot: Optional[float] = None
+
+    tle_line0: Optional[str] = None
+    tle_line1: Optional[str] = None
+    tle_line2: Optional[str] = None
+
+    semimajor_axis: Optional[float] = None
+    period: Optional[float] = None
+    apogee: Optional[float] = None
+    perigee: Optional[float] = None
+
+
+class RFOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    satellite_id: Optional[int] = None
+
+    uuid: Optional[str] = None
+    description: Optional[str] = None
+    alive: Optional[bool] = None
+    type: Optional[str] = None
+
+    uplink_low: Optional[int] = None
+    uplink_high: Optional[int] = None
+    uplink_drift: Optional[int] = None
+    downlink_low: Optional[int] = None
+    downlink_high: Optional[int] = None
+    downlink_drift: Optional[int] = None
+
+    mode: Optional[str] = None
+    mode_id: Optional[int] = None
+    uplink_mode: Optional[str] = None
+    invert: Optional[bool] = None
+    baud: Optional[float] = None
+
+    norad_cat_id: Optional[int] = None
+    sat_id: Optional[str] = None
+    norad_follow_id: Optional[int] = None
+
+    status: Optional[str] = None
+
+    updated: Optional[datetime] = None
+    citation: Optional[str] = None
+
+    service: Optional[str] = None
+
+    iaru_coordination: Optional[str] = None
+    iaru_coordination_url: Optional[str] = None
+
+    frequency_violation: Optional[bool] = None
+    unconfirmed: Optional[bool] = None
+
+
+class SatellitePositions(BaseModel):
+    norad_cat_id: int
+    # One entry per requested time: [x, y, z] km for teme/ecef,
+    # [lat, lon, alt_km] for geodetic; null where SGP4 failed.
+    positions: List[Optional[List[float]]]
+
+
+class PositionsOut(BaseModel):
+    frame: str
+    times: List[datetime]
+    satellites: List[SatellitePositions]
+
+
+class NearbySatellite(BaseModel):
+    norad_cat_id: int
+    latitude: float
+    longitude: float
+    altitude: float
+    distance: float  # km along the ground
+
+
+class NearbyOut(BaseModel):
+    time: datetime
+    latitude: float
+    longitude: float
+    radius: float
+    satellites: List[NearbySatellite]
+
+
+class VisibleSatellite(BaseModel):
+    norad_cat_id: int
+    elevation: float
+    azimuth: float
+    range: float  # km
+
+
+class VisibleOut(BaseModel):
+    time: datetime
+    latitude: float
+    longitude: float
+    altitude: float
+    min_elevation: float
+    satellites: List[VisibleSatellite]
+
+
+class TransmitterOut(BaseModel):
+    uuid: str
+    description: Optional[str] = None
+    mode: Optional[str] = None
+    downlink_low: Optional[int] = None
+    downlink_high: Optional[int] = None
+
+
+class PassOut(BaseModel):
+    norad_cat_id: int
+    object_name: Optional[str] = None
+    # Null when the pass is already in progress at `start` or still in
+    # progress at `stop`.
+    rise_time: Optional[datetime] = None
+    rise_azimuth: Optional[float] = None
+    culmination_time: datetime
+    max_elevation: float
+    culmination_azimuth: float
+    set_time: Optional[datetime] = None
+    set_azimuth: Optional[float] = None
+    transmitters: List[TransmitterOut] = []
+
+
+class BandMatchOut(BaseModel):
+    uuid: str
+    norad_cat_id: int
+    satellite_name: Optional[str] = None
+    object_type: Optional[str] = None
+    country: Optional[str] = None
+
+    description: Optional[str] = None
+    type: Optional[str] = None
+    mode: Optional[str] = None
+    uplink_mode: Optional[str] = None
+    service: Optional[str] = None
+    status: Optional[str] = None
+    alive: Optional[bool] = None
+    baud: Optional[float] = None
+    invert: Optional[bool] = None
+
+    direction: str
+    low: int
+    high: int
+    # Set when an observer is given: the range to tune to over the window,
+    # null if the satellite never clears the elevation mask.
+    tuned_low: Optional[float] = None
+    tuned_high: Optional[float] = None
+
+
+class BandQueryOut(BaseModel):
+    low: int
+    high: int
+    count: int
+    matches: List[BandMatchOut]
+
+
+class PassesOut(BaseModel):
+    latitude: float
+    longitude: float
+    altitude: float
+    start: datetime
+    stop: datetime
+    min_elevation: float
+    passes: List[PassOut]
+
+
+class ConjunctionScreeningOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created_at: Optional[datetime] = None
+    start: datetime
+    stop: datetime
+    threshold: float
+    step: float
+    satellites: int
+    candidates: int
+    conjunctions: int
+    seconds: Optional[float] = None
+
+
+class ConjunctionOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    screening_id: Optional[int] = None
+    primary_norad_cat_id: Optional[int] = None
+    secondary_norad_cat_id: Optional[int] = None
+    tca: Optional[datetime] = None
+    miss_distance: Optional[float] = None
+    relative_speed: Optional[float] = None
+
+
+class ManoeuvreOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    norad_cat_id: Optional[int] = None
+    before_epoch: Optional[datetime] = None
+    epoch: Optional[datetime] = None
+    delta_semimajor_axis: Optional[float] = None
+    delta_inclination: Optional[float] = None
+
+
+class OrbitTrendOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    norad_cat_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+    last_epoch: Optional[datetime] = None
+    semimajor_axis: Optional[float] = None
+    perigee: Optional[float] = None
+    apogee: Optional[float] = None
+    inclination: Optional[float] = None
+    bstar: Optional[float] = None
+    decay_rate: Optional[float] = None
+    decay_rate_error: Optional[float] = None
+    fit_points: Optional[int] = None
+    reentry_earliest: Optional[datetime] = None
+    reentry: Optional[datetime] = None
+    reentry_latest: Optional[datetime] = None
+    manoeuvres: Optional[int] = None
+    last_manoeuvre: Optional[datetime] = None
+
+
+class SatelliteTrendOut(OrbitTrendOut):
+    recent_manoeuvres: List[ManoeuvreOut] = []
@@ -0,0 +1,252 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.models import NearbyOut, PassesOut, PositionsOut, VisibleOut
+from app.api.profiling import ProfiledRoute
+from app.core.catalog import load_catalog
+from app.core.db import get_read_db
+from app.core.schemas import RF
+from app.propagation.passes import COARSE_STEP, Observer, predict_passes, prefilter
+from app.propagation.propagator import FRAMES, load_propagator, utcnow
+from app.propagation.subpoints import nearby, visible
+
+router = APIRouter(route_class=ProfiledRoute)
+
+MAX_EVALUATIONS = 2_000_000
+MAX_EPHEMERIS_STEPS = 10_000
+# Satellite-step budget for the coarse pass sweep, about a day of the full
+# catalog at the default step.
+MAX_PASS_SWEEP = 10_000_000
+
+
+def _as_utc(t):
+    return t if t.tzinfo else t.replace(tzinfo=timezone.utc)
+
+
+def _positions(propagator, times, frame):
+    result = propagator.positions(times, frame)
+    if frame == "geodetic":
+        result = np.stack(result, axis=-1)
+
+    satellites = []
+    for norad_cat_id, track in zip(propagator.norad_cat_ids.tolist(), result):
+        valid = ~np.isnan(track).any(axis=-1)
+        positions = np.round(track, 6).tolist()
+        satellites.append(
+            {
+                "norad_cat_id": norad_cat_id,
+                "positions": [p if ok else None for p, ok in zip(positions, valid)],
+            }
+        )
+
+    return {"frame": frame, "times": times, "satellites": satellites}
+
+
+def _norad_ids(values):
+    """NORAD ids from repeated and/or comma-separated `norad_ids` values."""
+    try:
+        ids = [int(n) for value in values or () for n in value.split(",") if n.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="norad_ids must be integers, e.g. 25544,43013"
+        )
+    return ids or None
+
+
+def _check_frame(frame):
+    if frame not in FRAMES:
+        raise HTTPException(
+            status_code=400, detail=f"frame must be one of {', '.join(FRAMES)}"
+        )
+
+
+@router.get("/positions", response_model=PositionsOut)
+def get_positions(
+    t: Optional[List[datetime]] = Query(None),
+    norad_ids: Optional[List[str]] = Query(
+        None, description="repeated, or comma-separated: 25544,43013"
+    ),
+    frame: str = "geodetic",
+    db: Session = Depends(get_read_db),
+):
+    _check_frame(frame)
+    times = [_as_utc(time) for time in t] if t else [utcnow()]
+    norad_ids = _norad_ids(norad_ids)
+
+    propagator = load_propagator(db)
+    if norad_ids:
+        propagator = propagator.subset(norad_ids)
+
+    if len(propagator) * len(times) > MAX_EVALUATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request exceeds {MAX_EVALUATIONS} satellite-time evaluations",
+        )
+
+    return _positions(propagator, times, frame)
+
+
+@router.get("/satellites/{norad_id}/ephemeris", response_model=PositionsOut)
+def get_ephemeris(
+    norad_id: int,
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+    step: float = Query(60.0, gt=0, description="seconds"),
+    frame: str = "geodetic",
+    db: Session = Depends(get_read_db),
+):
+    _check_frame(frame)
+    start = _as_utc(start) if start else utcnow()
+    stop = _as_utc(stop) if stop else start + timedelta(minutes=90)
+    if stop < start:
+        raise HTTPException(status_code=400, detail="stop must be after start")
+
+    steps = int((stop - start).total_seconds() // step) + 1
+    if steps > MAX_EPHEMERIS_STEPS:
+        raise HTTPException(
+            status_code=400, detail=f"Ephemeris exceeds {MAX_EPHEMERIS_STEPS} steps"
+        )
+
+    propagator = load_propagator(db).subset([norad_id])
+    if not len(propagator):
+        raise HTTPException(status_code=404, detail="No TLE for this satellite")
+
+    times = [start + timedelta(seconds=i * step) for i in range(steps)]
+    return _positions(propagator, times, frame)
+
+
+@router.get("/overhead", response_model=NearbyOut)
+def get_overhead(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(500.0, gt=0, le=20000, description="km"),
+    t: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Satellites whose sub-point is within `radius` km of (lat, lon) at `t`."""
+    t = _as_utc(t) if t else utcnow()
+    return {
+        "time": t,
+        "latitude": lat,
+        "longitude": lon,
+        "radius": radius,
+        "satellites": nearby(db, load_propagator(db), t, lat, lon, radius),
+    }
+
+
+@router.get("/visible", response_model=VisibleOut)
+def get_visible(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    alt: float = Query(0.0, description="km above the WGS84 ellipsoid"),
+    min_elevation: float = Query(0.0, ge=0, lt=90),
+    t: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Satellites whose footprint contains (lat, lon) at `t`, highest first."""
+    t = _as_utc(t) if t else utcnow()
+    observer = Observer(lat, lon, alt)
+    return {
+        "time": t,
+        "latitude": lat,
+        "longitude": lon,
+        "altitude": alt,
+        "min_elevation": min_elevation,
+        "satellites": visible(db, load_propagator(db), t, observer, min_elevation),
+    }
+
+
+def _downlinks(db, norad_cat_ids=None):
+    """Active SatNOGS downlinks grouped by NORAD id."""
+    query = select(
+        RF.norad_cat_id,
+        RF.uuid,
+        RF.description,
+        RF.mode,
+        RF.downlink_low,
+        RF.downlink_high,
+    ).where(RF.status == "active", RF.alive, RF.downlink_low.is_not(None))
+    if norad_cat_ids:
+        query = query.where(RF.norad_cat_id.in_(norad_cat_ids))
+
+    downlinks = {}
+    for row in db.execute(query).mappings():
+        transmitter = dict(row)
+        downlinks.setdefault(transmitter.pop("norad_cat_id"), []).append(transmitter)
+    return downlinks
+
+
+@router.get("/passes", response_model=PassesOut)
+def get_passes(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    alt: float = Query(0.0, description="km above the WGS84 ellipsoid"),
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+    min_elevation: float = Query(10.0, ge=0, lt=90),
+    norad_ids: Optional[List[str]] = Query(
+        None, description="repeated, or comma-separated: 25544,43013"
+    ),
+    rf_only: bool = Query(False, description="only satellites with active downlinks"),
+    db: Session = Depends(get_read_db),
+):
+    start = _as_utc(start) if start else utcnow()
+    stop = _as_utc(stop) if stop else start + timedelta(hours=24)
+    if stop <= start:
+        raise HTTPException(status_code=400, detail="stop must be after start")
+
+    norad_ids = _norad_ids(norad_ids)
+
+    observer = Observer(lat, lon, alt)
+    downlinks = _downlinks(db, norad_ids)
+
+    catalog = load_catalog(db)
+    positions = catalog.positions(norad_ids)
+    if rf_only:
+        positions = positions[
+            np.isin(catalog.rows["norad_cat_id"][positions], list(downlinks))
+        ]
+
+    # Rows without stored geometry (NaN inclination) cannot be ruled out.
+    rows = catalog.rows[positions]
+    mask = prefilter(
+        rows["inclination"], rows["apogee"], observer, min_elevation
+    ) | np.isnan(rows["inclination"])
+    candidates = positions[mask]
+
+    steps = int((stop - start).total_seconds() // COARSE_STEP) + 1
+    if len(candidates) * steps > MAX_PASS_SWEEP:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request exceeds {MAX_PASS_SWEEP} satellite-steps, "
+            "narrow the window or the satellites",
+        )
+
+    norad_cat_ids = catalog.rows["norad_cat_id"][candidates].tolist()
+    propagator = load_propagator(db).subset(norad_cat_ids)
+    passes = predict_passes(propagator, observer, start, stop, min_elevation)
+
+    names = dict(
+        zip(
+            norad_cat_ids,
+            np.char.decode(catalog.rows["object_name"][candidates]).tolist(),
+        )
+    )
+    for p in passes:
+        p["object_name"] = names.get(p["norad_cat_id"])
+        p["transmitters"] = downlinks.get(p["norad_cat_id"], [])
+
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "altitude": alt,
+        "start": start,
+        "stop": stop,
+        "min_elevation": min_elevation,
+        "passes": passes,
+    }
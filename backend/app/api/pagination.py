@@ -0,0 +1,56 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def parse_fields(model, fields):
+    """Resolve a `fields=` query value into the columns to select.
+
+    The primary key is always selected since it is the pagination cursor.
+    """
+    key = model.__mapper__.primary_key[0].name
+    if not fields:
+        return list(model.__table__.columns)
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in model.__table__.columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    if key not in names:
+        names.insert(0, key)
+    return [model.__table__.columns[name] for name in names]
+
+
+def paginate(db: Session, model, filters, fields=None, cursor=None, limit=None):
+    """Keyset page over `model` ordered by primary key.
+
+    Returns `{"items": [...], "next_cursor": key | None}` where each item is a
+    dict holding only the selected columns.
+    """
+    limit = min(limit or DEFAULT_LIMIT, MAX_LIMIT)
+    columns = parse_fields(model, fields)
+    key = model.__mapper__.primary_key[0]
+
+    query = select(*columns).where(*filters).order_by(key).limit(limit + 1)
+    if cursor is not None:
+        query = query.where(key > cursor)
+
+    # Plain tuples zipped with the names are cheaper than RowMapping views.
+    names = [column.name for column in columns]
+    rows = db.execute(query).tuples().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][names.index(key.name)]
+
+    return {
+        "items": [dict(zip(names, row)) for row in rows],
+        "next_cursor": next_cursor,
+    }
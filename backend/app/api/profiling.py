@@ -0,0 +1,118 @@
+import asyncio
+import cProfile
+import functools
+import io
+import os
+import pstats
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# `?profile=1` answers with a cProfile report instead of the response. Only
+# honoured when PROFILE_REQUESTS is set; never enable it in production.
+PROFILE_REQUESTS = os.environ.get("PROFILE_REQUESTS", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# When set, each report's raw stats are also saved there (for snakeviz etc.).
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+PROFILE_LINES = int(os.environ.get("PROFILE_LINES", 60))
+
+_profiler = ContextVar("profiler", default=None)
+
+
+def profiling_requested(request: Request):
+    return PROFILE_REQUESTS and request.query_params.get("profile") in ("1", "true")
+
+
+def _profiled(endpoint):
+    """Wrap an endpoint so it runs under the request's profiler, if any.
+
+    Sync endpoints run in the threadpool, where a profiler enabled by the
+    route handler would not see them, so the endpoint enables it itself.
+    """
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profiler = _profiler.get()
+            if profiler is None:
+                return await endpoint(*args, **kwargs)
+            profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler.get()
+            if profiler is None:
+                return endpoint(*args, **kwargs)
+            profiler.enable()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+
+    return wrapper
+
+
+def _report(request: Request, profiler, response, elapsed):
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out).sort_stats("cumulative")
+    out.write(
+        f"{request.method} {request.url.path} -> {response.status_code} "
+        f"in {elapsed * 1000:.1f} ms\n\n"
+    )
+    stats.print_stats(PROFILE_LINES)
+
+    headers = {"X-Profiled-Status": str(response.status_code)}
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = request.url.path.strip("/").replace("/", "_") or "root"
+        path = os.path.join(
+            PROFILE_DIR, f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S%f}.prof"
+        )
+        stats.dump_stats(path)
+        headers["X-Profile-File"] = path
+    return Response(out.getvalue(), media_type="text/plain", headers=headers)
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose endpoint can be profiled per request with `?profile=1`.
+
+    Only the endpoint function itself is profiled; validation and response
+    serialization are not included.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if PROFILE_REQUESTS:
+            endpoint = _profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not PROFILE_REQUESTS:
+            return handler
+
+        async def profiled_handler(request: Request) -> Response:
+            if not profiling_requested(request):
+                return await handler(request)
+
+            profiler = cProfile.Profile()
+            token = _profiler.set(profiler)
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+            finally:
+                _profiler.reset(token)
+            return _report(request, profiler, response, time.perf_counter() - start)
+
+        return profiled_handler
@@ -1,10 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
-from app.core.schemas import Satellite, TLE, RF
+from app.api.caching import CachedRoute
+from app.api.encoding import page_response
+from app.api.export import stream_rows, wants_stream
+from app.api.models import (
+    CurrentTLEOut,
+    Page,
+    RFOut,
+    SatelliteOut,
+    SearchOut,
+    TLEHistoryOut,
+    TLEOut,
+)
+from app.api.pagination import MAX_LIMIT, paginate
+from app.core.catalog import TLE_FIELDS, load_catalog
+from app.core.db import get_read_db
+from app.core.search import load_search_index
+from app.core.schemas import CurrentTLE, Satellite, TLE, RF
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/")
@@ -19,19 +38,194 @@ async def root():
     }
 
 
-@router.get("/satellites")
-async def get_satellites(db: Session = Depends(get_db)):
-    satellites = db.query(Satellite).all()
-    return satellites
+@router.get(
+    "/satellites",
+    response_model=Page[SatelliteOut],
+    response_model_exclude_unset=True,
+)
+def get_satellites(
+    request: Request,
+    norad_cat_id: Optional[List[int]] = Query(None),
+    object_type: Optional[str] = None,
+    country: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stream: bool = False,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(Satellite.norad_cat_id.in_(norad_cat_id))
+    if object_type:
+        filters.append(Satellite.object_type == object_type)
+    if country:
+        filters.append(Satellite.country == country)
+
+    if wants_stream(request, stream):
+        return stream_rows(Satellite, filters, fields, cursor)
+    page = paginate(db, Satellite, filters, fields, cursor, limit)
+    return page_response(request, page)
+
+
+@router.get("/satellites/search", response_model=SearchOut)
+def search_satellites(
+    q: str = Query(..., min_length=1, max_length=64),
+    fuzzy: bool = True,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """Typeahead search over names, international designators, NORAD ids
+    and countries: word prefixes first, then fuzzy (trigram) name matches."""
+    index = load_search_index(db)
+    return {"q": q, "results": index.search(q, limit, fuzzy)}
+
+
+@router.get("/satellites/{norad_id}/tle", response_model=CurrentTLEOut)
+def get_satellite_tle(norad_id: int, db: Session = Depends(get_read_db)):
+    tle = load_catalog(db).get(norad_id, TLE_FIELDS)
+    if tle is None:
+        raise HTTPException(status_code=404, detail="No TLE for this satellite")
+    return tle
+
+
+@router.get("/satellites/{norad_id}/tles", response_model=TLEHistoryOut)
+def get_satellite_tle_history(
+    norad_id: int,
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    """Element sets of one satellite with epochs in [start, stop), oldest
+    first. Defaults to the year before `stop` (now)."""
+    stop = stop or datetime.utcnow()
+    start = start or stop - timedelta(days=365)
+    if start >= stop:
+        raise HTTPException(status_code=400, detail="start must be before stop")
+
+    # Bounding the epoch lets PostgreSQL skip the partitions outside it.
+    items = (
+        db.query(TLE)
+        .filter(TLE.norad_cat_id == norad_id, TLE.epoch >= start, TLE.epoch < stop)
+        .order_by(TLE.epoch, TLE.id)
+        .limit(limit + 1)
+        .all()
+    )
+    next_start = None
+    if len(items) > limit:
+        next_start = items[limit].epoch
+        items = items[:limit]
+
+    return {
+        "norad_cat_id": norad_id,
+        "start": start,
+        "stop": stop,
+        "items": items,
+        "next_start": next_start,
+    }
+
+
+@router.get("/tles", response_model=Page[TLEOut], response_model_exclude_unset=True)
+def get_tles(
+    request: Request,
+    norad_cat_id: Optional[List[int]] = Query(None),
+    epoch_start: Optional[datetime] = None,
+    epoch_end: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stream: bool = False,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(TLE.norad_cat_id.in_(norad_cat_id))
+    if epoch_start:
+        filters.append(TLE.epoch >= epoch_start)
+    if epoch_end:
+        filters.append(TLE.epoch < epoch_end)
+
+    if wants_stream(request, stream):
+        return stream_rows(TLE, filters, fields, cursor)
+    page = paginate(db, TLE, filters, fields, cursor, limit)
+    return page_response(request, page)
+
+
+@router.get(
+    "/tles/latest",
+    response_model=Page[CurrentTLEOut],
+    response_model_exclude_unset=True,
+)
+def get_latest_tles(
+    request: Request,
+    norad_cat_id: Optional[List[int]] = Query(None),
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stream: bool = False,
+    limit: int = Query(MAX_LIMIT, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(CurrentTLE.norad_cat_id.in_(norad_cat_id))
+
+    if wants_stream(request, stream):
+        return stream_rows(CurrentTLE, filters, fields, cursor)
+    page = paginate(db, CurrentTLE, filters, fields, cursor, limit)
+    return page_response(request, page)
+
+
+@router.get("/rfs", response_model=Page[RFOut], response_model_exclude_unset=True)
+def get_rf(
+    request: Request,
+    norad_cat_id: Optional[List[int]] = Query(None),
+    band_low: Optional[int] = Query(None, description="Hz"),
+    band_high: Optional[int] = Query(None, description="Hz"),
+    service: Optional[str] = None,
+    status: Optional[str] = None,
+    mode: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stream: bool = False,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(RF.norad_cat_id.in_(norad_cat_id))
+    if service:
+        filters.append(RF.service == service)
+    if status:
+        filters.append(RF.status == status)
+    if mode:
+        filters.append(RF.mode == mode)
 
+    # A transmitter matches the band if its uplink or downlink range overlaps it.
+    if band_low is not None or band_high is not None:
+        low = band_low if band_low is not None else 0
+        high = band_high if band_high is not None else 2**62
+        if low > high:
+            raise HTTPException(
+                status_code=400, detail="band_low must not exceed band_high"
+            )
 
-@router.get("/tles")
-async def get_tles(db: Session = Depends(get_db)):
-    tles = db.query(TLE).all()
-    return tles
+        def overlaps(range_low, range_high):
+            return and_(
+                range_low.isnot(None),
+                range_low <= high,
+                # Single-frequency transmitters only fill in the low edge.
+                or_(range_high >= low, and_(range_high.is_(None), range_low >= low)),
+            )
 
+        filters.append(
+            or_(
+                overlaps(RF.downlink_low, RF.downlink_high),
+                overlaps(RF.uplink_low, RF.uplink_high),
+            )
+        )
 
-@router.get("/rfs")
-async def get_rf(db: Session = Depends(get_db)):
-    rf = db.query(RF).all()
-    return rf
+    if wants_stream(request, stream):
+        return stream_rows(RF, filters, fields, cursor)
+    page = paginate(db, RF, filters, fields, cursor, limit)
+    return page_response(request, page)
@@ -0,0 +1,96 @@
+import os
+import re
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.caching import etag_matches
+from app.api.profiling import ProfiledRoute
+from app.core.snapshot import SNAPSHOT_DIR, read_manifest
+
+router = APIRouter(route_class=ProfiledRoute)
+
+CHUNK_SIZE = 256 * 1024
+ARCHIVE = re.compile(r"^catalog-\d{8}T\d{6,12}Z\.npz$")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _read(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(CHUNK_SIZE, length))
+            if not block:
+                return
+            length -= len(block)
+            yield block
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single `bytes=` range, None to send it all.
+
+    Raises a 416 for a range that lies outside the file.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416, headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.get("/snapshot")
+def get_snapshot_manifest():
+    manifest = read_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="No snapshot published yet")
+    return {**manifest, "url": f"/snapshot/{manifest['file']}"}
+
+
+@router.get("/snapshot/{filename}")
+def get_snapshot_file(filename: str, request: Request):
+    """Download a snapshot archive; supports single byte ranges for resuming."""
+    path = os.path.join(SNAPSHOT_DIR, filename)
+    if not ARCHIVE.match(filename) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    size = os.path.getsize(path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        # Archives are versioned by name and never rewritten.
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{filename}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == headers["ETag"]:
+        byte_range = _byte_range(request.headers.get("range"), size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            _read(path, 0, size), media_type="application/octet-stream", headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        _read(path, start, end - start + 1),
+        status_code=206,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
@@ -0,0 +1,350 @@
+"""Server-sent event streams of catalog changes and live positions.
+
+Each feed runs one background task per API process, only while someone is
+subscribed, and does its work once per tick for everyone: one query for new
+changes, or one propagation of every satellite a due subscriber follows. The
+results are fanned out through bounded per-subscriber queues; a subscriber
+that falls STREAM_QUEUE_SIZE events behind gets an `overflow` event and is
+disconnected, and can resume the change feed with `Last-Event-ID`.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.encoding import default
+from app.core.bands import load_band_index
+from app.core.changes import RFS, latest_change_id, load_changes
+from app.core.db import ReadSessionLocal
+from app.core.metrics import STREAM_EVENTS, STREAM_SUBSCRIBERS
+from app.propagation.propagator import load_propagator
+
+logger = logging.getLogger(__name__)
+
+STREAM_POLL_SECONDS = float(os.environ.get("STREAM_POLL_SECONDS", 2))
+STREAM_KEEPALIVE_SECONDS = float(os.environ.get("STREAM_KEEPALIVE_SECONDS", 15))
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", 1000))
+# Changes replayed to a client resuming with Last-Event-ID.
+STREAM_BACKLOG = int(os.environ.get("STREAM_BACKLOG", 20000))
+MAX_STREAM_SATELLITES = int(os.environ.get("STREAM_MAX_SATELLITES", 5000))
+MAX_INTERVAL = 3600
+
+OVERFLOW = object()
+
+router = APIRouter()
+
+
+def _query(fn, *args):
+    db = ReadSessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def frame(name, data, event_id=None):
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(data, default=default, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def _overlaps(transmitter, low, high):
+    for direction in ("uplink", "downlink"):
+        start = transmitter[f"{direction}_low"]
+        if start is None:
+            continue
+        end = transmitter[f"{direction}_high"]
+        end = start if end is None else end
+        if min(start, end) <= high and max(start, end) >= low:
+            return True
+    return False
+
+
+class Subscriber:
+    def __init__(self, norad_cat_ids=None, band=None, band_ids=None, interval=1):
+        self.queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.norad_cat_ids = norad_cat_ids
+        self.band = band
+        # Satellites with a transmitter in `band`; kept current from rf events.
+        self.band_ids = band_ids
+        self.interval = interval
+        self.closed = False
+
+    def offer(self, item):
+        """Queue an encoded frame; returns False once the subscriber overflowed."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+            self.closed = True
+            return False
+
+    def select(self, event):
+        """The part of a change event this subscriber asked for, or None."""
+        norad_cat_id = event["norad_cat_id"]
+        if self.norad_cat_ids is not None and norad_cat_id not in self.norad_cat_ids:
+            return None
+        if self.band is None:
+            return event
+
+        if event["type"] == RFS:
+            transmitters = [
+                t for t in event["transmitters"] if _overlaps(t, *self.band)
+            ]
+            if not transmitters:
+                self.band_ids.discard(norad_cat_id)
+                return None
+            self.band_ids.add(norad_cat_id)
+            return {**event, "transmitters": transmitters}
+        return event if norad_cat_id in self.band_ids else None
+
+
+class Feed:
+    name = None
+
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def add(self, subscriber):
+        self.subscribers.add(subscriber)
+        STREAM_SUBSCRIBERS.labels(self.name).set(len(self.subscribers))
+        if not self.running():
+            self.task = asyncio.create_task(self.run())
+
+    def remove(self, subscriber):
+        self.subscribers.discard(subscriber)
+        STREAM_SUBSCRIBERS.labels(self.name).set(len(self.subscribers))
+
+    def publish(self, subscriber, item):
+        if subscriber.offer(item):
+            STREAM_EVENTS.labels(self.name).inc()
+        else:
+            self.remove(subscriber)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"{self.name} stream tick failed: {e}")
+                await asyncio.sleep(STREAM_POLL_SECONDS)
+
+
+class ChangeFeed(Feed):
+    """Polls the `changes` table that the Syncer appends to."""
+
+    name = "changes"
+
+    def __init__(self):
+        super().__init__()
+        self.last_id = 0
+        self.lock = asyncio.Lock()
+
+    async def subscribe(self, subscriber, last_event_id=None):
+        """Start following changes; returns the events to replay first."""
+        async with self.lock:
+            if not self.running():
+                self.last_id = await asyncio.to_thread(_query, latest_change_id)
+            self.add(subscriber)
+            # Everything after `until` reaches the subscriber through the queue.
+            until = self.last_id
+
+        if last_event_id is None or last_event_id >= until:
+            return []
+        events, _ = await asyncio.to_thread(
+            _query, load_changes, last_event_id, until, STREAM_BACKLOG
+        )
+        return events
+
+    async def tick(self):
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+        events, self.last_id = await asyncio.to_thread(
+            _query, load_changes, self.last_id
+        )
+        # Unfiltered subscribers share one encoding of each event.
+        encoded = {}
+        for event in events:
+            for subscriber in list(self.subscribers):
+                selected = subscriber.select(event)
+                if selected is None:
+                    continue
+                if selected is event:
+                    if event["id"] not in encoded:
+                        encoded[event["id"]] = frame(event["type"], event, event["id"])
+                    item = encoded[event["id"]]
+                else:
+                    item = frame(selected["type"], selected, selected["id"])
+                self.publish(subscriber, item)
+
+
+class PositionFeed(Feed):
+    """Propagates every satellite a due subscriber follows, once per second.
+
+    A subscriber with an `interval` of n seconds is due on ticks whose Unix
+    time is a multiple of n, so subscribers sharing a cadence share ticks.
+    """
+
+    name = "positions"
+
+    def __init__(self):
+        super().__init__()
+        self.propagator = None
+        self.subset_ids = None
+        self.subset = None
+
+    async def subscribe(self, subscriber, last_event_id=None):
+        self.add(subscriber)
+        return []
+
+    def positions(self, norad_cat_ids, t):
+        propagator = _query(load_propagator)
+        if propagator is not self.propagator or norad_cat_ids != self.subset_ids:
+            self.subset = propagator.subset(sorted(norad_cat_ids))
+            self.propagator = propagator
+            self.subset_ids = norad_cat_ids
+
+        lat, lon, alt = self.subset.positions([t])
+        track = np.round(np.stack([lat[:, 0], lon[:, 0], alt[:, 0]], axis=-1), 6)
+        return {
+            norad_cat_id: position
+            for norad_cat_id, position in zip(
+                self.subset.norad_cat_ids.tolist(), track.tolist()
+            )
+            if not any(math.isnan(x) for x in position)
+        }
+
+    async def tick(self):
+        now = time.time()
+        second = math.floor(now) + 1
+        await asyncio.sleep(second - now)
+
+        due = [s for s in self.subscribers if second % s.interval == 0]
+        if not due:
+            return
+
+        t = datetime.fromtimestamp(second, timezone.utc)
+        norad_cat_ids = frozenset().union(*(s.norad_cat_ids for s in due))
+        positions = await asyncio.to_thread(self.positions, norad_cat_ids, t)
+
+        for subscriber in due:
+            data = {
+                "t": t,
+                "positions": [
+                    [n, *positions[n]]
+                    for n in sorted(subscriber.norad_cat_ids)
+                    if n in positions
+                ],
+            }
+            self.publish(subscriber, frame("positions", data))
+
+
+changes = ChangeFeed()
+positions = PositionFeed()
+
+
+async def _events(feed, subscriber, last_event_id=None):
+    # Subscribing here rather than in the endpoint ties the subscription to
+    # the response body, whose cleanup runs however the client goes away.
+    try:
+        backlog = await feed.subscribe(subscriber, last_event_id)
+        yield f"retry: {int(STREAM_POLL_SECONDS * 1000)}\n\n".encode()
+        for event in backlog:
+            selected = subscriber.select(event)
+            if selected is not None:
+                yield frame(selected["type"], selected, selected["id"])
+
+        while True:
+            try:
+                item = await asyncio.wait_for(
+                    subscriber.queue.get(), STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if item is OVERFLOW:
+                yield frame("overflow", {"queue_size": STREAM_QUEUE_SIZE})
+                return
+            yield item
+    finally:
+        feed.remove(subscriber)
+
+
+def _response(body):
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _band_ids(db, low, high):
+    return {t["norad_cat_id"] for t in load_band_index(db).query(low, high)}
+
+
+@router.get("/stream")
+async def stream_changes(
+    norad_cat_id: Optional[List[int]] = Query(None),
+    band_low: Optional[int] = Query(None, description="Hz"),
+    band_high: Optional[int] = Query(None, description="Hz"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Server-sent `tle` and `rf` events as syncs change the catalog.
+
+    A `tle` event carries the satellite's new current element set; an `rf`
+    event carries its transmitters (only those in the band, with a band
+    filter). With a band filter, `tle` events are sent for satellites that
+    have a transmitter in the band.
+    """
+    band = None
+    band_ids = None
+    if band_low is not None or band_high is not None:
+        band = (band_low or 0, band_high if band_high is not None else 2**63 - 1)
+        if band[0] > band[1]:
+            raise HTTPException(status_code=400, detail="band_low exceeds band_high")
+        band_ids = await asyncio.to_thread(_query, _band_ids, *band)
+
+    subscriber = Subscriber(
+        norad_cat_ids=set(norad_cat_id) if norad_cat_id else None,
+        band=band,
+        band_ids=band_ids,
+    )
+    return _response(_events(changes, subscriber, last_event_id))
+
+
+@router.get("/stream/positions")
+async def stream_positions(
+    norad_cat_id: List[int] = Query(...),
+    interval: int = Query(1, ge=1, le=MAX_INTERVAL, description="seconds"),
+):
+    """Server-sent `positions` events every `interval` seconds.
+
+    Each event holds `t` and `[norad_cat_id, lat, lon, alt]` rows (degrees,
+    km) for the requested satellites that have a current element set.
+    """
+    if len(set(norad_cat_id)) > MAX_STREAM_SATELLITES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_STREAM_SATELLITES} satellites per stream",
+        )
+
+    subscriber = Subscriber(norad_cat_ids=frozenset(norad_cat_id), interval=interval)
+    return _response(_events(positions, subscriber))
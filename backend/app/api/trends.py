@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.caching import ResultsCachedRoute
+from app.api.models import ManoeuvreOut, OrbitTrendOut, Page, SatelliteTrendOut
+from app.api.pagination import MAX_LIMIT, paginate
+from app.core.db import get_read_db
+from app.core.schemas import Manoeuvre, OrbitTrend
+
+# Everything here is read from the summary tables written by
+# app.propagation.trends after each sync.
+router = APIRouter(route_class=ResultsCachedRoute)
+
+RECENT_MANOEUVRES = 20
+
+
+@router.get("/satellites/{norad_id}/trend", response_model=SatelliteTrendOut)
+def get_satellite_trend(norad_id: int, db: Session = Depends(get_read_db)):
+    trend = db.get(OrbitTrend, norad_id)
+    if trend is None:
+        raise HTTPException(status_code=404, detail="No trend for this satellite")
+
+    recent = db.scalars(
+        select(Manoeuvre)
+        .where(Manoeuvre.norad_cat_id == norad_id)
+        .order_by(Manoeuvre.epoch.desc())
+        .limit(RECENT_MANOEUVRES)
+    ).all()
+    return {
+        **OrbitTrendOut.model_validate(trend).model_dump(),
+        "recent_manoeuvres": recent,
+    }
+
+
+@router.get(
+    "/trends",
+    response_model=Page[OrbitTrendOut],
+    response_model_exclude_unset=True,
+)
+def get_trends(
+    norad_cat_id: Optional[List[int]] = Query(None),
+    decaying: bool = Query(False, description="only satellites with a re-entry"),
+    reentry_before: Optional[datetime] = None,
+    manoeuvred_since: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(OrbitTrend.norad_cat_id.in_(norad_cat_id))
+    if decaying:
+        filters.append(OrbitTrend.reentry.isnot(None))
+    if reentry_before:
+        filters.append(OrbitTrend.reentry_earliest <= reentry_before)
+    if manoeuvred_since:
+        filters.append(OrbitTrend.last_manoeuvre >= manoeuvred_since)
+
+    return paginate(db, OrbitTrend, filters, fields, cursor, limit)
+
+
+@router.get(
+    "/manoeuvres",
+    response_model=Page[ManoeuvreOut],
+    response_model_exclude_unset=True,
+)
+def get_manoeuvres(
+    norad_cat_id: Optional[List[int]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    filters = []
+    if norad_cat_id:
+        filters.append(Manoeuvre.norad_cat_id.in_(norad_cat_id))
+    if since:
+        filters.append(Manoeuvre.epoch >= since)
+    if until:
+        filters.append(Manoeuvre.epoch <= until)
+
+    return paginate(db, Manoeuvre, filters, fields, cursor, limit)
@@ -0,0 +1,150 @@
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import Resident
+from app.core.schemas import RF, Satellite
+
+DIRECTIONS = ("downlink", "uplink")
+# Intervals per block; a query only scans blocks that can reach its band.
+BLOCK = 64
+
+TRANSMITTER_COLUMNS = (
+    RF.uuid,
+    RF.norad_cat_id,
+    RF.description,
+    RF.type,
+    RF.mode,
+    RF.uplink_mode,
+    RF.service,
+    RF.status,
+    RF.alive,
+    RF.baud,
+    RF.invert,
+    Satellite.satname.label("satellite_name"),
+    Satellite.object_type,
+    Satellite.country,
+)
+
+
+class BandIndex:
+    """Static interval index over transmitter frequency ranges.
+
+    Each transmitter contributes one interval per direction with a known
+    frequency (single-frequency transmitters only fill in the low edge).
+    Intervals are sorted by low edge and grouped in blocks of BLOCK with the
+    highest high edge of each block, so an overlap query binary-searches the
+    last candidate and scans only the blocks that reach the band.
+    """
+
+    def __init__(self, transmitters, ranges):
+        intervals = []
+        for row, (uplink_low, uplink_high, downlink_low, downlink_high) in enumerate(
+            ranges
+        ):
+            for direction, low, high in (
+                (0, downlink_low, downlink_high),
+                (1, uplink_low, uplink_high),
+            ):
+                if low is None:
+                    continue
+                high = low if high is None else high
+                intervals.append((min(low, high), max(low, high), direction, row))
+
+        intervals.sort()
+        self.transmitters = transmitters
+        self.low = np.array([i[0] for i in intervals], dtype=np.int64)
+        self.high = np.array([i[1] for i in intervals], dtype=np.int64)
+        self.direction = np.array([i[2] for i in intervals], dtype=np.int8)
+        self.row = np.array([i[3] for i in intervals], dtype=np.int64)
+        self.block_high = (
+            np.maximum.reduceat(self.high, np.arange(0, len(intervals), BLOCK))
+            if intervals
+            else np.empty(0, dtype=np.int64)
+        )
+
+    def __len__(self):
+        return len(self.low)
+
+    def overlapping(self, low, high):
+        """Positions of the intervals that intersect [low, high], by low edge."""
+        end = int(np.searchsorted(self.low, high, side="right"))
+        blocks = np.flatnonzero(self.block_high[: -(-end // BLOCK)] >= low)
+        if not len(blocks):
+            return np.empty(0, dtype=np.int64)
+
+        positions = (blocks[:, None] * BLOCK + np.arange(BLOCK)).ravel()
+        positions = positions[positions < end]
+        return positions[self.high[positions] >= low]
+
+    def query(
+        self,
+        low,
+        high,
+        direction=None,
+        mode=None,
+        service=None,
+        status=None,
+        alive=None,
+        norad_cat_ids=None,
+    ):
+        """Transmitter intervals overlapping [low, high] Hz that pass the filters.
+
+        Returns dicts holding the transmitter and satellite fields plus the
+        interval's `direction`, `low` and `high`.
+        """
+        positions = self.overlapping(low, high)
+        if direction is not None:
+            positions = positions[
+                self.direction[positions] == DIRECTIONS.index(direction)
+            ]
+
+        norad_cat_ids = set(norad_cat_ids) if norad_cat_ids else None
+        matches = []
+        for i in positions.tolist():
+            transmitter = self.transmitters[self.row[i]]
+            if (
+                (mode is not None and transmitter["mode"] != mode)
+                or (service is not None and transmitter["service"] != service)
+                or (status is not None and transmitter["status"] != status)
+                or (alive is not None and transmitter["alive"] != alive)
+                or (
+                    norad_cat_ids is not None
+                    and transmitter["norad_cat_id"] not in norad_cat_ids
+                )
+            ):
+                continue
+
+            matches.append(
+                {
+                    **transmitter,
+                    "direction": DIRECTIONS[self.direction[i]],
+                    "low": int(self.low[i]),
+                    "high": int(self.high[i]),
+                }
+            )
+        return matches
+
+
+def build_band_index(db: Session):
+    rows = db.execute(
+        select(
+            *TRANSMITTER_COLUMNS,
+            RF.uplink_low,
+            RF.uplink_high,
+            RF.downlink_low,
+            RF.downlink_high,
+        ).outerjoin(Satellite, Satellite.id == RF.satellite_id)
+    ).all()
+
+    split = len(TRANSMITTER_COLUMNS)
+    transmitters = [dict(zip(row._fields[:split], row[:split])) for row in rows]
+    return BandIndex(transmitters, [row[split:] for row in rows])
+
+
+_index = Resident("Band index", build_band_index)
+
+
+def load_band_index(db: Session):
+    """Band index over all transmitters, rebuilt after each sync."""
+    return _index.get(db)
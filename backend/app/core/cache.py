@@ -0,0 +1,287 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.environ.get("CACHE_TTL", 300))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 1024))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# How often a lookup checks whether a sync has replaced a resident structure
+# (the catalog, the search and band indexes).
+CATALOG_CHECK_SECONDS = float(os.environ.get("CATALOG_CHECK_SECONDS", 1))
+# Shared counter file so the API processes see the generation the worker
+# (`python -m app.worker`, a separate process) bumps after each sync, without
+# Redis. Processes on different hosts need it on a shared volume, or Redis.
+# Set it empty to keep the generation in-process, which only suits running
+# the jobs inside the API (SCHEDULER_IN_API).
+CACHE_GENERATION_FILE = os.environ.get(
+    "CACHE_GENERATION_FILE",
+    os.path.join(tempfile.gettempdir(), "astrobridge-generation"),
+)
+REDIS_URL = os.environ.get("REDIS_URL")
+
+REDIS_PREFIX = "astrobridge:"
+
+# Generations are counted per data set, so a job only invalidates what it
+# feeds: syncs bump CATALOG (satellites, TLEs, transmitters and everything
+# built from them in memory), screening and trend runs bump RESULTS.
+CATALOG = "catalog"
+RESULTS = "results"
+
+
+@dataclass
+class Entry:
+    body: bytes
+    media_type: str
+    etag: str
+
+    @classmethod
+    def build(cls, body, media_type):
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        return cls(body=body, media_type=media_type, etag=f'"{digest}"')
+
+
+class MemoryBackend:
+    """In-process LRU cache with a per-entry TTL and entry/byte bounds.
+
+    Generations are read from (and bumped in) `generation_file`, with the
+    scope appended for scopes other than CATALOG, or live in this process
+    when that is empty. Cache keys start with their scope, so a bump only
+    drops that scope's entries.
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        ttl=CACHE_TTL,
+        max_entries=CACHE_MAX_ENTRIES,
+        max_bytes=CACHE_MAX_BYTES,
+        generation_file=CACHE_GENERATION_FILE,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation_file = generation_file
+
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self._generations = {}
+        self._generation_mtimes = {}
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+
+            expires, entry = item
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, entry)
+            self.size += len(entry.body)
+
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        _, entry = self.entries.pop(key)
+        self.size -= len(entry.body)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _generation_path(self, scope):
+        if scope == CATALOG:
+            return self.generation_file
+        return f"{self.generation_file}.{scope}"
+
+    def generation(self, scope=CATALOG):
+        if not self.generation_file:
+            return self._generations.get(scope, 0)
+
+        path = self._generation_path(scope)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+        if mtime != self._generation_mtimes.get(scope):
+            with open(path) as f:
+                self._generations[scope] = int(f.read().strip() or 0)
+            self._generation_mtimes[scope] = mtime
+        return self._generations[scope]
+
+    def bump_generation(self, scope=CATALOG):
+        with self.lock:
+            generation = self.generation(scope) + 1
+            if self.generation_file:
+                path = self._generation_path(scope)
+                tmp = f"{path}.{os.getpid()}"
+                with open(tmp, "w") as f:
+                    f.write(str(generation))
+                os.replace(tmp, path)
+            self._generations[scope] = generation
+
+            # Entries of older generations can never be hit again.
+            for key in [key for key in self.entries if key.startswith(f"{scope}:")]:
+                self._remove(key)
+            return generation
+
+
+class RedisBackend:
+    """Cache shared by every API process through Redis (needs `redis`).
+
+    Entries expire through Redis TTLs; each scope's generation is a Redis
+    counter.
+    """
+
+    blocking = True
+
+    def __init__(self, url=REDIS_URL, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        try:
+            import redis
+        except ImportError:
+            raise Exception("REDIS_URL is set but the redis package is not installed")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def get(self, key):
+        value = self.client.get(f"{REDIS_PREFIX}cache:{key}")
+        if value is None:
+            return None
+
+        etag, media_type, body = value.split(b"\n", 2)
+        return Entry(body=body, media_type=media_type.decode(), etag=etag.decode())
+
+    def set(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+
+        value = f"{entry.etag}\n{entry.media_type}\n".encode() + entry.body
+        self.client.set(f"{REDIS_PREFIX}cache:{key}", value, ex=int(self.ttl))
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{REDIS_PREFIX}cache:*"):
+            self.client.delete(key)
+
+    def _generation_key(self, scope):
+        if scope == CATALOG:
+            return f"{REDIS_PREFIX}generation"
+        return f"{REDIS_PREFIX}generation:{scope}"
+
+    def generation(self, scope=CATALOG):
+        return int(self.client.get(self._generation_key(scope)) or 0)
+
+    def bump_generation(self, scope=CATALOG):
+        return self.client.incr(self._generation_key(scope))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = RedisBackend() if REDIS_URL else MemoryBackend()
+        return _backend
+
+
+def bump_generation(scope=CATALOG):
+    """Invalidate the cached responses of `scope`; call after committing
+    changes to its data."""
+    try:
+        generation = get_backend().bump_generation(scope)
+        logger.info(f"{scope.capitalize()} generation is now {generation}")
+    except Exception as e:
+        logger.error(f"Failed to bump {scope} generation: {e}")
+
+
+class Resident:
+    """A structure built from the database and kept in memory, replaced when
+    `key(db)` changes (by default the catalog generation).
+
+    The key is checked at most every CATALOG_CHECK_SECONDS, so lookups in
+    between cost an attribute read. When it changed, or the structure is
+    older than the response cache TTL in case a change was missed, one
+    thread rebuilds it while the others keep reading the previous one; the
+    new one then replaces it in a single assignment. Only the first load
+    waits for a build. Pass `ttl=None` for structures derived from another
+    resident one, which is already rebuilt on that schedule.
+    """
+
+    def __init__(
+        self,
+        name,
+        build,
+        key=None,
+        check_seconds=CATALOG_CHECK_SECONDS,
+        ttl=CACHE_TTL,
+    ):
+        self.name = name
+        self.build = build
+        self.key = key or (lambda db: get_backend().generation())
+        self.check_seconds = check_seconds
+        self.ttl = ttl
+
+        self.value = None
+        self.current_key = None
+        self.built = 0.0
+        self.checked = 0.0
+        self.lock = threading.Lock()
+
+    def _fresh(self, now):
+        return self.value is not None and now - self.checked < self.check_seconds
+
+    def get(self, db):
+        value = self.value
+        if self._fresh(time.monotonic()):
+            return value
+        if not self.lock.acquire(blocking=value is None):
+            return value
+
+        try:
+            now = time.monotonic()
+            if self._fresh(now):
+                return self.value
+
+            key = self.key(db)
+            if (
+                self.value is None
+                or key != self.current_key
+                or (self.ttl is not None and now - self.built > self.ttl)
+            ):
+                start = time.perf_counter()
+                self.value = self.build(db)
+                self.current_key = key
+                self.built = now
+                logger.info(f"{self.name} loaded in {time.perf_counter() - start:.2f}s")
+            self.checked = time.monotonic()
+            return self.value
+        finally:
+            self.lock.release()
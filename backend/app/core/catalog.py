@@ -0,0 +1,195 @@
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import Resident, get_backend
+from app.core.schemas import CurrentTLE, Satellite
+from app.core.snapshot import (
+    COLUMNS,
+    DTYPE,
+    FORMAT_VERSION,
+    Snapshot,
+    column_array,
+    read_manifest,
+    source_version,
+)
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {name: i for i, name in enumerate(DTYPE.names)}
+# The columns of a current_tles row, as served by /satellites/{id}/tle.
+TLE_FIELDS = tuple(
+    name for name, column, _ in COLUMNS if column.table.name == "current_tles"
+)
+
+
+def _converter(column, dtype):
+    """Map a field of a row's `tolist()` back to the value the ORM would give."""
+    kind = np.dtype(dtype).kind
+    if kind == "S":
+        if column.nullable:
+            return lambda value: value.decode() or None
+        return bytes.decode
+    if kind == "f" and column.nullable:
+        return lambda value: None if value != value else value
+    # Integers, non-null floats, and datetimes (NaT is already None).
+    return None
+
+
+CONVERTERS = {name: _converter(column, dtype) for name, column, dtype in COLUMNS}
+
+
+def _picks(fields):
+    return [(name, FIELDS[name], CONVERTERS[name]) for name in fields or FIELDS]
+
+
+def _record(values, picks):
+    return {
+        name: values[i] if convert is None else convert(values[i])
+        for name, i, convert in picks
+    }
+
+
+class Catalog:
+    """Current element sets and satellite metadata, resident in memory.
+
+    The rows are one NumPy structured array, a few hundred bytes per
+    satellite, with a NORAD id to row dict beside it. A catalog is never
+    modified: syncs produce a new one that `load_catalog` swaps in whole,
+    so a reader holding one sees a single consistent version.
+    """
+
+    def __init__(self, rows, built_at=None):
+        self.rows = rows
+        self.built_at = built_at
+        self.index = dict(zip(rows["norad_cat_id"].tolist(), range(len(rows))))
+
+    @classmethod
+    def from_db(cls, db: Session):
+        rows = db.execute(
+            select(*(column for _, column, _ in COLUMNS))
+            .join(Satellite, Satellite.id == CurrentTLE.satellite_id)
+            .order_by(CurrentTLE.norad_cat_id)
+        ).all()
+
+        array = np.empty(len(rows), dtype=DTYPE)
+        for i, (name, _, dtype) in enumerate(COLUMNS):
+            array[name] = column_array([row[i] for row in rows], dtype)
+        return cls(array, time.time())
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Copy a published snapshot's memory-mapped columns into one array,
+        which skips the query and the per-value conversion."""
+        array = np.empty(len(snapshot), dtype=DTYPE)
+        for name in DTYPE.names:
+            array[name] = snapshot[name]
+        return cls(array, time.time())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, norad_cat_id):
+        return norad_cat_id in self.index
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes
+
+    def positions(self, norad_cat_ids=None):
+        """Rows of those satellites that are in the catalog (all for None),
+        in NORAD id order."""
+        if norad_cat_ids is None:
+            return np.arange(len(self.rows))
+        index = self.index
+        return np.unique(
+            np.array([index[n] for n in norad_cat_ids if n in index], dtype=np.int64)
+        )
+
+    def filter(self, positions=None, object_type=None, country=None):
+        """Narrow `positions` (default: all rows) to a type and/or country."""
+        positions = self.positions() if positions is None else positions
+        mask = np.ones(len(positions), dtype=bool)
+        if object_type is not None:
+            mask &= self.rows["object_type"][positions] == object_type.encode()
+        if country is not None:
+            mask &= self.rows["country"][positions] == country.encode()
+        return positions[mask]
+
+    def records(self, positions, fields=None):
+        """Rows at `positions` as dicts of Python values."""
+        picks = _picks(fields)
+        return [_record(row, picks) for row in self.rows[positions].tolist()]
+
+    def get(self, norad_cat_id, fields=None):
+        """One satellite's row as a dict, or None when it has no current TLE."""
+        i = self.index.get(norad_cat_id)
+        if i is None:
+            return None
+        return _record(self.rows[i].item(), _picks(fields))
+
+    def lines(self, positions=None):
+        """(line1, line2) pairs at `positions`, the propagator's inputs."""
+        rows = self.rows if positions is None else self.rows[positions]
+        return list(
+            zip(
+                np.char.decode(rows["tle_line1"], "ascii").tolist(),
+                np.char.decode(rows["tle_line2"], "ascii").tolist(),
+            )
+        )
+
+
+def _catalog_key(db: Session):
+    # A sync bumps the generation after each commit and publishes a snapshot
+    # when it finishes; without a snapshot current_tles itself is checked.
+    manifest = read_manifest()
+    if manifest is not None:
+        return get_backend().generation(), manifest["version"]
+    return (get_backend().generation(),) + tuple(
+        db.execute(
+            select(func.count(), func.max(CurrentTLE.updated_at)).select_from(
+                CurrentTLE
+            )
+        ).one()
+    )
+
+
+def _snapshot_is_current(db: Session, manifest):
+    """Whether nothing has been committed since the snapshot was written."""
+    return (
+        manifest is not None
+        and manifest.get("format") == FORMAT_VERSION
+        and manifest.get("source") == source_version(db)
+    )
+
+
+def _build(db: Session):
+    """A new catalog, from the latest snapshot while it is current,
+    otherwise from the database."""
+    manifest = read_manifest()
+    catalog, source = None, "snapshot"
+    if _snapshot_is_current(db, manifest):
+        try:
+            catalog = Catalog.from_snapshot(Snapshot(manifest))
+        except FileNotFoundError:
+            # Pruned by a newer sync since the manifest was read.
+            pass
+    if catalog is None:
+        catalog, source = Catalog.from_db(db), "database"
+
+    logger.info(
+        f"Catalog loaded from the {source}: {len(catalog)} satellites, "
+        f"{catalog.nbytes / 1024:.0f} KiB"
+    )
+    return catalog
+
+
+_catalog = Resident("Catalog", _build, key=_catalog_key)
+
+
+def load_catalog(db: Session):
+    """The resident catalog, replaced after each sync."""
+    return _catalog.get(db)
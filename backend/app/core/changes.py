@@ -0,0 +1,125 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.locks import lock_id
+from app.core.schemas import RF, Change, CurrentTLE
+
+CHANGE_RETENTION = timedelta(hours=float(os.environ.get("CHANGE_RETENTION_HOURS", 48)))
+# Changes read per poll; a larger backlog is drained over several polls.
+CHANGE_BATCH = int(os.environ.get("CHANGE_BATCH", 5000))
+
+TLE = "tle"
+RFS = "rf"
+
+TLE_FIELDS = (
+    CurrentTLE.norad_cat_id,
+    CurrentTLE.object_name,
+    CurrentTLE.epoch,
+    CurrentTLE.tle_line1,
+    CurrentTLE.tle_line2,
+)
+TRANSMITTER_FIELDS = (
+    RF.norad_cat_id,
+    RF.uuid,
+    RF.description,
+    RF.alive,
+    RF.mode,
+    RF.service,
+    RF.status,
+    RF.uplink_low,
+    RF.uplink_high,
+    RF.downlink_low,
+    RF.downlink_high,
+)
+
+
+def record_changes(db: Session, source, norad_cat_ids, now=None):
+    """Record that `norad_cat_ids` changed, in the caller's transaction.
+
+    The feed therefore sees the changes exactly when the rows they describe
+    are committed. Changes older than CHANGE_RETENTION are pruned here too.
+
+    Readers only move forward past the highest id they have seen, so ids
+    must become visible in order. On PostgreSQL the TLE and RF syncs run
+    concurrently and take ids from the sequence before they commit; a
+    transaction-level advisory lock, held from here until the caller
+    commits, keeps a lower id from committing after a higher one. The
+    caller should commit straight after this.
+    """
+    now = now or datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": lock_id("changes")}
+        )
+    if norad_cat_ids:
+        db.execute(
+            insert(Change),
+            [
+                {"created_at": now, "source": source, "norad_cat_id": n}
+                for n in sorted(norad_cat_ids)
+            ],
+        )
+    db.execute(delete(Change).where(Change.created_at < now - CHANGE_RETENTION))
+
+
+def latest_change_id(db: Session):
+    return db.scalar(select(func.max(Change.id))) or 0
+
+
+def load_changes(db: Session, after, until=None, limit=CHANGE_BATCH):
+    """Change events with ids in (after, until], and the last id read.
+
+    Each event carries the satellite's current state rather than a row-level
+    diff: its latest element set for `tle`, or all its transmitters for `rf`.
+    Repeated changes to one satellite within the batch collapse into one
+    event at the latest id.
+    """
+    query = select(Change.id, Change.source, Change.norad_cat_id).where(
+        Change.id > after
+    )
+    if until is not None:
+        query = query.where(Change.id <= until)
+    changes = db.execute(query.order_by(Change.id).limit(limit)).all()
+    if not changes:
+        return [], after
+
+    latest = {(source, n): change_id for change_id, source, n in changes}
+    tle_ids = [n for source, n in latest if source == TLE]
+    rf_ids = [n for source, n in latest if source == RFS]
+
+    tles = {}
+    if tle_ids:
+        for row in db.execute(
+            select(*TLE_FIELDS).where(CurrentTLE.norad_cat_id.in_(tle_ids))
+        ).mappings():
+            tles[row["norad_cat_id"]] = dict(row)
+
+    transmitters = {}
+    if rf_ids:
+        for row in db.execute(
+            select(*TRANSMITTER_FIELDS)
+            .where(RF.norad_cat_id.in_(rf_ids))
+            .order_by(RF.id)
+        ).mappings():
+            row = dict(row)
+            transmitters.setdefault(row.pop("norad_cat_id"), []).append(row)
+
+    events = []
+    for (source, n), change_id in sorted(latest.items(), key=lambda item: item[1]):
+        if source == TLE:
+            if n not in tles:
+                continue
+            events.append({"id": change_id, "type": TLE, **tles[n]})
+        else:
+            events.append(
+                {
+                    "id": change_id,
+                    "type": RFS,
+                    "norad_cat_id": n,
+                    "transmitters": transmitters.get(n, []),
+                }
+            )
+    return events, changes[-1].id
@@ -4,11 +4,52 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from app.core.metrics import instrument_engine
 
 url = os.getenv("DATABASE_URL") or "postgresql://postgres:postgres@db:5432/satdata"
+# Optional streaming replica for the API's read-only queries. Jobs and the
+# Syncer always use the primary. Reads after a sync may lag the primary by
+# the replication delay.
+replica_url = os.getenv("DATABASE_REPLICA_URL")
 
-engine = create_engine(url)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+
+def pool_options(url):
+    """Pool settings from the environment.
+
+    Every job, sync source and API thread checks out its own connection, so
+    DB_POOL_SIZE + DB_MAX_OVERFLOW bounds how many of them query at once;
+    the rest wait up to DB_POOL_TIMEOUT seconds for a connection. In-memory
+    SQLite uses a single-connection pool that takes none of these.
+    """
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower()
+        in ("1", "true", "yes")
+    }
+    if ":memory:" not in url and url != "sqlite://":
+        options.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        )
+    return options
+
+
+engine = create_engine(url, **pool_options(url))
+instrument_engine(engine, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if replica_url:
+    read_engine = create_engine(replica_url, **pool_options(replica_url))
+    instrument_engine(read_engine, "replica")
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
 
@@ -18,3 +59,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only routes, on the replica when one is configured."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,314 @@
+"""TLE history storage: monthly range partitions by epoch and retention.
+
+On PostgreSQL `tles` is partitioned by month of `epoch`, so inserts only
+touch the current partitions' indexes and history queries with an epoch
+range prune to the months they cover. Other databases keep a plain table;
+retention works on both.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, extract, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.schemas import TLE
+from app.fetchers.cursors import get_cursor
+
+logger = logging.getLogger(__name__)
+
+# Element sets newer than this are kept as fetched; older ones are thinned
+# to the last one per satellite and day.
+FULL_RESOLUTION_DAYS = int(os.environ.get("TLE_FULL_RESOLUTION_DAYS", 90))
+RETENTION = "tles:retention"
+# Rows fetched this long before the previous run started are looked at
+# again, in case a sync was still committing them while it ran.
+RETENTION_OVERLAP = timedelta(days=1)
+
+COPY_DEDUPLICATED = (
+    "INSERT INTO tles "
+    "SELECT DISTINCT ON (satellite_id, epoch) * FROM tles_unpartitioned "
+    "ORDER BY satellite_id, epoch, id DESC"
+)
+
+_partitions = {"partitioned": None, "months": set()}
+_partitions_lock = threading.Lock()
+
+
+def _month(t):
+    return datetime(t.year, t.month, 1)
+
+
+def _next_month(t):
+    return datetime(t.year + t.month // 12, t.month % 12 + 1, 1)
+
+
+def _partition_name(month):
+    return f"tles_y{month.year}m{month.month:02d}"
+
+
+def _create_partition(conn, month):
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF tles "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+        )
+    )
+
+
+def is_partitioned(conn):
+    return (
+        conn.dialect.name == "postgresql"
+        and conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass('tles')")
+        ).scalar()
+        == "p"
+    )
+
+
+def _widen_columns(conn):
+    """Bring `tles` string columns up to the lengths the model declares.
+
+    `create_all` leaves existing tables alone, so a column widened in the
+    model would still refuse the longer values the parser now lets through,
+    failing the whole insert batch. On a partitioned table the ALTER
+    carries over to every partition.
+    """
+    lengths = dict(
+        conn.execute(
+            text(
+                "SELECT column_name, character_maximum_length "
+                "FROM information_schema.columns "
+                "WHERE table_name = 'tles' AND table_schema = current_schema()"
+            )
+        ).all()
+    )
+    for column in TLE.__table__.columns:
+        length = getattr(column.type, "length", None)
+        if length and lengths.get(column.name) and lengths[column.name] < length:
+            conn.execute(
+                text(
+                    f'ALTER TABLE tles ALTER COLUMN "{column.name}" '
+                    f"TYPE varchar({length})"
+                )
+            )
+            logger.info(
+                f"Widened tles.{column.name} from {lengths[column.name]} "
+                f"to {length} characters"
+            )
+
+
+def partition_tles(engine):
+    """Convert a plain `tles` table into a partitioned one, moving its rows.
+
+    Idempotent; a no-op outside PostgreSQL. The primary key becomes
+    (id, epoch) since it has to include the partition key. Columns the
+    model has since widened are widened first.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        _widen_columns(conn)
+        if is_partitioned(conn):
+            return
+
+        start = time.perf_counter()
+        conn.execute(text("LOCK TABLE tles IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text("ALTER TABLE tles RENAME TO tles_unpartitioned"))
+
+        # Index and constraint names are schema-wide, so free them for the
+        # new table before recreating them there.
+        for (name,) in conn.execute(
+            text(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = 'tles_unpartitioned'::regclass"
+            )
+        ).all():
+            conn.execute(
+                text(f'ALTER TABLE tles_unpartitioned DROP CONSTRAINT "{name}"')
+            )
+        for (name,) in conn.execute(
+            text(
+                "SELECT indexname FROM pg_indexes WHERE tablename = 'tles_unpartitioned'"
+            )
+        ).all():
+            conn.execute(text(f'DROP INDEX "{name}"'))
+
+        conn.execute(
+            text(
+                "CREATE TABLE tles (LIKE tles_unpartitioned INCLUDING DEFAULTS) "
+                "PARTITION BY RANGE (epoch)"
+            )
+        )
+        conn.execute(text("ALTER TABLE tles ADD PRIMARY KEY (id, epoch)"))
+        conn.execute(
+            text(
+                "ALTER TABLE tles ADD CONSTRAINT idx_tle_unique_per_satellite "
+                "UNIQUE (satellite_id, epoch)"
+            )
+        )
+        conn.execute(
+            text(
+                "ALTER TABLE tles ADD FOREIGN KEY (satellite_id) "
+                "REFERENCES satellites (id) ON DELETE CASCADE"
+            )
+        )
+        for index in TLE.__table__.indexes:
+            index.create(conn)
+
+        first, last = conn.execute(
+            text("SELECT min(epoch), max(epoch) FROM tles_unpartitioned")
+        ).one()
+        month = _month(first or datetime.utcnow())
+        while month <= _month(max(last or month, datetime.utcnow())):
+            _create_partition(conn, month)
+            month = _next_month(month)
+
+        # The unique constraint is new, so older tables can hold repeats of a
+        # (satellite_id, epoch); the copy keeps the latest row of each.
+        total = conn.scalar(text("SELECT count(*) FROM tles_unpartitioned"))
+        moved = conn.execute(text(COPY_DEDUPLICATED)).rowcount
+        conn.execute(text("ALTER SEQUENCE IF EXISTS tles_id_seq OWNED BY tles.id"))
+        conn.execute(text("DROP TABLE tles_unpartitioned"))
+
+    with _partitions_lock:
+        _partitions["partitioned"] = None
+    logger.info(
+        f"Partitioned tles by epoch month, {moved} rows moved "
+        f"({total - moved} duplicates dropped) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def _existing_months(conn):
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'tles'::regclass"
+        )
+    ).scalars()
+    return {
+        datetime(int(name[6:10]), int(name[11:13]), 1)
+        for name in names
+        if name.startswith("tles_y")
+    }
+
+
+def ensure_partitions(db: Session, epochs):
+    """Create the monthly partitions that rows with these epochs go into.
+
+    Creating a partition locks the whole table until the transaction ends,
+    so upcoming months are created ahead of time by
+    `create_upcoming_partitions`; this only catches back-filled epochs.
+    """
+    conn = db.connection()
+    with _partitions_lock:
+        if _partitions["partitioned"] is None:
+            _partitions["partitioned"] = is_partitioned(conn)
+            if _partitions["partitioned"]:
+                _partitions["months"] = _existing_months(conn)
+        if not _partitions["partitioned"]:
+            return
+
+        for month in {_month(epoch) for epoch in epochs} - _partitions["months"]:
+            _create_partition(conn, month)
+            _partitions["months"].add(month)
+
+
+def create_upcoming_partitions(engine, months=2):
+    """Make sure this month's and the next `months - 1` partitions exist."""
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return
+        month = _month(datetime.utcnow())
+        for _ in range(months):
+            _create_partition(conn, month)
+            month = _next_month(month)
+
+    with _partitions_lock:
+        _partitions["partitioned"] = None
+
+
+def _months(start, stop):
+    month = _month(start)
+    while month < stop:
+        yield month
+        month = _next_month(month)
+
+
+def _months_to_thin(db: Session, cursor, cutoff):
+    """Months before `cutoff` that may hold element sets not yet thinned.
+
+    Those are the months the cutoff moved across since the previous run
+    (kept in the cursor), plus the months of any rows fetched since then,
+    which is where back-fill lands. A run therefore reads about what was
+    written since the last one, not the whole history; only the first run
+    covers everything.
+    """
+    if cursor.last_updated is None:
+        first = db.scalar(select(func.min(TLE.epoch)))
+        return list(_months(first, cutoff)) if first is not None else []
+
+    previous = cursor.last_epoch or cutoff
+    months = set(_months(previous, cutoff)) if previous < cutoff else set()
+    fetched = db.execute(
+        select(extract("year", TLE.epoch), extract("month", TLE.epoch))
+        .where(
+            TLE.fetched_at >= cursor.last_updated - RETENTION_OVERLAP,
+            TLE.epoch < cutoff,
+        )
+        .distinct()
+    ).all()
+    months.update(datetime(int(year), int(month), 1) for year, month in fetched)
+    return sorted(months)
+
+
+def apply_retention(db: Session, now=None, full_resolution_days=FULL_RESOLUTION_DAYS):
+    """Keep only the last element set per satellite and UTC day for history
+    older than `full_resolution_days`.
+
+    History back-filled after a month was thinned is thinned on the next
+    run (see `_months_to_thin`). Each month is thinned in its own statement
+    and transaction, so each prunes to a single partition.
+    """
+    started = datetime.utcnow()
+    cutoff = (now or started) - timedelta(days=full_resolution_days)
+    cutoff = datetime(cutoff.year, cutoff.month, cutoff.day)
+    cursor = get_cursor(db, RETENTION)
+
+    removed = 0
+    for month in _months_to_thin(db, cursor, cutoff):
+        in_range = (TLE.epoch >= month, TLE.epoch < min(_next_month(month), cutoff))
+        ranked = (
+            select(
+                TLE.id,
+                func.row_number()
+                .over(
+                    partition_by=(TLE.satellite_id, func.date(TLE.epoch)),
+                    order_by=(TLE.epoch.desc(), TLE.id.desc()),
+                )
+                .label("rank"),
+            )
+            .where(*in_range)
+            .subquery()
+        )
+        removed += db.execute(
+            delete(TLE).where(
+                *in_range, TLE.id.in_(select(ranked.c.id).where(ranked.c.rank > 1))
+            )
+        ).rowcount
+        db.commit()
+
+    # `last_epoch` is this run's cutoff, `last_updated` when it started.
+    cursor.last_epoch = max(cutoff, cursor.last_epoch or cutoff)
+    cursor.last_updated = started
+    db.commit()
+
+    logger.info(
+        f"TLE retention: {removed} element sets thinned before {cutoff:%Y-%m-%d}"
+    )
+    return removed
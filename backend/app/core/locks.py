@@ -0,0 +1,55 @@
+import fcntl
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+LOCK_DIR = os.environ.get("JOB_LOCK_DIR", tempfile.gettempdir())
+
+
+def lock_id(name):
+    """Stable signed 64-bit key for a PostgreSQL advisory lock."""
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def job_lock(engine, name):
+    """Try to take an exclusive cross-process lock, yielding whether it was acquired.
+
+    PostgreSQL uses a session-level advisory lock held on a dedicated
+    connection for the duration of the block, so it covers every process
+    sharing the database. Other databases fall back to an flock()ed file in
+    `JOB_LOCK_DIR`, which only covers processes on the same host.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            key = lock_id(name)
+            acquired = conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+            )
+            # The lock belongs to the session, not the transaction; don't sit
+            # idle in a transaction while the job runs.
+            conn.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                    conn.commit()
+        return
+
+    path = os.path.join(LOCK_DIR, f"astrobridge-{name}.lock")
+    with open(path, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
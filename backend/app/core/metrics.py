@@ -0,0 +1,207 @@
+"""Prometheus metrics shared by the API and the worker.
+
+The API serves them at `/metrics`; the worker, which has no HTTP server of
+its own, exposes them on `METRICS_PORT` when it is set.
+"""
+
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# --- API ---
+HTTP_REQUESTS = Histogram(
+    "astrobridge_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "astrobridge_http_requests_in_progress", "Requests currently being handled."
+)
+CACHE_REQUESTS = Counter(
+    "astrobridge_cache_requests_total",
+    "Cacheable GET requests by response cache outcome.",
+    ["route", "status"],
+)
+STREAM_SUBSCRIBERS = Gauge(
+    "astrobridge_stream_subscribers",
+    "Open server-sent event streams per feed.",
+    ["feed"],
+)
+STREAM_EVENTS = Counter(
+    "astrobridge_stream_events_total",
+    "Events sent to stream subscribers per feed.",
+    ["feed"],
+)
+
+# --- database ---
+DB_QUERIES = Histogram(
+    "astrobridge_db_query_duration_seconds",
+    "Statement execution time, by the statement's leading keyword.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_ERRORS = Counter(
+    "astrobridge_db_errors_total", "Statements that raised a database error."
+)
+DB_CHECKOUTS = Counter(
+    "astrobridge_db_pool_checkouts_total", "Connections checked out of the pool."
+)
+DB_CONNECTS = Counter(
+    "astrobridge_db_pool_connects_total", "New DBAPI connections opened by the pool."
+)
+
+# --- sync ---
+SYNC_STAGES = Histogram(
+    "astrobridge_sync_stage_seconds",
+    "Time per batch spent fetching (network and JSON decoding), parsing "
+    "into rows and writing them.",
+    ["source", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+SYNC_RECORDS = Counter(
+    "astrobridge_sync_records_total", "Records received per source.", ["source"]
+)
+SYNC_STAGE_ROWS = Counter(
+    "astrobridge_sync_stage_rows_total",
+    "Records through each sync stage; divide by the stage's seconds for "
+    "its throughput.",
+    ["source", "stage"],
+)
+SYNC_REJECTED = Counter(
+    "astrobridge_sync_rejected_total",
+    "Records that failed parsing or validation and went to the dead-letter table.",
+    ["source"],
+)
+SYNC_LAST_SUCCESS = Gauge(
+    "astrobridge_sync_last_success_timestamp_seconds",
+    "When each source last synced successfully.",
+    ["source"],
+)
+BULK_ROWS = Counter(
+    "astrobridge_bulk_rows_total",
+    "Rows given to the bulk writer, by whether they were written or skipped "
+    "as already present.",
+    ["table", "result"],
+)
+FETCH_BYTES = Counter(
+    "astrobridge_fetch_bytes_total", "Response bytes downloaded per host.", ["host"]
+)
+FETCH_REQUESTS = Counter(
+    "astrobridge_fetch_requests_total",
+    "Upstream HTTP requests per host and status; `error` for transport errors.",
+    ["host", "status"],
+)
+JOBS = Histogram(
+    "astrobridge_job_duration_seconds",
+    "Duration of the scheduled jobs.",
+    ["job"],
+    buckets=JOB_BUCKETS,
+)
+JOB_LAST_RUN = Gauge(
+    "astrobridge_job_last_run_timestamp_seconds",
+    "When each scheduled job last finished.",
+    ["job"],
+)
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT"}
+
+
+def _operation(statement):
+    keyword = statement.lstrip()[:10].split(None, 1)
+    keyword = keyword[0].upper() if keyword else ""
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+class PoolCollector:
+    """Connection pool occupancy per engine, read from the pools at scrape time."""
+
+    def __init__(self):
+        self.engines = {}
+
+    def collect(self):
+        families = {
+            name: GaugeMetricFamily(
+                f"astrobridge_db_pool_{name}", documentation, labels=["engine"]
+            )
+            for name, documentation in (
+                ("size", "Configured number of persistent connections."),
+                ("limit", "Most connections the pool will open, with overflow."),
+                ("checked_out", "Connections currently in use."),
+                ("idle", "Open connections waiting in the pool."),
+                ("saturation", "Connections in use as a fraction of the limit."),
+            )
+        }
+        for label, engine in self.engines.items():
+            pool = engine.pool
+            if not hasattr(pool, "checkedout"):
+                continue
+
+            limit = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+            checked_out = pool.checkedout()
+            for name, value in (
+                ("size", pool.size()),
+                ("limit", limit),
+                ("checked_out", checked_out),
+                ("idle", pool.checkedin()),
+                ("saturation", checked_out / limit if limit else 0.0),
+            ):
+                families[name].add_metric([label], value)
+        yield from families.values()
+
+
+POOLS = PoolCollector()
+REGISTRY.register(POOLS)
+
+
+def instrument_engine(engine, name="primary"):
+    """Time every statement and report pool occupancy for `engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        DB_QUERIES.labels(_operation(statement)).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def error(context):
+        DB_ERRORS.inc()
+        # after_cursor_execute does not run for a failed statement.
+        if context.connection is not None and context.connection.info.get(
+            "query_start"
+        ):
+            context.connection.info["query_start"].pop()
+
+    @event.listens_for(engine.pool, "checkout")
+    def checkout(dbapi_connection, record, proxy):
+        DB_CHECKOUTS.inc()
+
+    @event.listens_for(engine.pool, "connect")
+    def connect(dbapi_connection, record):
+        DB_CONNECTS.inc()
+
+    POOLS.engines[name] = engine
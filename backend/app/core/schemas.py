@@ -2,12 +2,14 @@ from re import I
 from sqlalchemy import (
     Column,
     String,
+    Text,
     Enum,
     Double,
     Boolean,
     DateTime,
     Date,
     ForeignKey,
+    Index,
     UniqueConstraint,
 )
 
@@ -88,7 +90,7 @@ class TLE(Base):
     )
 
     # --- TLE standard fields ---
-    comment = Column(String(32), nullable=False)
+    comment = Column(String(64), nullable=False)
     originator = Column(String(7), nullable=False)
     norad_cat_id = Column(INTEGER(unsigned=True), index=True)
     object_name = Column(String(25), nullable=False)
@@ -137,9 +139,48 @@ class TLE(Base):
     decayed = Column(SMALLINT(unsigned=True), default=0)
 
     # --- constraints ---
-    # __table_args__ = (
-    #     UniqueConstraint("satellite_id", "epoch", name="idx_tle_unique_per_satellite"),
-    # )
+    # On PostgreSQL the table is range-partitioned by epoch month, see
+    # app.core.history.
+    __table_args__ = (
+        UniqueConstraint("satellite_id", "epoch", name="idx_tle_unique_per_satellite"),
+        Index("ix_tles_norad_cat_id_epoch", "norad_cat_id", "epoch"),
+    )
+
+
+class CurrentTLE(Base):
+    """Latest element set per satellite, maintained by the Syncer."""
+
+    __tablename__ = "current_tles"
+
+    satellite_id = Column(
+        INTEGER(unsigned=True),
+        ForeignKey("satellites.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    norad_cat_id = Column(INTEGER(unsigned=True), unique=True, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    object_name = Column(String(25), nullable=False)
+    epoch = Column(DateTime, nullable=False)
+
+    mean_motion = Column(Double, nullable=False, default=0)
+    eccentricity = Column(Double, nullable=False, default=0)
+    inclination = Column(Double, nullable=False, default=0)
+    ra_of_asc_node = Column(Double, nullable=False, default=0)
+    arg_of_pericenter = Column(Double, nullable=False, default=0)
+    mean_anomaly = Column(Double, nullable=False, default=0)
+    bstar = Column(Double, nullable=False, default=0)
+    mean_motion_dot = Column(Double, nullable=False, default=0)
+    mean_motion_ddot = Column(Double, nullable=False, default=0)
+
+    tle_line0 = Column(String(27), nullable=False)
+    tle_line1 = Column(String(71), nullable=False)
+    tle_line2 = Column(String(71), nullable=False)
+
+    semimajor_axis = Column(DECIMAL(20, 3), nullable=False, default=0.000)
+    period = Column(DECIMAL(20, 3))
+    apogee = Column(DECIMAL(20, 3), nullable=False, default=0.000)
+    perigee = Column(DECIMAL(20, 3), nullable=False, default=0.000)
 
 
 class RF(Base):
@@ -234,3 +275,159 @@ class RF(Base):
     # __table_args__ = (
     #     UniqueConstraint("satellite_id", name="idx_rf_unique_per_satellite"),
     # )
+
+
+class SyncCursor(Base):
+    __tablename__ = "sync_cursors"
+
+    source = Column(String(32), primary_key=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # --- high-water marks ---
+    last_file = Column(BIGINT, nullable=True)
+    last_epoch = Column(DateTime, nullable=True)
+    last_updated = Column(DateTime, nullable=True)
+
+    last_full_sync = Column(DateTime, nullable=True)
+
+
+class DeadLetter(Base):
+    """A fetched record the Syncer could not parse or that failed validation."""
+
+    __tablename__ = "dead_letters"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    source = Column(String(32), nullable=False, index=True)
+    record_key = Column(String(64), nullable=True)
+    error = Column(String(512), nullable=False)
+    record = Column(Text, nullable=False)  # the record as received, JSON
+
+
+class Change(Base):
+    """A satellite that got new TLEs or transmitters in a sync, for `/stream`."""
+
+    __tablename__ = "changes"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    source = Column(String(8), nullable=False)  # "tle" or "rf"
+    norad_cat_id = Column(BIGINT, nullable=False)
+
+
+class ConjunctionScreening(Base):
+    __tablename__ = "conjunction_screenings"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # --- screening parameters ---
+    start = Column(DateTime, nullable=False)
+    stop = Column(DateTime, nullable=False)
+    threshold = Column(Double, nullable=False)
+    step = Column(Double, nullable=False)
+
+    # --- run statistics ---
+    satellites = Column(INTEGER, nullable=False, default=0)
+    candidates = Column(BIGINT, nullable=False, default=0)
+    conjunctions = Column(INTEGER, nullable=False, default=0)
+    seconds = Column(Double, nullable=True)
+
+
+class Conjunction(Base):
+    __tablename__ = "conjunctions"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+
+    screening_id = Column(
+        INTEGER(unsigned=True),
+        ForeignKey("conjunction_screenings.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # --- pair, primary has the lower NORAD id ---
+    primary_norad_cat_id = Column(BIGINT, nullable=False, index=True)
+    secondary_norad_cat_id = Column(BIGINT, nullable=False, index=True)
+
+    # --- closest approach ---
+    tca = Column(DateTime, nullable=False, index=True)
+    miss_distance = Column(Double, nullable=False)
+    relative_speed = Column(Double, nullable=True)
+
+
+class SubPoint(Base):
+    __tablename__ = "subpoints"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+
+    # --- one row per satellite per time slot ---
+    time = Column(DateTime, nullable=False)
+    norad_cat_id = Column(BIGINT, nullable=False)
+
+    # --- ground track ---
+    lat = Column(Double, nullable=False)
+    lon = Column(Double, nullable=False)
+    alt = Column(Double, nullable=False)
+    # Ground distance (km) from the sub-point to the horizon circle.
+    footprint = Column(Double, nullable=False)
+
+    # On PostgreSQL a generated PostGIS `geog` point and its GiST index are
+    # added by app.propagation.subpoints.
+    __table_args__ = (
+        Index("ix_subpoints_time_footprint", "time", "footprint"),
+        Index("ix_subpoints_time_lat", "time", "lat"),
+    )
+
+
+class OrbitTrend(Base):
+    """Per-satellite summary of the element history, see app.propagation.trends."""
+
+    __tablename__ = "orbit_trends"
+
+    norad_cat_id = Column(BIGINT, primary_key=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # --- latest element set analysed ---
+    last_epoch = Column(DateTime, nullable=False)
+
+    # --- latest elements ---
+    semimajor_axis = Column(Double, nullable=True)
+    perigee = Column(Double, nullable=True)
+    apogee = Column(Double, nullable=True)
+    inclination = Column(Double, nullable=True)
+    bstar = Column(Double, nullable=True)
+
+    # --- decay: semimajor axis change in km/day, negative when decaying ---
+    decay_rate = Column(Double, nullable=True)
+    decay_rate_error = Column(Double, nullable=True)
+    # Element sets in the fit; 0 when the rate comes from mean_motion_dot.
+    fit_points = Column(INTEGER, nullable=False, default=0)
+    reentry_earliest = Column(DateTime, nullable=True, index=True)
+    reentry = Column(DateTime, nullable=True)
+    reentry_latest = Column(DateTime, nullable=True)
+
+    # --- manoeuvres ---
+    manoeuvres = Column(INTEGER, nullable=False, default=0)
+    last_manoeuvre = Column(DateTime, nullable=True, index=True)
+
+
+class Manoeuvre(Base):
+    __tablename__ = "manoeuvres"
+
+    id = Column(INTEGER(unsigned=True), primary_key=True)
+    norad_cat_id = Column(BIGINT, nullable=False)
+
+    # --- the element sets either side of the discontinuity ---
+    before_epoch = Column(DateTime, nullable=False)
+    epoch = Column(DateTime, nullable=False, index=True)
+
+    # --- unexplained change; semimajor axis in km, inclination in degrees ---
+    delta_semimajor_axis = Column(Double, nullable=False)
+    delta_inclination = Column(Double, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("norad_cat_id", "epoch", name="idx_manoeuvre_per_epoch"),
+    )
@@ -0,0 +1,186 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import Resident
+from app.core.schemas import Satellite
+
+FIELDS = (
+    Satellite.norad_cat_id,
+    Satellite.satname,
+    Satellite.object_name,
+    Satellite.object_id,
+    Satellite.intldes,
+    Satellite.country,
+    Satellite.object_type,
+)
+# Lowest trigram similarity reported as a fuzzy match (pg_trgm's default).
+SIMILARITY_THRESHOLD = 0.3
+# Prefix-match weights by the field the term came from, plus a bonus when
+# the query word is the whole term.
+NAME, IDENTIFIER, COUNTRY = 2.0, 1.5, 1.0
+EXACT_WORD = 0.1
+
+SEPARATORS = re.compile(r"[^0-9A-Z]+")
+
+
+def words(value):
+    return [w for w in SEPARATORS.split((value or "").upper()) if w]
+
+
+def trigrams(value):
+    """pg_trgm-style trigrams: each word padded with two leading blanks and one
+    trailing blank."""
+    grams = set()
+    for word in words(value):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """Prefix and trigram index over satellite names and identifiers.
+
+    Prefix search runs over a sorted array of terms (name words, whole names
+    and identifiers with their separators removed, NORAD id, country), so a
+    prefix is two binary searches. Fuzzy search counts shared name trigrams
+    through per-trigram posting arrays. Scores are accumulated in dense
+    per-satellite arrays, so a query costs the same however many match.
+    """
+
+    def __init__(self, satellites):
+        self.satellites = satellites
+
+        terms, term_docs, term_weights = [], [], []
+        postings = defaultdict(list)
+        sizes = []
+        for doc, sat in enumerate(satellites):
+            names = {sat["satname"] or "", sat["object_name"] or ""}
+            doc_terms = {str(sat["norad_cat_id"]): IDENTIFIER}
+            for value, weight in (
+                (sat["object_id"], IDENTIFIER),
+                (sat["intldes"], IDENTIFIER),
+                (sat["country"], COUNTRY),
+                *((name, NAME) for name in names),
+            ):
+                parts = words(value)
+                for term in (*parts, "".join(parts)):
+                    if term:
+                        doc_terms[term] = max(weight, doc_terms.get(term, 0.0))
+            terms.extend(doc_terms)
+            term_docs.extend([doc] * len(doc_terms))
+            term_weights.extend(doc_terms.values())
+
+            grams = set().union(*(trigrams(name) for name in names))
+            for gram in grams:
+                postings[gram].append(doc)
+            sizes.append(len(grams))
+
+        terms = np.array(terms, dtype=str)
+        order = np.argsort(terms, kind="stable")
+        self.terms = terms[order]
+        self.term_docs = np.array(term_docs, dtype=np.int64)[order]
+        self.term_weights = np.array(term_weights)[order]
+        self.postings = {
+            gram: np.array(docs, dtype=np.int64) for gram, docs in postings.items()
+        }
+        self.sizes = np.array(sizes, dtype=np.int64)
+        # Ties rank shorter names first, then lower NORAD ids (the doc order).
+        self.tiebreak = np.array(
+            [len(sat["satname"] or "") * 1e-4 for sat in satellites]
+        )
+
+    def __len__(self):
+        return len(self.satellites)
+
+    def _range(self, term, prefix=True):
+        lo = np.searchsorted(self.terms, term, side="left")
+        hi = np.searchsorted(
+            self.terms, term + "\uffff" if prefix else term, side="right"
+        )
+        return slice(lo, hi)
+
+    def prefixed(self, token):
+        """Per-satellite weight of the best term starting with `token`."""
+        span = self._range(token)
+        docs = self.term_docs[span]
+        weights = self.term_weights[span].copy()
+        # Terms equal to the token sort first within its prefix range.
+        exact = self._range(token, prefix=False)
+        weights[: exact.stop - exact.start] += EXACT_WORD
+
+        best = np.zeros(len(self.satellites))
+        np.maximum.at(best, docs, weights)
+        return best
+
+    def similar(self, query):
+        """Per-satellite trigram similarity of the names to `query`."""
+        grams = trigrams(query)
+        similarity = np.zeros(len(self.satellites))
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return similarity
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.satellites))
+        docs = np.flatnonzero(shared)
+        score = shared[docs] / (len(grams) + self.sizes[docs] - shared[docs])
+        keep = score >= SIMILARITY_THRESHOLD
+        similarity[docs[keep]] = score[keep]
+        return similarity
+
+    def search(self, query, limit=20, fuzzy=True):
+        """Best matches for `query`, each a satellite dict with a `score`.
+
+        A satellite with a term equal to the whole query scores 3. One with a
+        term starting with every query word scores between 1.5 and 2.05,
+        more for name words and whole-word matches than for identifiers or
+        countries. Otherwise its fuzzy name similarity in [0.3, 1] is used.
+        """
+        tokens = words(query)
+        if not tokens:
+            return []
+
+        total = np.zeros(len(self.satellites))
+        matched = np.ones(len(self.satellites), dtype=bool)
+        for token in tokens:
+            best = self.prefixed(token)
+            total += best
+            matched &= best > 0
+
+        score = np.where(matched, 1.0 + total / len(tokens) / 2, 0.0)
+        compact = "".join(tokens)
+        if len(tokens) > 1:
+            joined = self.prefixed(compact)
+            score = np.maximum(score, np.where(joined > 0, 1.0 + joined / 2, 0.0))
+        score[self.term_docs[self._range(compact, prefix=False)]] = 3.0
+
+        if fuzzy and len(compact) >= 3:
+            score = np.maximum(score, self.similar(query))
+
+        candidates = np.flatnonzero(score)
+        key = score[candidates] - self.tiebreak[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-key, limit - 1)[:limit]
+            candidates, key = candidates[top], key[top]
+        order = np.lexsort((candidates, -key))
+
+        return [
+            {**self.satellites[doc], "score": round(float(score[doc]), 3)}
+            for doc in candidates[order].tolist()
+        ]
+
+
+def build_search_index(db: Session):
+    rows = db.execute(select(*FIELDS).order_by(Satellite.norad_cat_id)).mappings()
+    return SearchIndex([dict(row) for row in rows])
+
+
+_index = Resident("Search index", build_search_index)
+
+
+def load_search_index(db: Session):
+    """Search index over the satellite catalog, rebuilt after each sync."""
+    return _index.get(db)
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.schemas import CurrentTLE, Satellite
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.environ.get(
+    "SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "astrobridge-snapshots")
+)
+KEEP_SNAPSHOTS = int(os.environ.get("SNAPSHOT_KEEP", 3))
+
+FORMAT_VERSION = 2
+MANIFEST = "latest.json"
+
+# (name, source column, dtype); one row per satellite with a current TLE,
+# ordered by NORAD id. Strings are fixed-width bytes so every column can be
+# memory-mapped, and the in-memory catalog holds the same rows as one
+# structured array of DTYPE. NULL floats are NaN, NULL dates NaT and NULL
+# strings empty.
+COLUMNS = [
+    ("satellite_id", CurrentTLE.satellite_id, "<i4"),
+    ("norad_cat_id", CurrentTLE.norad_cat_id, "<i4"),
+    ("updated_at", CurrentTLE.updated_at, "<M8[us]"),
+    ("object_name", CurrentTLE.object_name, "S25"),
+    ("epoch", CurrentTLE.epoch, "<M8[us]"),
+    ("mean_motion", CurrentTLE.mean_motion, "<f8"),
+    ("eccentricity", CurrentTLE.eccentricity, "<f8"),
+    ("inclination", CurrentTLE.inclination, "<f8"),
+    ("ra_of_asc_node", CurrentTLE.ra_of_asc_node, "<f8"),
+    ("arg_of_pericenter", CurrentTLE.arg_of_pericenter, "<f8"),
+    ("mean_anomaly", CurrentTLE.mean_anomaly, "<f8"),
+    ("bstar", CurrentTLE.bstar, "<f8"),
+    ("mean_motion_dot", CurrentTLE.mean_motion_dot, "<f8"),
+    ("mean_motion_ddot", CurrentTLE.mean_motion_ddot, "<f8"),
+    ("tle_line0", CurrentTLE.tle_line0, "S27"),
+    ("tle_line1", CurrentTLE.tle_line1, "S71"),
+    ("tle_line2", CurrentTLE.tle_line2, "S71"),
+    ("semimajor_axis", CurrentTLE.semimajor_axis, "<f8"),
+    ("period", CurrentTLE.period, "<f8"),
+    ("apogee", CurrentTLE.apogee, "<f8"),
+    ("perigee", CurrentTLE.perigee, "<f8"),
+    ("satname", Satellite.satname, "S25"),
+    ("object_type", Satellite.object_type, "S12"),
+    ("country", Satellite.country, "S6"),
+    ("intldes", Satellite.intldes, "S12"),
+    ("launch", Satellite.launch, "<M8[D]"),
+    ("decay", Satellite.decay, "<M8[D]"),
+]
+DTYPE = np.dtype([(name, dtype) for name, _, dtype in COLUMNS])
+
+
+def column_array(values, dtype):
+    """Database values of one column as an array of `dtype`."""
+    dtype = np.dtype(dtype)
+    if dtype.kind == "S":
+        return np.array([(v or "").encode() for v in values], dtype=dtype)
+    if dtype.kind == "M":
+        return np.array(
+            [np.datetime64("NaT") if v is None else np.datetime64(v) for v in values],
+            dtype=dtype,
+        )
+    if dtype.kind == "f":
+        return np.array([np.nan if v is None else float(v) for v in values], dtype)
+    return np.array(values, dtype=dtype)
+
+
+def source_version(db: Session):
+    """What a snapshot of the tables as they are now would be written from.
+
+    Recorded in the manifest, so a reader can tell whether a sync has
+    committed anything since the snapshot was published.
+    """
+    count, tles_updated = db.execute(
+        select(func.count(), func.max(CurrentTLE.updated_at)).select_from(CurrentTLE)
+    ).one()
+    satellites_updated = db.scalar(select(func.max(Satellite.updated_at)))
+    return [
+        count,
+        tles_updated and tles_updated.isoformat(),
+        satellites_updated and satellites_updated.isoformat(),
+    ]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(db: Session, directory=SNAPSHOT_DIR):
+    """Write the current catalog as a new snapshot version and publish it.
+
+    Each version is stored twice: a directory of uncompressed `.npy` columns
+    that readers memory-map, and a compressed `.npz` for download. The
+    manifest is replaced last, so readers never see a partial version.
+    """
+    source = source_version(db)
+    rows = db.execute(
+        select(*(column for _, column, _ in COLUMNS))
+        .join(Satellite, Satellite.id == CurrentTLE.satellite_id)
+        .order_by(CurrentTLE.norad_cat_id)
+    ).all()
+
+    columns = {
+        name: column_array([row[i] for row in rows], dtype)
+        for i, (name, _, dtype) in enumerate(COLUMNS)
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=directory)
+    for name, values in columns.items():
+        np.save(os.path.join(staging, f"{name}.npy"), values)
+    os.replace(staging, os.path.join(directory, version))
+
+    archive = f"catalog-{version}.npz"
+    partial = os.path.join(directory, f".{archive}")
+    with open(partial, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(partial, os.path.join(directory, archive))
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "rows": len(rows),
+        "source": source,
+        "columns": {name: values.dtype.str for name, values in columns.items()},
+        "file": archive,
+        "size": os.path.getsize(os.path.join(directory, archive)),
+        "sha256": _sha256(os.path.join(directory, archive)),
+    }
+    partial = os.path.join(directory, f".{MANIFEST}")
+    with open(partial, "w") as f:
+        json.dump(manifest, f)
+    os.replace(partial, os.path.join(directory, MANIFEST))
+
+    _prune(directory, version)
+    logger.info(
+        f"Snapshot {version}: {len(rows)} satellites, "
+        f"{manifest['size'] / 1024:.0f} KiB compressed"
+    )
+    return manifest
+
+
+def _prune(directory, current):
+    versions = sorted(
+        name
+        for name in os.listdir(directory)
+        if os.path.isdir(os.path.join(directory, name)) and not name.startswith(".")
+    )
+    for version in versions[:-KEEP_SNAPSHOTS]:
+        if version == current:
+            continue
+        shutil.rmtree(os.path.join(directory, version), ignore_errors=True)
+        archive = os.path.join(directory, f"catalog-{version}.npz")
+        if os.path.exists(archive):
+            os.remove(archive)
+
+
+def read_manifest(directory=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class Snapshot:
+    """Read-only view of one snapshot version with memory-mapped columns."""
+
+    def __init__(self, manifest, directory=SNAPSHOT_DIR):
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.columns = {
+            name: np.load(
+                os.path.join(directory, self.version, f"{name}.npy"), mmap_mode="r"
+            )
+            for name in manifest["columns"]
+        }
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
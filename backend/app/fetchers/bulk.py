@@ -0,0 +1,315 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.session import Session
+
+from app.core.history import ensure_partitions
+from app.core.metrics import BULK_ROWS
+from app.fetchers.cursors import naive_utc
+from app.fetchers.parsers import record_key
+from app.core.schemas import CurrentTLE, DeadLetter, Satellite, TLE, RF
+
+BATCH_SIZE = 1000
+DEAD_LETTER_RETENTION = timedelta(
+    days=float(os.environ.get("DEAD_LETTER_RETENTION_DAYS", 30))
+)
+
+CURRENT_TLE_COLUMNS = [
+    c.name for c in CurrentTLE.__table__.columns if c.name != "updated_at"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BulkWriter:
+    """Batched writer used by the Syncer.
+
+    Satellites are upserted on `norad_cat_id` and RF rows on `uuid`. Databases created before the
+    `(satellite_id, epoch)` unique constraint existed have nothing to conflict
+    on for TLEs, so existing keys are loaded once per batch and filtered out
+    before the insert. New TLEs also roll forward `current_tles`.
+
+    `changed` collects, per table, the NORAD ids that got new or updated rows.
+    """
+
+    def __init__(self, db: Session, batch_size=BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.dialect = db.get_bind().dialect.name
+        self.stats = {}
+        self.changed = {"tles": set(), "rfs": set()}
+
+    def _insert(self, model):
+        if self.dialect == "postgresql":
+            return postgresql.insert(model)
+        if self.dialect == "sqlite":
+            return sqlite.insert(model)
+        return insert(model)
+
+    def _record(self, table, rows, written, elapsed):
+        stats = self.stats.setdefault(
+            table, {"rows": 0, "written": 0, "batches": 0, "seconds": 0.0}
+        )
+        stats["rows"] += rows
+        stats["written"] += written
+        stats["batches"] += 1
+        stats["seconds"] += elapsed
+        BULK_ROWS.labels(table, "written").inc(written)
+        BULK_ROWS.labels(table, "skipped").inc(rows - written)
+
+        logger.info(
+            f"{table} batch {stats['batches']}: {written}/{rows} rows written "
+            f"in {elapsed:.3f}s"
+        )
+
+    def upsert_satellites(self, rows):
+        columns = [c for c in rows[0] if c != "norad_cat_id"] if rows else []
+        total = 0
+
+        for chunk in chunked(rows, self.batch_size):
+            start = time.perf_counter()
+
+            # Last record wins when the payload repeats a NORAD id.
+            chunk = list(
+                {r["norad_cat_id"]: r for r in chunk if r["norad_cat_id"]}.values()
+            )
+            if chunk:
+                stmt = self._insert(Satellite)
+                if self.dialect in ("postgresql", "sqlite"):
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["norad_cat_id"],
+                        set_={
+                            **{c: stmt.excluded[c] for c in columns},
+                            "updated_at": datetime.utcnow(),
+                        },
+                    )
+                else:
+                    existing = self._existing(
+                        Satellite.norad_cat_id,
+                        [r["norad_cat_id"] for r in chunk],
+                    )
+                    chunk = [r for r in chunk if r["norad_cat_id"] not in existing]
+
+                if chunk:
+                    self.db.execute(stmt, chunk)
+
+            total += len(chunk)
+            self._record(
+                "satellites", len(chunk), len(chunk), time.perf_counter() - start
+            )
+
+        return total
+
+    def insert_tles(self, rows):
+        total = 0
+
+        for chunk in chunked(rows, self.batch_size):
+            start = time.perf_counter()
+
+            keys = {(r["satellite_id"], r["epoch"]) for r in chunk}
+            existing = set(
+                self.db.execute(
+                    select(TLE.satellite_id, TLE.epoch).where(
+                        tuple_(TLE.satellite_id, TLE.epoch).in_(keys)
+                    )
+                ).all()
+            )
+
+            new_rows = []
+            for row in chunk:
+                key = (row["satellite_id"], row["epoch"])
+                if key in existing:
+                    continue
+                existing.add(key)
+                new_rows.append(row)
+
+            if new_rows:
+                if self.dialect == "postgresql":
+                    ensure_partitions(self.db, [r["epoch"] for r in new_rows])
+                self.db.execute(insert(TLE), new_rows)
+                self.refresh_current_tles(new_rows)
+                self.changed["tles"].update(r["norad_cat_id"] for r in new_rows)
+
+            total += len(new_rows)
+            self._record("tles", len(chunk), len(new_rows), time.perf_counter() - start)
+
+        return total
+
+    def refresh_current_tles(self, rows):
+        latest = {}
+        for row in rows:
+            current = latest.get(row["satellite_id"])
+            if current is None or row["epoch"] > current["epoch"]:
+                latest[row["satellite_id"]] = row
+
+        now = datetime.utcnow()
+        values = [
+            {**{c: row[c] for c in CURRENT_TLE_COLUMNS}, "updated_at": now}
+            for row in latest.values()
+        ]
+        if not values:
+            return
+
+        stmt = self._insert(CurrentTLE)
+        if self.dialect in ("postgresql", "sqlite"):
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["satellite_id"],
+                set_={
+                    c: stmt.excluded[c]
+                    for c in CURRENT_TLE_COLUMNS + ["updated_at"]
+                    if c != "satellite_id"
+                },
+                where=CurrentTLE.epoch < stmt.excluded.epoch,
+            )
+        else:
+            existing = dict(
+                self.db.execute(
+                    select(CurrentTLE.satellite_id, CurrentTLE.epoch).where(
+                        CurrentTLE.satellite_id.in_(latest)
+                    )
+                ).all()
+            )
+            values = [
+                v
+                for v in values
+                if v["satellite_id"] not in existing
+                or existing[v["satellite_id"]] < v["epoch"]
+            ]
+            self.db.execute(
+                delete(CurrentTLE).where(
+                    CurrentTLE.satellite_id.in_([v["satellite_id"] for v in values])
+                )
+            )
+
+        if values:
+            self.db.execute(stmt, values)
+
+    def rebuild_current_tles(self):
+        """Recompute `current_tles` from the full TLE history in one statement."""
+        start = time.perf_counter()
+
+        ranked = select(
+            *(TLE.__table__.c[c] for c in CURRENT_TLE_COLUMNS),
+            func.row_number()
+            .over(
+                partition_by=TLE.satellite_id,
+                order_by=(TLE.epoch.desc(), TLE.id.desc()),
+            )
+            .label("rank"),
+        ).subquery()
+
+        self.db.execute(delete(CurrentTLE))
+        self.db.execute(
+            insert(CurrentTLE).from_select(
+                CURRENT_TLE_COLUMNS + ["updated_at"],
+                select(
+                    *(ranked.c[c] for c in CURRENT_TLE_COLUMNS),
+                    func.current_timestamp(),
+                ).where(ranked.c.rank == 1),
+            )
+        )
+
+        logger.info(f"current_tles rebuilt in {time.perf_counter() - start:.3f}s")
+
+    def upsert_rfs(self, rows):
+        columns = [c for c in rows[0] if c != "uuid"] if rows else []
+        total = 0
+
+        for chunk in chunked(rows, self.batch_size):
+            start = time.perf_counter()
+
+            chunk = list({r["uuid"]: r for r in chunk}.values())
+            fetched = len(chunk)
+            for r in chunk:
+                r["updated"] = naive_utc(r["updated"])
+
+            # SatNOGS bumps `updated` on every edit, so rows it leaves alone
+            # are skipped and a full sync rewrites nothing that is unchanged.
+            existing = dict(
+                self.db.execute(
+                    select(RF.uuid, RF.updated).where(
+                        RF.uuid.in_([r["uuid"] for r in chunk])
+                    )
+                ).all()
+            )
+            chunk = [
+                r
+                for r in chunk
+                if r["uuid"] not in existing or existing[r["uuid"]] != r["updated"]
+            ]
+
+            if chunk:
+                stmt = self._insert(RF)
+                if self.dialect in ("postgresql", "sqlite"):
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["uuid"],
+                        set_={c: stmt.excluded[c] for c in columns},
+                    )
+                else:
+                    chunk = [r for r in chunk if r["uuid"] not in existing]
+
+                if chunk:
+                    self.db.execute(stmt, chunk)
+                    self.changed["rfs"].update(r["norad_cat_id"] for r in chunk)
+
+            total += len(chunk)
+            self._record("rfs", fetched, len(chunk), time.perf_counter() - start)
+
+        return total
+
+    def insert_dead_letters(self, source, rejects):
+        """Keep rejected `(record, error)` pairs, pruning expired ones."""
+        if not rejects:
+            return 0
+
+        now = datetime.utcnow()
+        self.db.execute(
+            insert(DeadLetter),
+            [
+                {
+                    "created_at": now,
+                    "source": source,
+                    "record_key": record_key(record),
+                    "error": error[:512],
+                    "record": json.dumps(record, default=str),
+                }
+                for record, error in rejects
+            ],
+        )
+        self.db.execute(
+            delete(DeadLetter).where(
+                DeadLetter.created_at < now - DEAD_LETTER_RETENTION
+            )
+        )
+        logger.warning(
+            f"{source}: {len(rejects)} invalid records sent to dead_letters, "
+            f"first: {rejects[0][1]}"
+        )
+        return len(rejects)
+
+    def satellite_ids(self, norad_cat_ids=None):
+        query = select(Satellite.norad_cat_id, Satellite.id)
+        if norad_cat_ids is not None:
+            query = query.where(Satellite.norad_cat_id.in_(set(norad_cat_ids)))
+
+        return dict(self.db.execute(query).all())
+
+    def _existing(self, column, values):
+        if not values:
+            return set()
+        return set(self.db.execute(select(column).where(column.in_(values))).scalars())
@@ -0,0 +1,63 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm.session import Session
+
+from app.core.schemas import SyncCursor
+
+SATCAT = "space-track:satcat"
+TLE_LATEST = "space-track:tle_latest"
+SATNOGS_TRANSMITTERS = "satnogs:transmitters"
+
+FULL_RESYNC_INTERVAL = timedelta(
+    hours=int(os.environ.get("SYNC_FULL_RESYNC_HOURS", 24 * 7))
+)
+
+
+def naive_utc(value):
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def get_cursor(db: Session, source):
+    cursor = db.get(SyncCursor, source)
+    if cursor is None:
+        cursor = SyncCursor(source=source)
+        db.add(cursor)
+    return cursor
+
+
+def needs_full_sync(cursor, force=False):
+    if force or cursor.last_full_sync is None:
+        return True
+    return datetime.utcnow() - cursor.last_full_sync > FULL_RESYNC_INTERVAL
+
+
+def reset(cursor):
+    """Forget the high-water marks; a full sync re-derives them from what it
+    fetches, so a cursor that ran ahead of the source is corrected."""
+    cursor.last_file = None
+    cursor.last_epoch = None
+    cursor.last_updated = None
+
+
+def advance(cursor, rows, full=False):
+    """Move the cursor past the given parsed rows.
+
+    Only the columns present on the rows are considered: `file` and `epoch`
+    for Space-Track classes, `updated` for SatNOGS transmitters.
+    """
+    for row in rows:
+        if row.get("file") is not None:
+            cursor.last_file = max(cursor.last_file or 0, row["file"])
+        if row.get("epoch") is not None:
+            if cursor.last_epoch is None or row["epoch"] > cursor.last_epoch:
+                cursor.last_epoch = row["epoch"]
+        updated = naive_utc(row.get("updated"))
+        if updated is not None:
+            if cursor.last_updated is None or updated > cursor.last_updated:
+                cursor.last_updated = updated
+
+    if full:
+        cursor.last_full_sync = datetime.utcnow()
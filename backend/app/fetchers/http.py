@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.core.metrics import FETCH_BYTES, FETCH_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.environ.get("FETCH_MAX_CONNECTIONS", 8))
+MAX_RETRIES = int(os.environ.get("FETCH_MAX_RETRIES", 5))
+BACKOFF_BASE = float(os.environ.get("FETCH_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.environ.get("FETCH_BACKOFF_MAX", 60.0))
+
+TIMEOUT = httpx.Timeout(
+    connect=10.0,
+    read=float(os.environ.get("FETCH_READ_TIMEOUT", 60)),
+    write=10.0,
+    pool=None,
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    pass
+
+
+class RateLimiter:
+    """Sliding-window limiter enforcing several (requests, seconds) windows at once."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.history = deque()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                longest = max(period for _, period in self.limits)
+                while self.history and now - self.history[0] >= longest:
+                    self.history.popleft()
+
+                wait = 0.0
+                for count, period in self.limits:
+                    recent = [t for t in self.history if now - t < period]
+                    if len(recent) >= count:
+                        wait = max(wait, period - (now - recent[-count]))
+
+                if wait <= 0:
+                    self.history.append(now)
+                    return
+
+                logger.info(f"Rate limit reached, waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+
+
+class AsyncFetchClient:
+    """Shared pooled HTTP client with bounded concurrency and retries.
+
+    A single `httpx.AsyncClient` is reused for every request so connections
+    (and the Space-Track login cookie) are pooled. Requests that fail with a
+    transport error, 429 or 5xx are retried with exponential backoff and
+    jitter, honouring `Retry-After` when the server sends one.
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, timeout=TIMEOUT):
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=True,
+        )
+        self.semaphore = asyncio.Semaphore(max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    def _backoff(self, attempt, res=None):
+        if res is not None and res.headers.get("Retry-After"):
+            try:
+                return min(float(res.headers["Retry-After"]), BACKOFF_MAX)
+            except ValueError:
+                pass
+        delay = min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @asynccontextmanager
+    async def stream(self, method, url, limiter=None, **kwargs):
+        """Open a streamed response, retrying until a 2xx status is received.
+
+        Retries only happen before the body is handed to the caller; an error
+        while reading the body propagates.
+        """
+        host = httpx.URL(url).host
+        async with self.semaphore:
+            for attempt in range(MAX_RETRIES + 1):
+                if limiter:
+                    await limiter.acquire()
+
+                try:
+                    request = self.client.build_request(method, url, **kwargs)
+                    res = await self.client.send(request, stream=True)
+                except httpx.TransportError as e:
+                    FETCH_REQUESTS.labels(host, "error").inc()
+                    if attempt == MAX_RETRIES:
+                        raise FetchError(f"{method} {url} failed: {e}")
+                    delay = self._backoff(attempt)
+                    logger.warning(
+                        f"{method} {url} failed ({e}), retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                FETCH_REQUESTS.labels(host, res.status_code).inc()
+                if res.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    await res.aclose()
+                    delay = self._backoff(attempt, res)
+                    logger.warning(
+                        f"{method} {url} returned {res.status_code}, "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                try:
+                    if res.status_code >= 400:
+                        await res.aread()
+                        raise FetchError(
+                            f"{method} {url} returned {res.status_code}: {res.text[:200]}"
+                        )
+                    yield res
+                finally:
+                    await res.aclose()
+                    FETCH_BYTES.labels(host).inc(res.num_bytes_downloaded)
+                return
+
+    async def request(self, method, url, limiter=None, **kwargs):
+        async with self.stream(method, url, limiter=limiter, **kwargs) as res:
+            await res.aread()
+            return res
+
+
+async def merge(*generators, maxsize=4):
+    """Interleave several async generators, applying backpressure via a bounded queue.
+
+    The first producer error is raised to the consumer and cancels the rest.
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+    done = object()
+
+    async def pump(gen):
+        try:
+            async for item in gen:
+                await queue.put((None, item))
+        except Exception as e:
+            await queue.put((e, None))
+        else:
+            await queue.put((None, done))
+
+    tasks = [asyncio.create_task(pump(gen)) for gen in generators]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            error, item = await queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def achunked(items, size):
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
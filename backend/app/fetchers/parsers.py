@@ -0,0 +1,213 @@
+import time
+from datetime import date, datetime
+
+from sqlalchemy import Enum
+
+from app.core.schemas import RF, TLE, Satellite
+
+
+def _int(value):
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def _float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _date(value):
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
+def parse_epoch(value):
+    # fromisoformat accepts the "YYYY-MM-DD HH:MM:SS" form Space-Track sends
+    # and is several times faster than strptime.
+    return datetime.fromisoformat(value)
+
+
+def parse_updated(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid datetime format for updated: {value}")
+
+
+def satellite_row(sat):
+    return {
+        "intldes": sat.get("INTLDES"),
+        "norad_cat_id": _int(sat.get("NORAD_CAT_ID")),
+        "object_type": sat.get("OBJECT_TYPE"),
+        "satname": sat.get("SATNAME"),
+        "country": sat.get("COUNTRY"),
+        "launch": _date(sat.get("LAUNCH")),
+        "site": sat.get("SITE"),
+        "decay": _date(sat.get("DECAY")),
+        "period": _float(sat.get("PERIOD")),
+        "inclination": _float(sat.get("INCLINATION")),
+        "apogee": _int(sat.get("APOGEE")),
+        "perigee": _int(sat.get("PERIGEE")),
+        "comment": sat.get("COMMENT"),
+        "commentcode": _int(sat.get("COMMENTCODE")),
+        "rcsvalue": _int(sat.get("RCSVALUE")) or 0,
+        "rcs_size": sat.get("RCS_SIZE"),
+        "file": _int(sat.get("FILE")) or 0,
+        "launch_year": _int(sat.get("LAUNCH_YEAR")) or 0,
+        "launch_num": _int(sat.get("LAUNCH_NUM")) or 0,
+        "launch_piece": sat.get("LAUNCH_PIECE"),
+        "current": sat.get("CURRENT") or "N",
+        "object_name": sat.get("OBJECT_NAME"),
+        "object_id": sat.get("OBJECT_ID"),
+        "object_number": _int(sat.get("OBJECT_NUMBER")),
+    }
+
+
+def tle_row(tle, satellite_id):
+    return {
+        "satellite_id": satellite_id,
+        "comment": tle.get("COMMENT"),
+        "originator": tle.get("ORIGINATOR"),
+        "norad_cat_id": _int(tle.get("NORAD_CAT_ID")),
+        "object_name": tle.get("OBJECT_NAME"),
+        "object_type": tle.get("OBJECT_TYPE"),
+        "classification_type": tle.get("CLASSIFICATION_TYPE"),
+        "intldes": tle.get("INTLDES"),
+        "epoch": parse_epoch(tle.get("EPOCH")),
+        "epoch_microseconds": _int(tle.get("EPOCH_MICROSECONDS")) or 0,
+        "mean_motion": _float(tle.get("MEAN_MOTION")),
+        "eccentricity": _float(tle.get("ECCENTRICITY")),
+        "inclination": _float(tle.get("INCLINATION")),
+        "ra_of_asc_node": _float(tle.get("RA_OF_ASC_NODE")),
+        "arg_of_pericenter": _float(tle.get("ARG_OF_PERICENTER")),
+        "mean_anomaly": _float(tle.get("MEAN_ANOMALY")),
+        "ephemeris_type": _int(tle.get("EPHEMERIS_TYPE")) or 0,
+        "element_set_no": _int(tle.get("ELEMENT_SET_NO")) or 0,
+        "rev_at_epoch": _float(tle.get("REV_AT_EPOCH")) or 0,
+        "bstar": _float(tle.get("BSTAR")),
+        "mean_motion_dot": _float(tle.get("MEAN_MOTION_DOT")),
+        "mean_motion_ddot": _float(tle.get("MEAN_MOTION_DDOT")),
+        "file": _int(tle.get("FILE")) or 0,
+        "tle_line0": tle.get("TLE_LINE0"),
+        "tle_line1": tle.get("TLE_LINE1"),
+        "tle_line2": tle.get("TLE_LINE2"),
+        "object_id": tle.get("OBJECT_ID"),
+        "object_number": _int(tle.get("OBJECT_NUMBER")),
+        "semimajor_axis": _float(tle.get("SEMIMAJOR_AXIS")) or 0,
+        "period": _float(tle.get("PERIOD")),
+        "apogee": _float(tle.get("APOGEE")) or 0,
+        "perigee": _float(tle.get("PERIGEE")) or 0,
+        "decayed": _int(tle.get("DECAYED")),
+    }
+
+
+def rf_row(rf, satellite_id):
+    return {
+        "satellite_id": satellite_id,
+        "uuid": rf.get("uuid"),
+        "description": rf.get("description"),
+        "alive": rf.get("alive"),
+        "type": rf.get("type"),
+        "uplink_low": rf.get("uplink_low"),
+        "uplink_high": rf.get("uplink_high"),
+        "uplink_drift": rf.get("uplink_drift"),
+        "downlink_low": rf.get("downlink_low"),
+        "downlink_high": rf.get("downlink_high"),
+        "downlink_drift": rf.get("downlink_drift"),
+        "mode": rf.get("mode"),
+        "mode_id": rf.get("mode_id"),
+        "uplink_mode": rf.get("uplink_mode"),
+        "invert": rf.get("invert"),
+        "baud": rf.get("baud"),
+        "norad_cat_id": _int(rf.get("norad_cat_id")),
+        "sat_id": rf.get("sat_id"),
+        "norad_follow_id": rf.get("norad_follow_id"),
+        "status": rf.get("status"),
+        "updated": parse_updated(rf.get("updated")),
+        "citation": rf.get("citation"),
+        "service": rf.get("service"),
+        "iaru_coordination": rf.get("iaru_coordination"),
+        "iaru_coordination_url": rf.get("iaru_coordination_url"),
+        "frequency_violation": rf.get("frequency_violation"),
+        "unconfirmed": rf.get("unconfirmed"),
+    }
+
+
+class Constraints:
+    """The checks the database would apply to a model's rows.
+
+    Covers NULL in a NOT NULL column without a default, strings longer than
+    their column and values outside an enum. Checking rows up front keeps one
+    bad record from failing the insert of its whole batch.
+    """
+
+    def __init__(self, model, required=("norad_cat_id",), skip=("satellite_id",)):
+        self.required = list(required)
+        self.lengths = {}
+        self.choices = {}
+        for column in model.__table__.columns:
+            if column.primary_key or column.name in skip:
+                continue
+            if not column.nullable and column.default is None:
+                if column.name not in self.required:
+                    self.required.append(column.name)
+            if isinstance(column.type, Enum):
+                self.choices[column.name] = set(column.type.enums)
+            elif getattr(column.type, "length", None):
+                self.lengths[column.name] = column.type.length
+
+    def check(self, row):
+        for name in self.required:
+            if row.get(name) is None:
+                raise ValueError(f"{name} is missing")
+        for name, length in self.lengths.items():
+            value = row.get(name)
+            if value is not None and len(value) > length:
+                raise ValueError(f"{name} is longer than {length} characters")
+        for name, choices in self.choices.items():
+            value = row.get(name)
+            if value is not None and value not in choices:
+                raise ValueError(f"{name} {value!r} is not one of the allowed values")
+
+
+PARSERS = {
+    "satellites": (lambda record: satellite_row(record), Constraints(Satellite)),
+    "tles": (lambda record: tle_row(record, None), Constraints(TLE)),
+    "rfs": (lambda record: rf_row(record, None), Constraints(RF)),
+}
+
+
+def record_key(record):
+    """The identifier logged with a rejected record."""
+    for field in ("uuid", "NORAD_CAT_ID", "norad_cat_id"):
+        if record.get(field) is not None:
+            return str(record[field])[:64]
+    return None
+
+
+def parse_batch(table, records):
+    """Parse and validate a batch of fetched records for `table`.
+
+    Returns `(rows, rejects, seconds)`, rejects being `(record, error)` pairs
+    for the records that could not be converted or would be refused by the
+    database. Rows are left without `satellite_id`, which the writer fills
+    in. Runs in the sync's process pool, so everything it returns is
+    picklable.
+    """
+    start = time.perf_counter()
+    parse, constraints = PARSERS[table]
+    rows, rejects = [], []
+    for record in records:
+        try:
+            row = parse(record)
+            constraints.check(row)
+        except (ValueError, TypeError, AttributeError) as e:
+            rejects.append((record, str(e) or type(e).__name__))
+            continue
+        rows.append(row)
+    return rows, rejects, time.perf_counter() - start
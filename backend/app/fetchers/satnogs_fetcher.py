@@ -1,26 +1,26 @@
 import logging
+import os
 
-import requests
-from datetime import datetime
-
-from app.core.schemas import RF
+from app.fetchers.http import AsyncFetchClient, FetchError
+from app.fetchers.stream import CHUNK_SIZE, aiter_json_array
 
 
 class SatNOGSFetcher:
-    BASE_URL = "https://db-dev.satnogs.org/api"
+    BASE_URL = os.environ.get("SATNOGS_URL", "https://db-dev.satnogs.org/api")
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, client: AsyncFetchClient):
         self.api_key = api_key
+        self.client = client
 
-    def fetch_rfs(self):
+    async def fetch_rfs(self):
         url = f"{self.BASE_URL}/transmitters"
         token = f"Bearer {self.api_key}"
 
         try:
-            res = requests.get(url, headers={"Authorization": token})
-            if res.status_code != 200:
-                raise Exception(f"SatNOGS API returned status code {res.status_code}")
-
-            return res.json()
-        except Exception as e:
+            async with self.client.stream(
+                "GET", url, headers={"Authorization": token}
+            ) as res:
+                async for record in aiter_json_array(res.aiter_bytes(CHUNK_SIZE)):
+                    yield record
+        except (FetchError, ValueError) as e:
             raise Exception(f"Error fetching RF data from SatNOGS: {e}")
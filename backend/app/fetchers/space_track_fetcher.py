@@ -1,51 +1,83 @@
 import logging
+import os
 
-import requests
-from datetime import datetime
-
-from app.core.schemas import Satellite, TLE
+from app.fetchers.http import AsyncFetchClient, FetchError, RateLimiter, merge
+from app.fetchers.stream import CHUNK_SIZE, aiter_json_array
 
 
 class SpaceTrackFetcher:
-    BASE_URL = "https://www.space-track.org/basicspacedata/query"
+    HOST = os.environ.get("SPACE_TRACK_URL", "https://www.space-track.org")
+    BASE_URL = f"{HOST}/basicspacedata/query"
+
+    # Space-Track's published API limits: 30 requests/minute, 300 requests/hour.
+    RATE_LIMITS = [(30, 60), (300, 3600)]
+
+    # Full pulls are split into NORAD_CAT_ID ranges fetched concurrently; the
+    # last range is open-ended.
+    NORAD_RANGE_SIZE = int(os.environ.get("SPACE_TRACK_NORAD_RANGE_SIZE", 20000))
+    NORAD_RANGE_MAX = int(os.environ.get("SPACE_TRACK_NORAD_RANGE_MAX", 100000))
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, client: AsyncFetchClient):
         self.username = username
         self.password = password
-        self.session = requests.Session()
-        self._authenticate()
+        self.client = client
+        self.limiter = RateLimiter(self.RATE_LIMITS)
 
-    def _authenticate(self):
-        login_url = "https://www.space-track.org/ajaxauth/login"
+    async def authenticate(self):
+        login_url = f"{self.HOST}/ajaxauth/login"
         try:
-            res = self.session.post(
+            await self.client.request(
+                "POST",
                 login_url,
+                limiter=self.limiter,
                 data={"identity": self.username, "password": self.password},
-                timeout=10,
             )
-            if res.status_code != 200:
-                raise Exception(f"Failed to authenticate: {res.text}")
-        except requests.exceptions.RequestException as e:
+        except FetchError as e:
             raise Exception(f"Failed to authenticate: {e}")
 
-    def fetch_active_satellites(self, limit=20):
-        url = f"{self.BASE_URL}/class/satcat/DECAY/null-val/orderby/INTLDES%20asc/format/json"
-        try:
-            res = self.session.get(url)
-            if res.status_code != 200:
-                raise Exception(f"Failed to fetch active satellites: {res.text}")
+    def fetch_active_satellites(self, since_file=None):
+        predicates = "DECAY/null-val"
+        if since_file:
+            return self._query(
+                "satcat", f"{predicates}/FILE/%3E{since_file}", "INTLDES%20asc"
+            )
+        return self._query_ranges("satcat", predicates, "INTLDES%20asc")
 
-            return res.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch active satellites: {e}")
+    def fetch_tles(self, since_file=None, since_epoch=None):
+        predicates = "ORDINAL/1"
+        if since_file:
+            return self._query(
+                "tle_latest", f"{predicates}/FILE/%3E{since_file}", "ORDINAL%20asc"
+            )
+        if since_epoch:
+            return self._query(
+                "tle_latest",
+                f"{predicates}/EPOCH/%3E{since_epoch:%Y-%m-%dT%H:%M:%S}",
+                "ORDINAL%20asc",
+            )
+        return self._query_ranges("tle_latest", predicates, "ORDINAL%20asc")
 
-    def fetch_tles(self, limit=20):
-        url = f"{self.BASE_URL}/class/tle_latest/ORDINAL/1/orderby/ORDINAL%20asc/format/json"
-        try:
-            res = self.session.get(url)
-            if res.status_code != 200:
-                raise Exception(f"Failed to fetch TLE: {res.text}")
+    def _norad_ranges(self):
+        ranges = [
+            f"{low}--{low + self.NORAD_RANGE_SIZE - 1}"
+            for low in range(0, self.NORAD_RANGE_MAX, self.NORAD_RANGE_SIZE)
+        ]
+        ranges.append(f"%3E{self.NORAD_RANGE_MAX - 1}")
+        return ranges
 
-            return res.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch TLE: {e}")
+    def _query_ranges(self, cls, predicates, orderby):
+        return merge(
+            *(
+                self._query(cls, f"NORAD_CAT_ID/{norad_range}/{predicates}", orderby)
+                for norad_range in self._norad_ranges()
+            )
+        )
+
+    async def _query(self, cls, predicates, orderby):
+        url = f"{self.BASE_URL}/class/{cls}/{predicates}/orderby/{orderby}/format/json"
+        try:
+            async with self.client.stream("GET", url, limiter=self.limiter) as res:
+                async for record in aiter_json_array(res.aiter_bytes(CHUNK_SIZE)):
+                    yield record
+        except FetchError as e:
+            raise Exception(f"Failed to fetch {cls}: {e}")
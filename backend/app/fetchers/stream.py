@@ -0,0 +1,142 @@
+import codecs
+import json
+import os
+
+CHUNK_SIZE = 64 * 1024
+# Longest element the parser buffers while waiting for it to complete.
+MAX_ELEMENT_SIZE = int(os.environ.get("JSON_MAX_ELEMENT_SIZE", 1024 * 1024))
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# What the parser accepts next inside the array: a value or `]` right after
+# `[`, a value after `,`, and `,` or `]` after a value.
+_FIRST, _VALUE, _SEPARATOR = "first", "value", "separator"
+
+# Characters that end a token.
+_DELIMITERS = _WHITESPACE + '[]{},:"'
+
+
+def _at_end(buf, pos):
+    """Whether the token at `pos` runs to the end of `buf`, so more input
+    could still complete it (`tr` of `true`, `1.` of `1.5`)."""
+    return not any(char in _DELIMITERS for char in buf[pos:])
+
+
+class JSONArrayParser:
+    """Incremental parser for a top-level JSON array.
+
+    Bytes are pushed in with `feed`, which returns the elements completed so
+    far. Only the undecoded tail is buffered, so memory stays at roughly one
+    chunk plus one element regardless of the array length; an element
+    longer than MAX_ELEMENT_SIZE characters is rejected.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._started = False
+        self._done = False
+        self._expect = _FIRST
+
+    def feed(self, chunk):
+        self._buf += self._text.decode(chunk)
+        values = self._drain(final=False)
+        if len(self._buf) > MAX_ELEMENT_SIZE:
+            raise ValueError(
+                f"JSON array element exceeds {MAX_ELEMENT_SIZE} characters"
+            )
+        return values
+
+    def close(self):
+        self._buf += self._text.decode(b"", final=True)
+        values = self._drain(final=True)
+        if not self._done:
+            raise ValueError(
+                "Unterminated JSON array" if self._started else "Empty JSON payload"
+            )
+        return values
+
+    def _drain(self, final):
+        buf = self._buf
+        pos = 0
+        values = []
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+
+            if self._done:
+                raise ValueError(f"Unexpected {char!r} after the JSON array")
+
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._started = True
+                pos += 1
+                continue
+
+            if char == "]" and self._expect != _VALUE:
+                self._done = True
+                pos += 1
+                continue
+
+            if self._expect == _SEPARATOR:
+                if char != ",":
+                    raise ValueError(f"Unexpected {char!r} in JSON array")
+                self._expect = _VALUE
+                pos += 1
+                continue
+
+            if char in ",]":
+                raise ValueError(f"Missing value before {char!r} in JSON array")
+
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Only an element cut by the end of the buffer may still
+                # complete; anything else is malformed now.
+                cut = e.msg.startswith("Unterminated string") or _at_end(buf, e.pos)
+                if final or not cut:
+                    raise
+                break
+
+            # A number cut at a chunk boundary (`12` of `123`, `1` of `1.5`) still
+            # decodes, so only trust a value once the delimiter after it is visible.
+            delim = end
+            while delim < len(buf) and buf[delim] in _WHITESPACE:
+                delim += 1
+            if delim >= len(buf) or buf[delim] not in ",]":
+                if not final and (delim >= len(buf) or _at_end(buf, delim)):
+                    break
+                if delim >= len(buf):
+                    raise ValueError("Unterminated JSON array")
+                raise ValueError(f"Unexpected {buf[delim]!r} in JSON array")
+
+            values.append(value)
+            self._expect = _SEPARATOR
+            pos = end
+
+        self._buf = buf[pos:]
+        return values
+
+
+def iter_json_array(chunks):
+    """Yield the elements of a top-level JSON array from an iterable of byte chunks."""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_array(chunks):
+    """Async counterpart of `iter_json_array` for `httpx` byte streams."""
+    parser = JSONArrayParser()
+    async for chunk in chunks:
+        for value in parser.feed(chunk):
+            yield value
+    for value in parser.close():
+        yield value
@@ -1,15 +1,100 @@
+import asyncio
 import os
 import logging
-from datetime import datetime
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-from requests.models import LocationParseError
 from sqlalchemy.orm.session import Session
 
+from app.core.cache import bump_generation
+from app.core.changes import RFS, TLE, record_changes
+from app.core.metrics import (
+    SYNC_LAST_SUCCESS,
+    SYNC_RECORDS,
+    SYNC_REJECTED,
+    SYNC_STAGE_ROWS,
+    SYNC_STAGES,
+)
+from app.core.snapshot import write_snapshot
+from app.fetchers import cursors
+from app.fetchers.bulk import BATCH_SIZE, BulkWriter
+from app.fetchers.cursors import (
+    advance,
+    get_cursor,
+    naive_utc,
+    needs_full_sync,
+    reset,
+)
+from app.fetchers.http import AsyncFetchClient, achunked
+from app.fetchers.parsers import parse_batch
 from app.fetchers.satnogs_fetcher import SatNOGSFetcher
 from app.fetchers.space_track_fetcher import SpaceTrackFetcher
-from app.core.schemas import Satellite, TLE, RF
+from app.propagation.trends import run_trends
+
+# Processes parsing fetched batches; 0 parses on a thread instead, which
+# avoids pickling every batch when there is no spare core.
+PARSE_WORKERS = int(
+    os.environ.get("SYNC_PARSE_WORKERS", max((os.cpu_count() or 1) - 1, 0))
+)
+# Batches fetched and being parsed, or parsed and waiting for the writer.
+QUEUE_DEPTH = int(os.environ.get("SYNC_QUEUE_DEPTH", 4))
+
+
+async def timed_batches(source, records, size=BATCH_SIZE):
+    """`achunked`, recording how long each batch took to arrive."""
+    batches = achunked(records, size)
+    while True:
+        start = time.perf_counter()
+        try:
+            batch = await anext(batches)
+        except StopAsyncIteration:
+            return
+        SYNC_STAGES.labels(source, "fetch").observe(time.perf_counter() - start)
+        SYNC_RECORDS.labels(source).inc(len(batch))
+        SYNC_STAGE_ROWS.labels(source, "fetch").inc(len(batch))
+        yield batch
+
+
+async def pipeline(source, table, records, write, pool=None, depth=QUEUE_DEPTH):
+    """Fetch, parse and write `records` as overlapping stages.
+
+    Fetched batches are parsed in `pool` (on a thread without one) while
+    later batches are still arriving, and reach `write(rows, rejects)` in
+    fetch order. At most `depth` batches are between the fetch and the
+    writer, so a slow writer holds back parsing and, through it, the fetch.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(depth)
+
+    async def produce():
+        try:
+            async for batch in timed_batches(source, records):
+                if pool is None:
+                    parsed = asyncio.ensure_future(
+                        asyncio.to_thread(parse_batch, table, batch)
+                    )
+                else:
+                    parsed = loop.run_in_executor(pool, parse_batch, table, batch)
+                await queue.put(parsed)
+        finally:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (parsed := await queue.get()) is not None:
+            rows, rejects, seconds = await parsed
+            SYNC_STAGES.labels(source, "parse").observe(seconds)
+            SYNC_STAGE_ROWS.labels(source, "parse").inc(len(rows) + len(rejects))
+            SYNC_REJECTED.labels(source).inc(len(rejects))
+
+            start = time.perf_counter()
+            await asyncio.to_thread(write, rows, rejects)
+            SYNC_STAGES.labels(source, "write").observe(time.perf_counter() - start)
+            SYNC_STAGE_ROWS.labels(source, "write").inc(len(rows))
+        await producer
+    finally:
+        producer.cancel()
 
 
 class Syncer:
@@ -19,221 +104,219 @@ class Syncer:
 
     def __init__(self, db: Session):
         self.db = db
+        self.full = False
 
-        self.satnogs_fetcher = SatNOGSFetcher(self.satnogs_api_key)
-        self.space_track_fetcher = SpaceTrackFetcher(
-            self.space_track_username, self.space_track_password
-        )
-
-    def sync(self):
-        self.sync_satellites()
-
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {
-                executor.submit(self.sync_TLEs): "TLEs",
-                executor.submit(self.sync_RF): "RFs",
-            }
+    def sync(self, full=False):
+        self.full = full
 
-            for future in as_completed(futures):
-                name = futures[future]
-                try:
-                    future.result()
-                    logging.info(f"{name} sync completed successfully.")
-                except Exception as e:
-                    logging.error(f"Error syncing {name}: {e}")
-
-        self.db.close()
-
-    def sync_satellites(self):
         try:
-            satellites = self.space_track_fetcher.fetch_active_satellites()
-
-            for sat in satellites:
-                satellite_obj = (
-                    self.db.query(Satellite)
-                    .filter_by(norad_cat_id=sat.get("NORAD_CAT_ID"))
-                    .first()
-                )
+            asyncio.run(self._sync())
+            self.write_snapshot()
+            self.update_trends()
+        finally:
+            self.db.close()
 
-                if satellite_obj:
-                    continue
-
-                satellite_obj = Satellite(
-                    intldes=sat.get("INTLDES"),
-                    norad_cat_id=sat.get("NORAD_CAT_ID"),
-                    object_type=sat.get("OBJECT_TYPE"),
-                    satname=sat.get("SATNAME"),
-                    country=sat.get("COUNTRY"),
-                    launch=sat.get("LAUNCH"),
-                    site=sat.get("SITE"),
-                    decay=sat.get("DECAY"),
-                    period=sat.get("PERIOD"),
-                    inclination=sat.get("INCLINATION"),
-                    apogee=sat.get("APOGEE"),
-                    perigee=sat.get("PERIGEE"),
-                    comment=sat.get("COMMENT"),
-                    commentcode=sat.get("COMMENTCODE"),
-                    rcsvalue=sat.get("RCSVALUE"),
-                    rcs_size=sat.get("RCS_SIZE"),
-                    file=sat.get("FILE"),
-                    launch_year=sat.get("LAUNCH_YEAR"),
-                    launch_num=sat.get("LAUNCH_NUM"),
-                    launch_piece=sat.get("LAUNCH_PIECE"),
-                    current=sat.get("CURRENT"),
-                    object_name=sat.get("OBJECT_NAME"),
-                    object_id=sat.get("OBJECT_ID"),
-                    object_number=sat.get("OBJECT_NUMBER"),
+    async def _sync(self):
+        self.pool = ProcessPoolExecutor(PARSE_WORKERS) if PARSE_WORKERS else None
+        try:
+            async with AsyncFetchClient() as client:
+                self.satnogs_fetcher = SatNOGSFetcher(self.satnogs_api_key, client)
+                self.space_track_fetcher = SpaceTrackFetcher(
+                    self.space_track_username, self.space_track_password, client
                 )
-                self.db.add(satellite_obj)
+                await self.space_track_fetcher.authenticate()
+
+                await self.sync_satellites()
+
+                # TLEs and RFs only depend on the satellites table, so both
+                # sources stream concurrently, each on its own session and
+                # transaction. SQLite takes one writer at a time and each
+                # source holds its transaction to the end, so there they
+                # run one after the other.
+                sources = {"TLEs": self.sync_TLEs, "RFs": self.sync_RF}
+                if self.db.get_bind().dialect.name == "sqlite":
+                    results = [
+                        (await asyncio.gather(sync(), return_exceptions=True))[0]
+                        for sync in sources.values()
+                    ]
+                else:
+                    results = await asyncio.gather(
+                        *(sync() for sync in sources.values()),
+                        return_exceptions=True,
+                    )
 
-            self.db.commit()
+                for name, result in zip(sources, results):
+                    if isinstance(result, BaseException):
+                        logging.error(f"Error syncing {name}: {result}")
+                    else:
+                        logging.info(f"{name} sync completed successfully.")
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
 
+    def write_snapshot(self):
+        try:
+            write_snapshot(self.db)
         except Exception as e:
-            logging.info(f"Error syncing satellite data: {e}")
+            logging.error(f"Failed to write catalog snapshot: {e}")
             self.db.rollback()
-            self.db.close()
 
-    def sync_TLEs(self):
+    def update_trends(self):
         try:
-            tles = self.space_track_fetcher.fetch_tles()
-
-            tle_groups = defaultdict(list)
-            for tle in tles:
-                tle_groups[int(tle["NORAD_CAT_ID"])].append(tle)
-
-            for norad_cat_id, tles in tle_groups.items():
-                satellite = (
-                    self.db.query(Satellite)
-                    .filter_by(norad_cat_id=norad_cat_id)
-                    .first()
-                )
+            run_trends(self.db)
+        except Exception as e:
+            logging.error(f"Failed to update orbit trends: {e}")
+            self.db.rollback()
 
-                if not satellite:
-                    continue
+    def _session(self):
+        return Session(bind=self.db.get_bind(), autoflush=False)
 
-                for tle in tles:
-                    old_tle = (
-                        self.db.query(TLE)
-                        .filter_by(satellite_id=satellite.id, epoch=tle.get("EPOCH"))
-                        .first()
-                    )
+    async def sync_satellites(self):
+        try:
+            cursor = await asyncio.to_thread(get_cursor, self.db, cursors.SATCAT)
+            full = needs_full_sync(cursor, self.full)
+
+            satellites = self.space_track_fetcher.fetch_active_satellites(
+                since_file=None if full else cursor.last_file
+            )
+            if full:
+                reset(cursor)
+
+            writer = BulkWriter(self.db)
+            await pipeline(
+                cursors.SATCAT,
+                "satellites",
+                satellites,
+                partial(self._write_satellites, writer, cursor, full),
+                self.pool,
+            )
+
+            await asyncio.to_thread(self.db.commit)
+            bump_generation()
+            SYNC_LAST_SUCCESS.labels(cursors.SATCAT).set_to_current_time()
+            self._log_stats(writer, f"SATCAT {'full' if full else 'delta'} sync")
 
-                    if old_tle:
-                        continue
-
-                    tle_obj = TLE(
-                        satellite_id=satellite.id,
-                        comment=tle.get("COMMENT"),
-                        originator=tle.get("ORIGINATOR"),
-                        norad_cat_id=tle.get("NORAD_CAT_ID"),
-                        object_name=tle.get("OBJECT_NAME"),
-                        object_type=tle.get("OBJECT_TYPE"),
-                        classification_type=tle.get("CLASSIFICATION_TYPE"),
-                        intldes=tle.get("INTLDES"),
-                        epoch=datetime.strptime(tle.get("EPOCH"), "%Y-%m-%d %H:%M:%S"),
-                        epoch_microseconds=tle.get("EPOCH_MICROSECONDS"),
-                        mean_motion=tle.get("MEAN_MOTION"),
-                        eccentricity=tle.get("ECCENTRICITY"),
-                        inclination=tle.get("INCLINATION"),
-                        ra_of_asc_node=tle.get("RA_OF_ASC_NODE"),
-                        arg_of_pericenter=tle.get("ARG_OF_PERICENTER"),
-                        mean_anomaly=tle.get("MEAN_ANOMALY"),
-                        ephemeris_type=tle.get("EPHEMERIS_TYPE"),
-                        element_set_no=tle.get("ELEMENT_SET_NO"),
-                        rev_at_epoch=tle.get("REV_AT_EPOCH"),
-                        bstar=tle.get("BSTAR"),
-                        mean_motion_dot=tle.get("MEAN_MOTION_DOT"),
-                        mean_motion_ddot=tle.get("MEAN_MOTION_DDOT"),
-                        file=tle.get("FILE"),
-                        tle_line0=tle.get("TLE_LINE0"),
-                        tle_line1=tle.get("TLE_LINE1"),
-                        tle_line2=tle.get("TLE_LINE2"),
-                        object_id=tle.get("OBJECT_ID"),
-                        object_number=tle.get("OBJECT_NUMBER"),
-                        semimajor_axis=tle.get("SEMIMAJOR_AXIS"),
-                        period=tle.get("PERIOD"),
-                        apogee=tle.get("APOGEE"),
-                        perigee=tle.get("PERIGEE"),
-                        decayed=tle.get("DECAYED"),
-                    )
+        except Exception as e:
+            logging.info(f"Error syncing satellite data: {e}")
+            await asyncio.to_thread(self.db.rollback)
 
-                    self.db.add(tle_obj)
+    async def sync_TLEs(self):
+        db = self._session()
+        try:
+            cursor = await asyncio.to_thread(get_cursor, db, cursors.TLE_LATEST)
+            full = needs_full_sync(cursor, self.full)
+
+            if full:
+                tles = self.space_track_fetcher.fetch_tles()
+                reset(cursor)
+            else:
+                tles = self.space_track_fetcher.fetch_tles(
+                    since_file=cursor.last_file, since_epoch=cursor.last_epoch
+                )
 
-            self.db.commit()
+            writer = BulkWriter(db)
+            await pipeline(
+                cursors.TLE_LATEST,
+                "tles",
+                tles,
+                partial(self._write_tles, writer, cursor, full),
+                self.pool,
+            )
+
+            # Batches keep current_tles up to date incrementally; a full sync
+            # also recomputes it from history to repair any drift.
+            if full:
+                await asyncio.to_thread(writer.rebuild_current_tles)
+
+            await asyncio.to_thread(record_changes, db, TLE, writer.changed["tles"])
+            await asyncio.to_thread(db.commit)
+            bump_generation()
+            SYNC_LAST_SUCCESS.labels(cursors.TLE_LATEST).set_to_current_time()
+            self._log_stats(writer, f"TLE {'full' if full else 'delta'} sync")
 
         except Exception as e:
             logging.error(f"Failed to sync data: {e}")
-            self.db.rollback()
+            await asyncio.to_thread(db.rollback)
+        finally:
+            db.close()
 
-    def sync_RF(self):
+    async def sync_RF(self):
+        db = self._session()
         try:
+            cursor = await asyncio.to_thread(
+                get_cursor, db, cursors.SATNOGS_TRANSMITTERS
+            )
+            full = needs_full_sync(cursor, self.full)
+            since = None if full else cursor.last_updated
+            if full:
+                reset(cursor)
+
+            # The SatNOGS transmitters endpoint has no `updated` filter, so the
+            # delta is taken client-side before any row reaches the database.
             rf_data = self.satnogs_fetcher.fetch_rfs()
 
-            rf_groups = defaultdict(list)
-            for rf in rf_data:
-                rf_groups[int(rf["norad_cat_id"])].append(rf)
-
-            for norad_cat_id, rfs in rf_groups.items():
-                satellite = (
-                    self.db.query(Satellite)
-                    .filter_by(norad_cat_id=norad_cat_id)
-                    .first()
-                )
-
-                if not satellite:
-                    continue
-
-                for rf in rfs:
-                    old_rf = self.db.query(RF).filter_by(uuid=rf["uuid"]).first()
-
-                    if old_rf:
-                        continue
-
-                    updated = None
-                    if rf.get("updated"):
-                        try:
-                            updated = datetime.fromisoformat(
-                                rf["updated"].replace("Z", "+00:00")
-                            )
-                        except ValueError:
-                            raise ValueError(
-                                f"Invalid datetime format for updated: {rf['updated']}"
-                            )
-
-                    rf_obj = RF(
-                        satellite_id=satellite.id,
-                        uuid=rf.get("uuid"),
-                        description=rf.get("description"),
-                        alive=rf.get("alive"),
-                        type=rf.get("type"),
-                        uplink_low=rf.get("uplink_low"),
-                        uplink_high=rf.get("uplink_high"),
-                        uplink_drift=rf.get("uplink_drift"),
-                        downlink_low=rf.get("downlink_low"),
-                        downlink_high=rf.get("downlink_high"),
-                        downlink_drift=rf.get("downlink_drift"),
-                        mode=rf.get("mode"),
-                        mode_id=rf.get("mode_id"),
-                        uplink_mode=rf.get("uplink_mode"),
-                        invert=rf.get("invert"),
-                        baud=rf.get("baud"),
-                        norad_cat_id=rf.get("norad_cat_id"),
-                        sat_id=rf.get("sat_id"),
-                        norad_follow_id=rf.get("norad_follow_id"),
-                        status=rf.get("status"),
-                        updated=updated,
-                        citation=rf.get("citation"),
-                        service=rf.get("service"),
-                        iaru_coordination=rf.get("iaru_coordination"),
-                        iaru_coordination_url=rf.get("iaru_coordination_url"),
-                        frequency_violation=rf.get("frequency_violation"),
-                        unconfirmed=rf.get("unconfirmed"),
-                    )
-
-                    self.db.add(rf_obj)
-
-            self.db.commit()
+            writer = BulkWriter(db)
+            await pipeline(
+                cursors.SATNOGS_TRANSMITTERS,
+                "rfs",
+                rf_data,
+                partial(self._write_rfs, writer, cursor, full, since),
+                self.pool,
+            )
+
+            await asyncio.to_thread(record_changes, db, RFS, writer.changed["rfs"])
+            await asyncio.to_thread(db.commit)
+            bump_generation()
+            SYNC_LAST_SUCCESS.labels(cursors.SATNOGS_TRANSMITTERS).set_to_current_time()
+            self._log_stats(writer, f"RF {'full' if full else 'delta'} sync")
 
         except Exception as e:
             logging.error(f"Failed to sync RF data: {e}")
-            self.db.rollback()
+            await asyncio.to_thread(db.rollback)
+        finally:
+            db.close()
+
+    def _write_satellites(self, writer, cursor, full, rows, rejects):
+        writer.upsert_satellites(rows)
+        writer.insert_dead_letters(cursors.SATCAT, rejects)
+        advance(cursor, rows, full=full)
+
+    def _write_tles(self, writer, cursor, full, rows, rejects):
+        satellite_ids = writer.satellite_ids(row["norad_cat_id"] for row in rows)
+        for row in rows:
+            row["satellite_id"] = satellite_ids.get(row["norad_cat_id"])
+
+        # The cursor moves past every fetched record, including ones for
+        # satellites we don't track yet; the periodic full resync picks
+        # those up once their SATCAT entry exists.
+        advance(cursor, rows, full=full)
+
+        writer.insert_tles([row for row in rows if row["satellite_id"]])
+        writer.insert_dead_letters(cursors.TLE_LATEST, rejects)
+
+    def _write_rfs(self, writer, cursor, full, since, rows, rejects):
+        if since:
+            rows = [
+                row
+                for row in rows
+                if row["updated"] is None or naive_utc(row["updated"]) > since
+            ]
+        satellite_ids = writer.satellite_ids(row["norad_cat_id"] for row in rows)
+        for row in rows:
+            row["satellite_id"] = satellite_ids.get(row["norad_cat_id"])
+        advance(cursor, rows, full=full)
+
+        writer.upsert_rfs([row for row in rows if row["satellite_id"]])
+        writer.insert_dead_letters(cursors.SATNOGS_TRANSMITTERS, rejects)
+
+    def _log_stats(self, writer, label):
+        if not writer.stats:
+            logging.info(f"{label}: no records")
+
+        for table, stats in writer.stats.items():
+            rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+            logging.info(
+                f"{label}: {stats['written']}/{stats['rows']} {table} rows written in "
+                f"{stats['batches']} batches, {stats['seconds']:.2f}s "
+                f"({rate:.0f} rows/s)"
+            )
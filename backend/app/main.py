@@ -1,12 +1,31 @@
+import logging
+import os
+
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
-from app.core.db import Base, engine, get_db
+from app.api.orbits import router as orbits_router
+from app.api.conjunctions import router as conjunctions_router
+from app.api.snapshot import router as snapshot_router
+from app.api.frequencies import router as frequencies_router
+from app.api.trends import router as trends_router
+from app.api.stream import router as stream_router
+from app.api.metrics import MetricsMiddleware, router as metrics_router
+from app.core.catalog import load_catalog
+from app.core.db import MAX_OVERFLOW, POOL_SIZE, Base, ReadSessionLocal, engine
 from .worker import start_scheduler
 
+logger = logging.getLogger(__name__)
+
 Base.metadata.create_all(bind=engine)
 
+# Routes that query the database are plain `def`s, which FastAPI runs on
+# this threadpool so a slow query only holds up its own request. More
+# threads than pooled connections would only queue on the pool instead.
+API_THREADS = int(os.environ.get("API_THREADS", POOL_SIZE + MAX_OVERFLOW))
+
 app = FastAPI(title="AstroBridge", version="0.0.1", description="")
 
 app.add_middleware(
@@ -16,11 +35,36 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+def warm_catalog():
+    db = ReadSessionLocal()
+    try:
+        load_catalog(db)
+    except Exception as e:
+        # Lookups retry the load, so the API can still start without it.
+        logger.error(f"Failed to load the catalog: {e}")
+    finally:
+        db.close()
 
 
 @app.on_event("startup")
 async def startup_event():
-    start_scheduler()
+    to_thread.current_default_thread_limiter().total_tokens = API_THREADS
+    await to_thread.run_sync(warm_catalog)
+
+    # Jobs normally run in their own process (`python -m app.worker`); this
+    # keeps the single-process setup available for development.
+    if os.environ.get("SCHEDULER_IN_API", "").lower() in ("1", "true", "yes"):
+        start_scheduler()
 
 
 app.include_router(router)
+app.include_router(orbits_router)
+app.include_router(conjunctions_router)
+app.include_router(snapshot_router)
+app.include_router(frequencies_router)
+app.include_router(trends_router)
+app.include_router(stream_router)
+app.include_router(metrics_router)
@@ -0,0 +1,395 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import RESULTS, bump_generation
+from app.core.schemas import Conjunction, ConjunctionScreening, CurrentTLE
+from app.propagation.propagator import julian_dates
+
+logger = logging.getLogger(__name__)
+
+MU = 398600.4418  # km^3/s^2
+
+THRESHOLD = float(os.environ.get("CONJUNCTION_THRESHOLD_KM", 10.0))
+WINDOW = timedelta(hours=float(os.environ.get("CONJUNCTION_WINDOW_HOURS", 24)))
+WORKERS = int(os.environ.get("CONJUNCTION_WORKERS", os.cpu_count() or 1))
+KEEP_SCREENINGS = int(os.environ.get("CONJUNCTION_KEEP_SCREENINGS", 7))
+
+STEP = 30.0
+BLOCK_STEPS = 60
+REFINE_POINTS = 16
+
+# Upper bound on the relative speed of two Earth orbiters (head-on LEO).
+MAX_RELATIVE_SPEED = 16.0  # km/s
+
+# Stored apogee/perigee are mean-element altitudes while SGP4 positions
+# are osculating, which can differ by a few tens of km in LEO.
+SHELL_MARGIN = 25.0
+# Slack for the node-crossing radius test, covering eccentric orbits whose
+# closest points sit slightly off the mutual node line.
+PATH_MARGIN = 5.0
+# Below this relative inclination the node line is ill-conditioned and the
+# orbit-path test is skipped.
+PLANE_MIN_ANGLE = np.radians(5.0)
+
+# The 13 neighbouring cells "after" a cell in lexicographic order; together
+# with the cell itself they cover every neighbouring pair exactly once.
+NEIGHBOURS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def close_pairs(positions, radius):
+    """Index pairs (i < j) of points no further apart than `radius`.
+
+    Points are hashed into a uniform grid of cubic cells of side `radius`,
+    so a close pair always shares a cell or sits in adjacent cells and the
+    work grows with the number of points rather than its square. Rows with
+    NaN coordinates are ignored.
+    """
+    valid = np.flatnonzero(np.isfinite(positions).all(axis=1))
+    empty = np.empty(0, dtype=np.int64)
+    if len(valid) < 2:
+        return empty, empty
+
+    points = positions[valid]
+    cells = np.floor(points / radius).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    dims = cells.max(axis=0) + 2
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    order = np.argsort(keys, kind="stable")
+    cell_keys, starts, counts = np.unique(
+        keys[order], return_index=True, return_counts=True
+    )
+
+    first, second = [], []
+    for dx, dy, dz in [(0, 0, 0)] + NEIGHBOURS:
+        target = cell_keys + (dx * dims[1] + dy) * dims[2] + dz
+        pos = np.minimum(np.searchsorted(cell_keys, target), len(cell_keys) - 1)
+        a = np.flatnonzero(cell_keys[pos] == target)
+        b = pos[a]
+
+        # Every member of cell a against every member of cell b.
+        na, nb = counts[a], counts[b]
+        sizes = na * nb
+        pair = np.repeat(np.arange(len(a)), sizes)
+        local = np.arange(len(pair)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        i = starts[a][pair] + local // nb[pair]
+        j = starts[b][pair] + local % nb[pair]
+        if (dx, dy, dz) == (0, 0, 0):
+            keep = i < j
+            i, j = i[keep], j[keep]
+
+        first.append(order[i])
+        second.append(order[j])
+
+    i, j = np.concatenate(first), np.concatenate(second)
+    near = np.einsum("ij,ij->i", points[i] - points[j], points[i] - points[j])
+    near = near <= radius**2
+    i, j = valid[i[near]], valid[j[near]]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def shell_filter(i, j, perigee, apogee, threshold):
+    """Keep pairs whose perigee-apogee altitude shells come within reach."""
+    gap = np.maximum(perigee[i], perigee[j]) - np.minimum(apogee[i], apogee[j])
+    return ~(gap > threshold + SHELL_MARGIN)
+
+
+def path_filter(r_i, v_i, r_j, v_j, threshold):
+    """Keep pairs whose osculating orbits pass close at the mutual node line.
+
+    Two orbits in different planes can only meet where the planes
+    intersect, so the radius each orbit has along both directions of the
+    node line must agree to within the threshold. The osculating conic from
+    the state at the sample holds well over the short refinement window.
+    """
+    h_i, h_j = np.cross(r_i, v_i), np.cross(r_j, v_j)
+    node = np.cross(h_i, h_j)
+    norm = np.linalg.norm(node, axis=-1)
+    sin_angle = norm / (np.linalg.norm(h_i, axis=-1) * np.linalg.norm(h_j, axis=-1))
+    coplanar = ~(sin_angle > np.sin(PLANE_MIN_ANGLE))
+    node = node / np.where(norm > 0, norm, 1.0)[:, None]
+
+    def radius(r, v, h, direction):
+        # Conic radius along an in-plane unit vector: p / (1 + e . u)
+        e = np.cross(v, h) / MU - r / np.linalg.norm(r, axis=-1)[:, None]
+        p = np.einsum("ij,ij->i", h, h) / MU
+        return p / (1 + np.einsum("ij,ij->i", e, direction))
+
+    gap = np.minimum(
+        np.abs(radius(r_i, v_i, h_i, node) - radius(r_j, v_j, h_j, node)),
+        np.abs(radius(r_i, v_i, h_i, -node) - radius(r_j, v_j, h_j, -node)),
+    )
+    return coplanar | ~(gap > threshold + PATH_MARGIN)
+
+
+def _hermite(p0, v0, p1, v1, s, h):
+    """Cubic Hermite interpolation on [0, 1] scaled to a step of `h` seconds."""
+    s = s[None, :, None]
+    s2, s3 = s * s, s * s * s
+    return (
+        (2 * s3 - 3 * s2 + 1) * p0[:, None]
+        + (s3 - 2 * s2 + s) * h * v0[:, None]
+        + (-2 * s3 + 3 * s2) * p1[:, None]
+        + (s3 - s2) * h * v1[:, None]
+    )
+
+
+def _closest(dr, dv, k, step):
+    """TCA offset (in steps from block start) and whether it is a true minimum.
+
+    The relative state is interpolated over the two steps around sample `k`
+    with cubic Hermite polynomials; the squared distance is searched on a
+    grid and polished with a parabola. A minimum on the window edge belongs
+    to a neighbouring sample and is rejected.
+    """
+    s = np.linspace(0.0, 1.0, REFINE_POINTS + 1)
+    before = _hermite(dr[:, 0], dv[:, 0], dr[:, 1], dv[:, 1], s[:-1], step)
+    after = _hermite(dr[:, 1], dv[:, 1], dr[:, 2], dv[:, 2], s, step)
+    rel = np.concatenate((before, after), axis=1)
+    d2 = np.einsum("ijk,ijk->ij", rel, rel)
+
+    m = np.argmin(d2, axis=1)
+    interior = (m > 0) & (m < d2.shape[1] - 1)
+    m = np.clip(m, 1, d2.shape[1] - 2)
+
+    rows = np.arange(len(m))
+    y0, y1, y2 = d2[rows, m - 1], d2[rows, m], d2[rows, m + 1]
+    curve = y0 - 2 * y1 + y2
+    shift = np.where(curve > 0, 0.5 * (y0 - y2) / np.where(curve > 0, curve, 1), 0)
+
+    return k - 1 + (m + shift) / REFINE_POINTS, interior
+
+
+def _states(satrecs, sat, jd, fr):
+    """TEME position and velocity of `satrecs[sat[n]]` at (jd[n], fr[n])."""
+    r = np.full((len(sat), 3), np.nan)
+    v = np.full((len(sat), 3), np.nan)
+
+    order = np.argsort(sat, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(sat[order])) + 1):
+        if len(rows):
+            error, r_s, v_s = satrecs[sat[rows[0]]].sgp4_array(jd[rows], fr[rows])
+            ok = error == 0
+            r[rows[ok]], v[rows[ok]] = r_s[ok], v_s[ok]
+    return r, v
+
+
+def screen_segment(lines, perigee, apogee, jd0, fr0, first, last, step, threshold):
+    """Conjunctions whose TCA falls near samples `first`..`last` (inclusive).
+
+    Sample k is at `k * step` seconds after (jd0, fr0); one extra sample is
+    propagated on each side so every screened sample can be refined.
+    Returns (i, j, tca_offset_seconds, miss_km, relative_speed_km_s, candidates).
+    """
+    satrecs = [Satrec.twoline2rv(line1, line2) for line1, line2 in lines]
+    array = SatrecArray(satrecs)
+    reach = threshold + MAX_RELATIVE_SPEED * step / 2
+
+    found = []
+    candidates = 0
+    for block in range(first, last + 1, BLOCK_STEPS):
+        samples = np.arange(block - 1, min(block + BLOCK_STEPS, last + 1) + 1)
+        jd = np.full(len(samples), jd0)
+        fr = fr0 + samples * step / 86400.0
+        error, r, v = array.sgp4(jd, fr)
+        r[error != 0] = np.nan
+        v[error != 0] = np.nan
+
+        for k in range(1, len(samples) - 1):
+            i, j = close_pairs(r[:, k], reach)
+            candidates += len(i)
+
+            keep = shell_filter(i, j, perigee, apogee, threshold)
+            i, j = i[keep], j[keep]
+            keep = path_filter(r[i, k], v[i, k], r[j, k], v[j, k], threshold)
+            i, j = i[keep], j[keep]
+            if not len(i):
+                continue
+
+            window = slice(k - 1, k + 2)
+            dr = r[i, window] - r[j, window]
+            dv = v[i, window] - v[j, window]
+            offset, interior = _closest(dr, dv, k, step)
+            offset = offset[interior]
+            found.append((i[interior], j[interior], (samples[0] + offset) * step))
+
+    if not found:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty.astype(np.int64), empty, empty, empty, 0
+
+    i, j, t = (np.concatenate(column) for column in zip(*found))
+
+    # Exact SGP4 states at every TCA estimate for the final miss distance.
+    jd, fr = np.full(len(t), jd0), fr0 + t / 86400.0
+    r_i, v_i = _states(satrecs, i, jd, fr)
+    r_j, v_j = _states(satrecs, j, jd, fr)
+    miss = np.linalg.norm(r_i - r_j, axis=-1)
+    speed = np.linalg.norm(v_i - v_j, axis=-1)
+
+    close = miss <= threshold
+    return i[close], j[close], t[close], miss[close], speed[close], candidates
+
+
+def _merge(i, j, t, miss, speed, step):
+    """Collapse repeated detections of one encounter to its closest estimate."""
+    if not len(t):
+        return i, j, t, miss, speed
+
+    order = np.lexsort((t, j, i))
+    i, j, t, miss, speed = i[order], j[order], t[order], miss[order], speed[order]
+
+    new = np.ones(len(t), dtype=bool)
+    new[1:] = (i[1:] != i[:-1]) | (j[1:] != j[:-1]) | (t[1:] - t[:-1] > step)
+    group = np.cumsum(new)
+
+    best = np.lexsort((miss, group))
+    best = best[np.r_[True, group[best][1:] != group[best][:-1]]]
+    best = best[np.argsort(t[best], kind="stable")]
+    return i[best], j[best], t[best], miss[best], speed[best]
+
+
+def screen(
+    lines, perigee, apogee, start, stop, threshold=THRESHOLD, step=STEP, workers=1
+):
+    """Screen every pair of element sets for approaches within `threshold` km.
+
+    Returns (i, j, tca, miss_km, relative_speed_km_s, candidates) with `i`,
+    `j` indexing `lines` and `tca` as datetimes. The window is split into
+    contiguous segments that run in a process pool when `workers` > 1.
+    """
+    perigee = np.nan_to_num(np.asarray(perigee, dtype=np.float64), nan=0.0)
+    apogee = np.nan_to_num(np.asarray(apogee, dtype=np.float64), nan=np.inf)
+
+    jd0, fr0 = julian_dates([start])
+    jd0, fr0 = float(jd0[0]), float(fr0[0])
+    last = int((stop - start).total_seconds() // step)
+
+    bounds = np.linspace(0, last + 1, max(workers, 1) + 1).astype(int)
+    segments = [
+        (lines, perigee, apogee, jd0, fr0, lo, hi - 1, step, threshold)
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+        if hi > lo
+    ]
+
+    if len(segments) > 1:
+        with ProcessPoolExecutor(max_workers=len(segments)) as pool:
+            results = list(pool.map(screen_segment, *zip(*segments)))
+    else:
+        results = [screen_segment(*segment) for segment in segments]
+
+    candidates = sum(result[-1] for result in results)
+    i, j, t, miss, speed = (
+        np.concatenate(column) for column in zip(*(r[:-1] for r in results))
+    )
+    i, j, t, miss, speed = _merge(i, j, t, miss, speed, step)
+    tca = [start + timedelta(seconds=s) for s in t.tolist()]
+    return i, j, tca, miss, speed, candidates
+
+
+def run_screening(db: Session, start=None, window=WINDOW, threshold=THRESHOLD):
+    """Screen the current catalog and persist the results as a new screening.
+
+    Older screenings beyond `KEEP_SCREENINGS` are removed.
+    """
+    start = start or datetime.utcnow()
+    stop = start + window
+    began = time.perf_counter()
+
+    rows = db.execute(
+        select(
+            CurrentTLE.norad_cat_id,
+            CurrentTLE.tle_line1,
+            CurrentTLE.tle_line2,
+            CurrentTLE.perigee,
+            CurrentTLE.apogee,
+        ).order_by(CurrentTLE.norad_cat_id)
+    ).all()
+    norad_cat_ids = np.array([row.norad_cat_id for row in rows], dtype=np.int64)
+
+    i, j, tca, miss, speed, candidates = screen(
+        [(row.tle_line1, row.tle_line2) for row in rows],
+        [np.nan if row.perigee is None else row.perigee for row in rows],
+        [np.nan if row.apogee is None else row.apogee for row in rows],
+        start,
+        stop,
+        threshold,
+        workers=WORKERS,
+    )
+
+    screening = ConjunctionScreening(
+        start=start,
+        stop=stop,
+        threshold=threshold,
+        step=STEP,
+        satellites=len(rows),
+        candidates=int(candidates),
+        conjunctions=len(tca),
+        seconds=time.perf_counter() - began,
+    )
+    db.add(screening)
+    db.flush()
+
+    if tca:
+        db.execute(
+            insert(Conjunction),
+            [
+                {
+                    "screening_id": screening.id,
+                    "primary_norad_cat_id": int(norad_cat_ids[a]),
+                    "secondary_norad_cat_id": int(norad_cat_ids[b]),
+                    "tca": t,
+                    "miss_distance": float(d),
+                    "relative_speed": float(s),
+                }
+                for a, b, t, d, s in zip(i, j, tca, miss, speed)
+            ],
+        )
+
+    stale = (
+        select(ConjunctionScreening.id)
+        .order_by(ConjunctionScreening.id.desc())
+        .offset(KEEP_SCREENINGS)
+    )
+    stale = [row[0] for row in db.execute(stale)]
+    if stale:
+        db.execute(delete(Conjunction).where(Conjunction.screening_id.in_(stale)))
+        db.execute(
+            delete(ConjunctionScreening).where(ConjunctionScreening.id.in_(stale))
+        )
+
+    db.commit()
+    bump_generation(RESULTS)
+
+    logger.info(
+        f"Conjunction screening {screening.id}: {len(rows)} satellites, "
+        f"{candidates} candidate pairs, {len(tca)} conjunctions within "
+        f"{threshold} km in {screening.seconds:.1f}s"
+    )
+    return screening
+
+
+if __name__ == "__main__":
+    from app.core.db import Base, SessionLocal, engine
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        run_screening(db)
+    finally:
+        db.close()
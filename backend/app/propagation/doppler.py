@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.propagation.passes import EARTH_ROTATION
+from app.propagation.propagator import julian_dates, teme_to_ecef
+
+SPEED_OF_LIGHT = 299792.458  # km/s
+# Bound on the range rate of anything in Earth orbit seen from the ground,
+# used to widen index lookups before the exact windows are computed.
+MAX_RANGE_RATE = 11.0  # km/s
+
+
+def range_rates(propagator, observer, times):
+    """Range rate (km/s, positive receding) and elevation (degrees).
+
+    Both have shape (n_sat, n_t); failed propagations are NaN.
+    """
+    jd, fr = julian_dates(times)
+    _, r, v = propagator.propagate(jd, fr)
+
+    # Velocity relative to the rotating Earth: rotate, then remove ω × r.
+    r = teme_to_ecef(r, jd, fr)
+    v = teme_to_ecef(v, jd, fr)
+    v[..., 0] += EARTH_ROTATION * r[..., 1]
+    v[..., 1] -= EARTH_ROTATION * r[..., 0]
+
+    line_of_sight = r - observer.ecef
+    distance = np.linalg.norm(line_of_sight, axis=-1)
+    rate = np.einsum("...i,...i->...", line_of_sight, v) / distance
+
+    elevation, _ = observer.look_angles(r)
+    return rate, elevation
+
+
+def range_rate_bounds(propagator, observer, times, min_elevation=0.0):
+    """Lowest and highest range rate per satellite while above `min_elevation`.
+
+    Satellites that never clear the mask at any of `times` get NaN.
+    """
+    rate, elevation = range_rates(propagator, observer, times)
+    visible = elevation >= min_elevation
+    rate = np.where(visible, rate, np.nan)
+
+    empty = ~visible.any(axis=-1)
+    rate[empty] = 0.0
+    low, high = np.nanmin(rate, axis=-1), np.nanmax(rate, axis=-1)
+    low[empty] = high[empty] = np.nan
+    return low, high
+
+
+def shifted(low, high, direction, min_rate, max_rate):
+    """Frequency window to tune to on the ground for a transmitter band.
+
+    A downlink is received at f·(1 − ṙ/c); an uplink has to be sent at
+    f·(1 + ṙ/c) for the satellite to hear f.
+    """
+    if direction == "downlink":
+        return (
+            low * (1 - max_rate / SPEED_OF_LIGHT),
+            high * (1 - min_rate / SPEED_OF_LIGHT),
+        )
+    return (
+        low * (1 + min_rate / SPEED_OF_LIGHT),
+        high * (1 + max_rate / SPEED_OF_LIGHT),
+    )
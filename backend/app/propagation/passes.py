@@ -0,0 +1,312 @@
+from datetime import timedelta
+
+import numpy as np
+from sgp4.api import SatrecArray
+
+from app.propagation.propagator import (
+    EARTH_A,
+    EARTH_E2,
+    julian_dates,
+    teme_to_ecef,
+)
+
+EARTH_RADIUS = 6371.0
+EARTH_ROTATION = 7.2921150e-5  # rad/s
+
+COARSE_STEP = 300.0
+FINE_STEP = 20.0
+CHUNK_SIZE = 1000
+
+# Slack for the ground-track latitude test, covering oblateness and the
+# drift of the elements away from their epoch values.
+PREFILTER_MARGIN = 2.0
+
+
+class Observer:
+    def __init__(self, lat, lon, alt=0.0):
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+
+        phi, lam = np.radians(lat), np.radians(lon)
+        n = EARTH_A / np.sqrt(1 - EARTH_E2 * np.sin(phi) ** 2)
+        self.ecef = np.array(
+            [
+                (n + alt) * np.cos(phi) * np.cos(lam),
+                (n + alt) * np.cos(phi) * np.sin(lam),
+                (n * (1 - EARTH_E2) + alt) * np.sin(phi),
+            ]
+        )
+        self.radius = np.linalg.norm(self.ecef)
+        # Rows are the local east, north and up unit vectors.
+        self.enu = np.array(
+            [
+                [-np.sin(lam), np.cos(lam), 0.0],
+                [-np.sin(phi) * np.cos(lam), -np.sin(phi) * np.sin(lam), np.cos(phi)],
+                [np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)],
+            ]
+        )
+
+    def look_angles(self, ecef):
+        """Elevation and azimuth in degrees for ECEF positions of shape (..., 3)."""
+        east, north, up = np.moveaxis((ecef - self.ecef) @ self.enu.T, -1, 0)
+        elevation = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+        return elevation, azimuth
+
+    def separation(self, ecef):
+        """Earth-central angle between the observer and ECEF positions, in radians."""
+        radius = np.linalg.norm(ecef, axis=-1)
+        cos = (ecef @ self.ecef) / (radius * self.radius)
+        return np.arccos(np.clip(cos, -1.0, 1.0)), radius
+
+    def reach(self, radius, min_elevation):
+        """Largest central angle at which a satellite at `radius` km clears the mask."""
+        e = np.radians(min_elevation)
+        return np.arccos(np.clip(self.radius * np.cos(e) / radius, -1.0, 1.0)) - e
+
+
+def prefilter(inclination, apogee, observer, min_elevation):
+    """Mask of satellites whose ground track can bring them above `min_elevation`.
+
+    A satellite never reaches latitudes beyond its inclination (or 180° minus
+    it for retrograde orbits), and from apogee it can be seen at most one
+    horizon central angle further out.
+    """
+    inclination = np.asarray(inclination, dtype=np.float64)
+    altitude = np.maximum(np.asarray(apogee, dtype=np.float64), 0.0)
+
+    max_lat = np.where(inclination > 90.0, 180.0 - inclination, inclination)
+    reach = np.degrees(observer.reach(EARTH_RADIUS + altitude, min_elevation))
+
+    return max_lat + reach + PREFILTER_MARGIN >= abs(observer.lat)
+
+
+def _crossing(t0, e0, t1, e1, threshold):
+    """Times where elevation crosses `threshold` on the chords between sample pairs."""
+    delta = e1 - e0
+    safe = np.where(delta == 0, 1.0, delta)
+    return np.where(delta == 0, t1, t0 + (t1 - t0) * (threshold - e0) / safe)
+
+
+def _refine(t0, e0, t1, e1, t, e, threshold):
+    """Second secant step, keeping whichever half of the bracket still straddles."""
+    upper = (e >= threshold) == (e1 >= threshold)
+    return np.where(
+        upper,
+        _crossing(t0, e0, t, e, threshold),
+        _crossing(t, e, t1, e1, threshold),
+    )
+
+
+def _look(satrecs, sat, t, jd0, fr0, observer):
+    """Elevation and azimuth of `satrecs[sat[k]]` at `t[k]` seconds after (jd0, fr0).
+
+    SGP4 runs once per satellite over all of its times.
+    """
+    jd, fr = np.full(len(t), jd0), fr0 + t / 86400.0
+    r = np.empty((len(t), 3))
+
+    order = np.argsort(sat, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(sat[order])) + 1):
+        _, r[rows], _ = satrecs[sat[rows[0]]].sgp4_array(jd[rows], fr[rows])
+
+    return observer.look_angles(teme_to_ecef(r, jd, fr))
+
+
+def _passes(satrecs, flagged, grid, nearest, jd0, fr0, observer, min_elevation):
+    """Search the fine grid around flagged coarse samples for one chunk."""
+    # A fine sample is kept when its nearest coarse sample was flagged, plus
+    # one neighbour either side so every run has a bracketing sample.
+    core = flagged[:, nearest]
+    keep = core.copy()
+    keep[:, 1:] |= core[:, :-1]
+    keep[:, :-1] |= core[:, 1:]
+
+    sat, cell = np.nonzero(keep)
+    if not len(sat):
+        return None
+
+    t = grid[cell]
+    el, az = _look(satrecs, sat, t, jd0, fr0, observer)
+
+    # Samples are ordered by satellite then time; `joined` marks a sample that
+    # directly follows the previous one on the grid for the same satellite.
+    joined = np.zeros(len(t), dtype=bool)
+    joined[1:] = (sat[1:] == sat[:-1]) & (cell[1:] == cell[:-1] + 1)
+    joined_next = np.append(joined[1:], False)
+
+    above = el >= min_elevation
+    prev_above = np.zeros(len(t), dtype=bool)
+    prev_above[1:] = above[:-1]
+    next_above = np.append(above[1:], False)
+
+    firsts = np.flatnonzero(above & ~(prev_above & joined))
+    lasts = np.flatnonzero(above & ~(next_above & joined_next))
+    if not len(firsts):
+        return None
+
+    # Highest sample of every run.
+    lengths = lasts - firsts + 1
+    run = np.repeat(np.arange(len(firsts)), lengths)
+    members = np.arange(len(run)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    members += np.repeat(firsts, lengths)
+    order = np.lexsort((-el[members], run))
+    peak = members[order[np.cumsum(lengths) - lengths]]
+
+    # Parabola through the samples around the peak, fitted on sin(elevation)
+    # which stays smooth through the zenith.
+    culmination = t[peak].copy()
+    inner = np.flatnonzero(joined[peak] & joined_next[peak])
+    y0, y1, y2 = np.sin(np.radians(el[peak[inner] + np.array([[-1], [0], [1]])]))
+    curve = y0 - 2 * y1 + y2
+    fits = curve < 0
+    inner, y0, y2, curve = inner[fits], y0[fits], y2[fits], curve[fits]
+    culmination[inner] += (
+        0.5 * (y0 - y2) / curve * (t[peak[inner] + 1] - t[peak[inner]])
+    )
+
+    # Runs touching the ends of the search window have no rise/set.
+    rises = firsts[joined[firsts]]
+    sets = lasts[joined_next[lasts]]
+    rise_est = _crossing(
+        t[rises - 1], el[rises - 1], t[rises], el[rises], min_elevation
+    )
+    set_est = _crossing(t[sets], el[sets], t[sets + 1], el[sets + 1], min_elevation)
+
+    # Evaluate every estimate once more and take a second secant step.
+    est_sat = np.concatenate((sat[rises], sat[peak], sat[sets]))
+    est_t = np.concatenate((rise_est, culmination, set_est))
+    est_el, est_az = _look(satrecs, est_sat, est_t, jd0, fr0, observer)
+    n_rise, n_run = len(rises), len(peak)
+
+    rise_t = np.full(n_run, np.nan)
+    rise_az = np.full(n_run, np.nan)
+    has_rise = joined[firsts]
+    rise_t[has_rise] = _refine(
+        t[rises - 1],
+        el[rises - 1],
+        t[rises],
+        el[rises],
+        rise_est,
+        est_el[:n_rise],
+        min_elevation,
+    )
+    rise_az[has_rise] = est_az[:n_rise]
+
+    set_t = np.full(n_run, np.nan)
+    set_az = np.full(n_run, np.nan)
+    has_set = joined_next[lasts]
+    set_t[has_set] = _refine(
+        t[sets + 1],
+        el[sets + 1],
+        t[sets],
+        el[sets],
+        set_est,
+        est_el[n_rise + n_run :],
+        min_elevation,
+    )
+    set_az[has_set] = est_az[n_rise + n_run :]
+
+    culm_el = est_el[n_rise : n_rise + n_run]
+    culm_az = est_az[n_rise : n_rise + n_run]
+    # Fall back to the best sample if the vertex estimate landed lower.
+    worse = ~(culm_el >= el[peak])
+    culmination[worse] = t[peak][worse]
+    culm_el = np.where(worse, el[peak], culm_el)
+    culm_az = np.where(worse, az[peak], culm_az)
+
+    return (
+        sat[peak],
+        rise_t,
+        rise_az,
+        culmination,
+        culm_el,
+        culm_az,
+        set_t,
+        set_az,
+    )
+
+
+def predict_passes(
+    propagator,
+    observer,
+    start,
+    stop,
+    min_elevation=10.0,
+    step=COARSE_STEP,
+    fine_step=FINE_STEP,
+):
+    """Passes above `min_elevation` for every satellite in `propagator`.
+
+    The whole set is first swept at `step` seconds with a cheap geometric
+    test: a coarse sample is flagged when the satellite's central angle from
+    the observer is within its visibility radius plus the ground-track
+    distance it can cover in half a step, so every visible instant lies
+    within half a step of a flagged sample. Only those stretches are sampled
+    every `fine_step` seconds, and the rise, culmination and set estimates
+    from that grid are evaluated once more to sharpen them.
+
+    A pass already in progress at `start` has no rise, and one still in
+    progress at `stop` has no set.
+    """
+    duration = (stop - start).total_seconds()
+    offsets = np.arange(0.0, duration + step, step)
+    offsets[-1] = min(offsets[-1], duration)
+    grid = np.append(np.arange(0.0, duration, fine_step), duration)
+    nearest = np.minimum(np.rint(grid / step).astype(np.int64), len(offsets) - 1)
+
+    jd0, fr0 = julian_dates([start])
+    jd0, fr0 = jd0[0], fr0[0]
+    jd, fr = np.full(len(offsets), jd0), fr0 + offsets / 86400.0
+
+    found = []
+    for low in range(0, len(propagator), CHUNK_SIZE):
+        satrecs = propagator.satrecs[low : low + CHUNK_SIZE]
+
+        _, r, _ = SatrecArray(satrecs).sgp4(jd, fr)
+        separation, radius = observer.separation(teme_to_ecef(r, jd, fr))
+
+        # Mean motion (rad/min) plus Earth rotation bounds how fast the
+        # sub-satellite point can move relative to the observer.
+        rate = np.array([s.no_kozai / 60.0 for s in satrecs]) + EARTH_ROTATION
+        flagged = separation <= observer.reach(radius, min_elevation) + (
+            rate[:, None] * step / 2
+        )
+
+        chunk = _passes(
+            satrecs, flagged, grid, nearest, jd0, fr0, observer, min_elevation
+        )
+        if chunk is not None:
+            found.append((propagator.norad_cat_ids[low + chunk[0]],) + chunk[1:])
+
+    if not found:
+        return []
+
+    columns = [np.concatenate(column) for column in zip(*found)]
+    order = np.argsort(np.nan_to_num(columns[1], nan=0.0), kind="stable")
+    norad, rise_t, rise_az, culm_t, culm_el, culm_az, set_t, set_az = (
+        column[order].tolist() for column in columns
+    )
+
+    return [
+        {
+            "norad_cat_id": norad[k],
+            "rise_time": _at(start, rise_t[k]),
+            "rise_azimuth": _value(rise_az[k]),
+            "culmination_time": _at(start, culm_t[k]),
+            "max_elevation": culm_el[k],
+            "culmination_azimuth": culm_az[k],
+            "set_time": _at(start, set_t[k]),
+            "set_azimuth": _value(set_az[k]),
+        }
+        for k in range(len(norad))
+    ]
+
+
+def _value(x):
+    return None if x != x else x
+
+
+def _at(start, offset):
+    return None if offset != offset else start + timedelta(seconds=offset)
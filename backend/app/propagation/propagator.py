@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+from sqlalchemy.orm import Session
+
+from app.core.cache import Resident
+from app.core.catalog import load_catalog
+
+# WGS84
+EARTH_A = 6378.137
+EARTH_F = 1 / 298.257223563
+EARTH_E2 = EARTH_F * (2 - EARTH_F)
+EARTH_B = EARTH_A * (1 - EARTH_F)
+EARTH_EP2 = (EARTH_A**2 - EARTH_B**2) / EARTH_B**2
+
+UNIX_EPOCH_JD = 2440587.5
+
+FRAMES = ("teme", "ecef", "geodetic")
+
+
+def julian_dates(times):
+    """Split UTC datetimes into the (jd, fr) pairs SGP4 expects.
+
+    `jd` holds the midnight Julian date and `fr` the day fraction, which keeps
+    full precision in float64.
+    """
+    seconds = np.array(
+        [
+            (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+            for t in times
+        ],
+        dtype=np.float64,
+    )
+    days = np.floor(seconds / 86400.0)
+    return UNIX_EPOCH_JD + days, (seconds - days * 86400.0) / 86400.0
+
+
+def gmst(jd, fr):
+    """Greenwich mean sidereal time in radians (IAU 1982)."""
+    t = (jd - 2451545.0 + fr) / 36525.0
+    theta = (
+        67310.54841
+        + (876600.0 * 3600.0 + 8640184.812866) * t
+        + 0.093104 * t**2
+        - 6.2e-6 * t**3
+    )
+    return np.radians((theta % 86400.0) / 240.0)
+
+
+def teme_to_ecef(r, jd, fr):
+    """Rotate TEME positions of shape (..., n_times, 3) into ECEF (polar motion ignored)."""
+    theta = gmst(jd, fr)
+    cos, sin = np.cos(theta), np.sin(theta)
+
+    x = cos * r[..., 0] + sin * r[..., 1]
+    y = -sin * r[..., 0] + cos * r[..., 1]
+    return np.stack((x, y, r[..., 2]), axis=-1)
+
+
+def ecef_to_geodetic(r):
+    """WGS84 latitude/longitude in degrees and altitude in km (Bowring's method)."""
+    x, y, z = r[..., 0], r[..., 1], r[..., 2]
+    p = np.hypot(x, y)
+    beta = np.arctan2(EARTH_A * z, EARTH_B * p)
+
+    lat = np.arctan2(
+        z + EARTH_EP2 * EARTH_B * np.sin(beta) ** 3,
+        p - EARTH_E2 * EARTH_A * np.cos(beta) ** 3,
+    )
+    sin_lat = np.sin(lat)
+    n = EARTH_A / np.sqrt(1 - EARTH_E2 * sin_lat**2)
+    alt = np.where(
+        np.abs(np.cos(lat)) > 1e-10,
+        p / np.cos(lat) - n,
+        np.abs(z) - EARTH_B,
+    )
+
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), alt
+
+
+class Propagator:
+    """Batched SGP4 over a fixed set of element sets.
+
+    All satellites are propagated together through `SatrecArray`, whose C++
+    loop evaluates every (satellite, time) pair without returning to Python.
+    """
+
+    def __init__(self, norad_cat_ids, lines):
+        self.norad_cat_ids = np.asarray(norad_cat_ids, dtype=np.int64)
+        self.satrecs = [Satrec.twoline2rv(line1, line2) for line1, line2 in lines]
+        self.array = SatrecArray(self.satrecs) if self.satrecs else None
+        self.index = {int(n): i for i, n in enumerate(self.norad_cat_ids)}
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        return cls(catalog.rows["norad_cat_id"], catalog.lines())
+
+    def __len__(self):
+        return len(self.satrecs)
+
+    def subset(self, norad_cat_ids):
+        rows = [self.index[n] for n in norad_cat_ids if n in self.index]
+        sub = Propagator.__new__(Propagator)
+        sub.norad_cat_ids = self.norad_cat_ids[rows]
+        sub.satrecs = [self.satrecs[i] for i in rows]
+        sub.array = SatrecArray(sub.satrecs) if sub.satrecs else None
+        sub.index = {int(n): i for i, n in enumerate(sub.norad_cat_ids)}
+        return sub
+
+    def propagate(self, jd, fr):
+        """Return (error, r, v) with shapes (n_sat, n_t), (n_sat, n_t, 3), (n_sat, n_t, 3).
+
+        Positions are TEME km, velocities km/s; failed evaluations are NaN.
+        """
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        fr = np.atleast_1d(np.asarray(fr, dtype=np.float64))
+        if self.array is None:
+            empty = np.empty((0, len(jd), 3))
+            return np.empty((0, len(jd)), dtype=np.uint8), empty, empty
+
+        error, r, v = self.array.sgp4(jd, fr)
+        failed = error != 0
+        r[failed] = np.nan
+        v[failed] = np.nan
+        return error, r, v
+
+    def positions(self, times, frame="geodetic"):
+        """Positions for every satellite at every time in the requested frame.
+
+        `teme`/`ecef` give an (n_sat, n_t, 3) km array; `geodetic` gives a
+        (lat, lon, alt) tuple of (n_sat, n_t) arrays.
+        """
+        if frame not in FRAMES:
+            raise ValueError(f"Unknown frame: {frame}")
+
+        jd, fr = julian_dates(times)
+        _, r, _ = self.propagate(jd, fr)
+        if frame == "teme":
+            return r
+
+        ecef = teme_to_ecef(r, jd, fr)
+        if frame == "ecef":
+            return ecef
+        return ecef_to_geodetic(ecef)
+
+
+_propagator = Resident(
+    "Propagator",
+    lambda db: Propagator.from_catalog(load_catalog(db)),
+    key=load_catalog,
+    check_seconds=0,
+    ttl=None,
+)
+
+
+def load_propagator(db: Session):
+    """Propagator over the whole current catalog, rebuilt only when it changes.
+
+    Its element sets come from the resident catalog, so it is replaced
+    together with the catalog after a sync and needs no query of its own.
+    It is keyed on the catalog object itself; while a new one is built,
+    requests keep using the previous propagator.
+    """
+    return _propagator.get(db)
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
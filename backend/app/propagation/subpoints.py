@@ -0,0 +1,251 @@
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import DDL, delete, event, func, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.schemas import SubPoint
+from app.fetchers.bulk import BATCH_SIZE, chunked
+from app.propagation.passes import EARTH_RADIUS, Observer
+from app.propagation.propagator import julian_dates, teme_to_ecef, utcnow
+
+logger = logging.getLogger(__name__)
+
+STEP = float(os.environ.get("SUBPOINT_STEP", 120))  # seconds between slots
+HORIZON = float(os.environ.get("SUBPOINT_HORIZON", 1800))  # seconds ahead
+# A sub-point moves at most ~8 km/s, so the stored slot nearest to a query
+# time is within this many km of the true one; the extra covers newer TLEs.
+MARGIN = 8.0 * STEP / 2 + 50.0
+
+# The sub-point as a geography column generated from lat/lon, with a GiST
+# index on (time, geog) so a query reads one slot's neighbourhood only.
+for statement in (
+    "CREATE EXTENSION IF NOT EXISTS postgis",
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "ALTER TABLE subpoints ADD COLUMN geog geography(Point, 4326) "
+    "GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(lon, lat), 4326)::geography) "
+    "STORED",
+    "CREATE INDEX ix_subpoints_time_geog ON subpoints USING gist (time, geog)",
+):
+    event.listen(
+        SubPoint.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+WITHIN = text(
+    "SELECT norad_cat_id FROM subpoints WHERE time = :slot "
+    "AND ST_DWithin(geog, ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography, "
+    ":radius * 1000)"
+)
+IN_FOOTPRINT = text(
+    "SELECT norad_cat_id FROM subpoints WHERE time = :slot "
+    "AND ST_DWithin(geog, ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography, "
+    ":radius * 1000) "
+    "AND ST_DWithin(geog, ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography, "
+    "((acos(least(:earth * cos(:elevation) / (:earth + greatest(alt, 0)), 1)) "
+    "- :elevation) * :earth + :margin) * 1000)"
+)
+
+
+def footprint(alt, min_elevation=0.0):
+    """Ground distance (km) from the sub-point to where the satellite is seen
+    at `min_elevation`; negative if it is never that high anywhere."""
+    radius = EARTH_RADIUS + np.maximum(alt, 0.0)
+    e = np.radians(min_elevation)
+    return EARTH_RADIUS * (
+        np.arccos(np.minimum(EARTH_RADIUS * np.cos(e) / radius, 1.0)) - e
+    )
+
+
+def ground_distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km on the mean-radius sphere (haversine)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _slot(t, step=STEP):
+    """The slot time nearest to `t`, as a naive UTC datetime."""
+    seconds = round(t.timestamp() / step) * step
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+def refresh_subpoints(db: Session, propagator, now=None, horizon=HORIZON, step=STEP):
+    """Fill the slots from `now` to `now + horizon` and drop the expired ones.
+
+    Slots that are already stored are kept, so a run only propagates the
+    ones that moved into the horizon since the last.
+    """
+    begin = time.perf_counter()
+    first = _slot(now or utcnow(), step)
+    slots = [
+        first + timedelta(seconds=k * step)
+        for k in range(int(math.ceil(horizon / step)) + 1)
+    ]
+
+    stored = set(
+        db.scalars(select(SubPoint.time).where(SubPoint.time >= first).distinct())
+    )
+    missing = [slot for slot in slots if slot not in stored]
+
+    written = 0
+    if missing and len(propagator):
+        lat, lon, alt = propagator.positions(
+            [slot.replace(tzinfo=timezone.utc) for slot in missing]
+        )
+        reach = footprint(alt)
+        ids = propagator.norad_cat_ids.tolist()
+
+        def rows():
+            for j, slot in enumerate(missing):
+                valid = ~np.isnan(alt[:, j])
+                for i in np.flatnonzero(valid).tolist():
+                    yield {
+                        "time": slot,
+                        "norad_cat_id": ids[i],
+                        "lat": float(lat[i, j]),
+                        "lon": float(lon[i, j]),
+                        "alt": float(alt[i, j]),
+                        "footprint": float(reach[i, j]),
+                    }
+
+        for batch in chunked(rows(), BATCH_SIZE * 10):
+            db.execute(insert(SubPoint), batch)
+            written += len(batch)
+
+    db.execute(delete(SubPoint).where(SubPoint.time < first))
+    db.commit()
+    logger.info(
+        f"Sub-points: {len(missing)} new slots, {written} rows "
+        f"in {time.perf_counter() - begin:.2f}s"
+    )
+    return written
+
+
+def _candidates(db: Session, slot, lat, lon, radius, min_elevation=None):
+    """NORAD ids whose stored sub-point at `slot` may be within `radius` km.
+
+    With `min_elevation`, each row's own footprint at that elevation (plus
+    the margin) must also reach (lat, lon). None when the slot has not been
+    computed.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        ids = db.scalars(
+            WITHIN if min_elevation is None else IN_FOOTPRINT,
+            {
+                "slot": slot,
+                "lat": lat,
+                "lon": lon,
+                "radius": radius,
+                "margin": MARGIN,
+                "earth": EARTH_RADIUS,
+                "elevation": np.radians(min_elevation or 0.0),
+            },
+        ).all()
+        if ids:
+            return ids
+        exists = db.scalar(select(SubPoint.id).where(SubPoint.time == slot).limit(1))
+        return ids if exists is not None else None
+
+    # Without PostGIS: a latitude/longitude box off the (time, lat) index,
+    # then the exact distance on the rows it returns.
+    band = np.degrees(radius / EARTH_RADIUS)
+    query = select(
+        SubPoint.norad_cat_id, SubPoint.lat, SubPoint.lon, SubPoint.alt
+    ).where(SubPoint.time == slot, SubPoint.lat.between(lat - band, lat + band))
+
+    edge = abs(lat) + band
+    if edge < 89.0:
+        width = band / np.cos(np.radians(edge))
+        if width < 180.0:
+            west, east = lon - width, lon + width
+            if west < -180.0:
+                query = query.where(
+                    or_(SubPoint.lon >= west + 360.0, SubPoint.lon <= east)
+                )
+            elif east > 180.0:
+                query = query.where(
+                    or_(SubPoint.lon >= west, SubPoint.lon <= east - 360.0)
+                )
+            else:
+                query = query.where(SubPoint.lon.between(west, east))
+
+    rows = db.connection().execute(query).all()
+    if not rows:
+        exists = db.scalar(select(SubPoint.id).where(SubPoint.time == slot).limit(1))
+        return [] if exists is not None else None
+
+    ids, lats, lons, alts = map(np.array, zip(*rows))
+    distance = ground_distance(lat, lon, lats, lons)
+    keep = distance <= radius
+    if min_elevation is not None:
+        keep &= distance <= footprint(alts, min_elevation) + MARGIN
+    return ids[keep].tolist()
+
+
+def nearby(db: Session, propagator, t, lat, lon, radius):
+    """Satellites whose sub-point at `t` is within `radius` km of (lat, lon).
+
+    The sub-point table narrows the search to a few candidates, which are
+    then propagated to `t` exactly. If `t` is outside the stored slots, the
+    whole catalog is propagated instead.
+    """
+    ids = _candidates(db, _slot(t), lat, lon, radius + MARGIN)
+    if ids is not None:
+        propagator = propagator.subset(ids)
+
+    sat_lat, sat_lon, sat_alt = (x[:, 0] for x in propagator.positions([t]))
+    distance = ground_distance(lat, lon, sat_lat, sat_lon)
+    keep = np.flatnonzero(distance <= radius)
+    keep = keep[np.argsort(distance[keep])]
+
+    return [
+        {
+            "norad_cat_id": int(propagator.norad_cat_ids[i]),
+            "latitude": float(sat_lat[i]),
+            "longitude": float(sat_lon[i]),
+            "altitude": float(sat_alt[i]),
+            "distance": float(distance[i]),
+        }
+        for i in keep.tolist()
+    ]
+
+
+def visible(db: Session, propagator, t, observer: Observer, min_elevation=0.0):
+    """Satellites above `min_elevation` from `observer` at `t`, highest first."""
+    # Bound the index search by the widest footprint stored for the slot.
+    slot = _slot(t)
+    widest = db.scalar(
+        select(func.max(SubPoint.footprint)).where(SubPoint.time == slot)
+    )
+    if widest is not None:
+        ids = _candidates(
+            db, slot, observer.lat, observer.lon, widest + MARGIN, min_elevation
+        )
+        propagator = propagator.subset(ids)
+
+    jd, fr = julian_dates([t])
+    _, r, _ = propagator.propagate(jd, fr)
+    ecef = teme_to_ecef(r, jd, fr)[:, 0]
+    elevation, azimuth = observer.look_angles(ecef)
+    distance = np.linalg.norm(ecef - observer.ecef, axis=-1)
+
+    keep = np.flatnonzero(elevation >= min_elevation)
+    keep = keep[np.argsort(-elevation[keep])]
+    return [
+        {
+            "norad_cat_id": int(propagator.norad_cat_ids[i]),
+            "elevation": float(elevation[i]),
+            "azimuth": float(azimuth[i]),
+            "range": float(distance[i]),
+        }
+        for i in keep.tolist()
+    ]
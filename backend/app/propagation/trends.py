@@ -0,0 +1,385 @@
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Double, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import RESULTS, bump_generation
+from app.core.schemas import TLE, Manoeuvre, OrbitTrend
+from app.fetchers.cursors import get_cursor
+from app.propagation.propagator import EARTH_A
+
+logger = logging.getLogger(__name__)
+
+TRENDS = "tles:trends"
+
+WORKERS = int(os.environ.get("TREND_WORKERS", os.cpu_count() or 1))
+# Satellites per unit of work handed to the process pool.
+BATCH_SATELLITES = int(os.environ.get("TREND_BATCH_SATELLITES", 500))
+# The decay rate is fitted over this much history, which is also how far
+# before the first new epoch the history is re-read.
+FIT_DAYS = float(os.environ.get("TREND_FIT_DAYS", 30))
+MIN_FIT_POINTS = 3
+MIN_FIT_SPAN = 1.0  # days
+
+# A step between consecutive element sets is a manoeuvre when its change not
+# explained by the drag drift exceeds both the floor and SIGMAS times the
+# robust scatter of the satellite's steps.
+MIN_DELTA_A = float(os.environ.get("MANOEUVRE_MIN_DELTA_A", 0.5))  # km
+MIN_DELTA_I = float(os.environ.get("MANOEUVRE_MIN_DELTA_I", 0.01))  # degrees
+SIGMAS = 6.0
+MIN_SCATTER_POINTS = 8
+
+# Re-entry: exponential atmosphere with a single scale height, integrated
+# down to the altitude where an object is considered to have re-entered.
+SCALE_HEIGHT = 50.0  # km
+REENTRY_ALTITUDE = 120.0  # km
+# Relative uncertainty of the density model, combined with the fit's.
+MODEL_UNCERTAINTY = 0.2
+# Estimates further out than this are not meaningful and not stored.
+LIFETIME_HORIZON = float(os.environ.get("REENTRY_HORIZON_DAYS", 5 * 365.25))
+
+COLUMNS = (
+    "semimajor_axis",
+    "inclination",
+    "perigee",
+    "apogee",
+    "mean_motion",
+    "mean_motion_dot",
+    "bstar",
+)
+
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _datetime64(epochs):
+    # Much faster than letting numpy convert the datetime objects itself.
+    microseconds = ((epoch - UNIX_EPOCH) // MICROSECOND for epoch in epochs)
+    return np.fromiter(microseconds, dtype=np.int64, count=len(epochs)).view(
+        "datetime64[us]"
+    )
+
+
+def _scatter(x):
+    """Robust standard deviation (scaled median absolute deviation)."""
+    if len(x) < MIN_SCATTER_POINTS:
+        return 0.0
+    return 1.4826 * float(np.median(np.abs(x - np.median(x))))
+
+
+def detect_manoeuvres(t, a, inclination):
+    """Find discontinuities in one satellite's element history.
+
+    `t` is in days and sorted. Returns (index, delta_a, delta_i, bad) where
+    `index` is the element set after each manoeuvre, the deltas are the
+    changes not explained by drag, and `bad` marks single element sets that
+    jump away and straight back, which are noise rather than manoeuvres.
+    """
+    dt, da, di = np.diff(t), np.diff(a), np.diff(inclination)
+    bad = np.zeros(len(t), dtype=bool)
+    if not len(dt):
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), bad
+
+    rates = da[dt > 0] / dt[dt > 0]
+    drift = float(np.median(rates)) if len(rates) else 0.0
+    resid_a = da - drift * dt
+
+    jump = (np.abs(resid_a) > max(MIN_DELTA_A, SIGMAS * _scatter(resid_a))) | (
+        np.abs(di) > max(MIN_DELTA_I, SIGMAS * _scatter(di))
+    )
+
+    spike = (
+        jump[:-1]
+        & jump[1:]
+        & (np.abs(resid_a[:-1] + resid_a[1:]) <= MIN_DELTA_A)
+        & (np.abs(di[:-1] + di[1:]) <= MIN_DELTA_I)
+    )
+    bad[1:-1] = spike
+    jump[:-1] &= ~spike
+    jump[1:] &= ~spike
+
+    steps = np.flatnonzero(jump)
+    return steps + 1, resid_a[steps], di[steps], bad
+
+
+def fit_decay(t, a):
+    """Least-squares semimajor axis rate (km/day) and its standard error."""
+    tc = t - t.mean()
+    spread = float(np.sum(tc**2))
+    slope = float(np.sum(tc * (a - a.mean())) / spread)
+    if len(t) <= 2:
+        return slope, None
+    resid = a - a.mean() - slope * tc
+    return slope, math.sqrt(float(np.sum(resid**2)) / (len(t) - 2) / spread)
+
+
+def reentry_window(altitude, rate, error=None):
+    """(earliest, nominal, latest) days until re-entry, or None.
+
+    The decay rate `rate` (km/day, negative) is taken to scale with the
+    density of an exponential atmosphere as the orbit comes down. The
+    window combines the model and fit uncertainties.
+    """
+    if not rate < 0 or (error is not None and rate + 2 * error >= 0):
+        return None
+
+    height = altitude - REENTRY_ALTITUDE
+    if height <= 0:
+        return 0.0, 0.0, 0.0
+    days = SCALE_HEIGHT / -rate * (1 - math.exp(-height / SCALE_HEIGHT))
+    if days > LIFETIME_HORIZON:
+        return None
+
+    spread = math.hypot(MODEL_UNCERTAINTY, (error or 0.0) / rate)
+    return days / (1 + spread), days, days * (1 + spread)
+
+
+def analyse(norad_cat_id, epochs, elements, report_from):
+    """Trend summary and manoeuvres of one satellite.
+
+    `epochs` is a sorted datetime64 array and `elements` maps the names in
+    COLUMNS to arrays aligned with it. Only manoeuvres at or after
+    `report_from` are returned; the history before it is context.
+    """
+    t = epochs.astype("datetime64[us]").astype(np.int64) / 86400e6
+    a, inclination = elements["semimajor_axis"], elements["inclination"]
+    valid = ~(np.isnan(a) | np.isnan(inclination))
+    index, delta_a, delta_i, bad = detect_manoeuvres(
+        t[valid], a[valid], inclination[valid]
+    )
+    tv, av, ev = t[valid], a[valid], epochs[valid]
+
+    manoeuvres = [
+        {
+            "norad_cat_id": norad_cat_id,
+            "before_epoch": ev[k - 1].item(),
+            "epoch": ev[k].item(),
+            "delta_semimajor_axis": float(da),
+            "delta_inclination": float(di),
+        }
+        for k, da, di in zip(index.tolist(), delta_a, delta_i)
+        if ev[k] >= report_from
+    ]
+
+    # Fit over the recent history since the last manoeuvre.
+    first = int(index[-1]) if len(index) else 0
+    fit = np.zeros(len(tv), dtype=bool)
+    fit[first:] = True
+    fit &= (tv >= t[-1] - FIT_DAYS) & ~bad
+
+    rate = error = None
+    points = int(fit.sum())
+    if points >= MIN_FIT_POINTS and np.ptp(tv[fit]) >= MIN_FIT_SPAN:
+        rate, error = fit_decay(tv[fit], av[fit])
+    else:
+        # MEAN_MOTION_DOT is half the mean motion's rate (rev/day^2), and
+        # da/dt = -(2/3) a (dn/dt) / n.
+        points = 0
+        n, ndot = elements["mean_motion"][-1], elements["mean_motion_dot"][-1]
+        if not (np.isnan(n) or np.isnan(ndot) or np.isnan(a[-1])) and n > 0:
+            rate = float(-4.0 / 3.0 * a[-1] * ndot / n)
+
+    def latest(name):
+        value = elements[name][-1]
+        return None if np.isnan(value) else float(value)
+
+    perigee, apogee = latest("perigee"), latest("apogee")
+    if perigee is not None and apogee is not None:
+        altitude = (perigee + apogee) / 2
+    elif latest("semimajor_axis") is not None:
+        altitude = latest("semimajor_axis") - EARTH_A
+    else:
+        altitude = None
+
+    window = None
+    if rate is not None and altitude is not None:
+        window = reentry_window(altitude, rate, error)
+    last_epoch = epochs[-1].item()
+    if window is not None:
+        window = [last_epoch + timedelta(days=days) for days in window]
+
+    trend = {
+        "norad_cat_id": norad_cat_id,
+        "last_epoch": last_epoch,
+        "semimajor_axis": latest("semimajor_axis"),
+        "perigee": perigee,
+        "apogee": apogee,
+        "inclination": latest("inclination"),
+        "bstar": latest("bstar"),
+        "decay_rate": rate,
+        "decay_rate_error": error,
+        "fit_points": points,
+        "reentry_earliest": window[0] if window else None,
+        "reentry": window[1] if window else None,
+        "reentry_latest": window[2] if window else None,
+    }
+    return trend, manoeuvres
+
+
+def analyse_batch(columns, report_from):
+    """Run `analyse` for every satellite in one batch of history rows.
+
+    `columns` holds `norad_cat_id` and `epoch` plus COLUMNS, sorted
+    by satellite then epoch. Runs in the worker processes.
+    """
+    ids, starts = np.unique(columns["norad_cat_id"], return_index=True)
+    stops = np.r_[starts[1:], len(columns["norad_cat_id"])]
+
+    results = []
+    for norad_cat_id, lo, hi in zip(ids.tolist(), starts, stops):
+        elements = {name: columns[name][lo:hi] for name in COLUMNS}
+        results.append(
+            analyse(norad_cat_id, columns["epoch"][lo:hi], elements, report_from)
+        )
+    return results
+
+
+def _load(db: Session, batch):
+    """History rows for a batch of (norad_cat_id, first new epoch) pairs."""
+    report_from = min(epoch for _, epoch in batch)
+    # Core rows with the DECIMAL columns cast to floats in SQL, so no
+    # per-value Decimal conversion happens on this side.
+    rows = (
+        db.connection()
+        .execute(
+            select(
+                TLE.norad_cat_id,
+                TLE.epoch,
+                *(cast(TLE.__table__.c[c], Double).label(c) for c in COLUMNS),
+            )
+            .where(
+                TLE.norad_cat_id.in_([norad_cat_id for norad_cat_id, _ in batch]),
+                TLE.epoch >= report_from - timedelta(days=FIT_DAYS),
+            )
+            .order_by(TLE.norad_cat_id, TLE.epoch)
+        )
+        .all()
+    )
+
+    values = list(zip(*rows)) or [()] * (len(COLUMNS) + 2)
+    columns = {
+        "norad_cat_id": np.array(values[0], dtype=np.int64),
+        "epoch": _datetime64(values[1]),
+    }
+    for name, column in zip(COLUMNS, values[2:]):
+        # None becomes NaN.
+        columns[name] = np.array(column, dtype=np.float64)
+    return columns, np.datetime64(report_from, "us")
+
+
+def _store(db: Session, batch, results):
+    ids = [norad_cat_id for norad_cat_id, _ in batch]
+    report_from = min(epoch for _, epoch in batch)
+
+    db.execute(
+        delete(Manoeuvre).where(
+            Manoeuvre.norad_cat_id.in_(ids), Manoeuvre.epoch >= report_from
+        )
+    )
+    manoeuvres = [m for _, found in results for m in found]
+    if manoeuvres:
+        db.execute(insert(Manoeuvre), manoeuvres)
+
+    counts = {
+        row[0]: row[1:]
+        for row in db.execute(
+            select(Manoeuvre.norad_cat_id, func.count(), func.max(Manoeuvre.epoch))
+            .where(Manoeuvre.norad_cat_id.in_(ids))
+            .group_by(Manoeuvre.norad_cat_id)
+        )
+    }
+    now = datetime.utcnow()
+    trends = []
+    for trend, _ in results:
+        count, last = counts.get(trend["norad_cat_id"], (0, None))
+        trends.append(
+            {**trend, "manoeuvres": count, "last_manoeuvre": last, "updated_at": now}
+        )
+
+    db.execute(delete(OrbitTrend).where(OrbitTrend.norad_cat_id.in_(ids)))
+    if trends:
+        db.execute(insert(OrbitTrend), trends)
+    return len(manoeuvres)
+
+
+def run_trends(db: Session, workers=WORKERS):
+    """Update trend summaries and manoeuvres for satellites with new TLEs.
+
+    Only satellites with element sets fetched since the last run (kept as a
+    sync cursor) are analysed, from their first new epoch minus the fit
+    window. Batches of satellites run in a process pool when `workers` > 1.
+    """
+    began = time.perf_counter()
+    cursor = get_cursor(db, TRENDS)
+
+    query = (
+        select(TLE.norad_cat_id, func.min(TLE.epoch), func.max(TLE.fetched_at))
+        .where(TLE.norad_cat_id.isnot(None))
+        .group_by(TLE.norad_cat_id)
+    )
+    if cursor.last_updated is not None:
+        query = query.where(TLE.fetched_at > cursor.last_updated)
+    changed = db.execute(query).all()
+    if not changed:
+        db.commit()
+        return 0
+
+    # Satellites with similar first new epochs share a batch, so a
+    # back-filled one does not make the others re-read old history.
+    changed.sort(key=lambda row: row[1])
+    batches = [
+        [(row[0], row[1]) for row in changed[i : i + BATCH_SATELLITES]]
+        for i in range(0, len(changed), BATCH_SATELLITES)
+    ]
+
+    workers = min(workers, len(batches))
+    found = 0
+    if workers > 1:
+        # Batches are read here while the pool analyses the previous ones;
+        # at most `workers` are in flight, which bounds the memory held.
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in batches:
+                pending.append((batch, pool.submit(analyse_batch, *_load(db, batch))))
+                if len(pending) >= workers:
+                    done, future = pending.popleft()
+                    found += _store(db, done, future.result())
+            while pending:
+                done, future = pending.popleft()
+                found += _store(db, done, future.result())
+    else:
+        for batch in batches:
+            found += _store(db, batch, analyse_batch(*_load(db, batch)))
+
+    fetched = [row[2] for row in changed if row[2] is not None]
+    if fetched:
+        cursor.last_updated = max(fetched)
+    db.commit()
+    bump_generation(RESULTS)
+
+    logger.info(
+        f"Orbit trends: {len(changed)} satellites, {found} manoeuvres "
+        f"in {time.perf_counter() - began:.1f}s"
+    )
+    return len(changed)
+
+
+if __name__ == "__main__":
+    from app.core.db import Base, SessionLocal, engine
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        run_trends(db)
+    finally:
+        db.close()
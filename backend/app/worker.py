@@ -2,37 +2,161 @@ import logging
 import os
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 from datetime import datetime
+from prometheus_client import start_http_server
 
 from app.fetchers.sync import Syncer
-from app.core.db import SessionLocal
+from app.core.db import Base, SessionLocal, engine
+from app.core.history import (
+    apply_retention,
+    create_upcoming_partitions,
+    partition_tles,
+)
+from app.core.locks import job_lock
+from app.core.metrics import JOB_LAST_RUN, JOBS
+from app.propagation.conjunctions import run_screening
+from app.propagation.propagator import load_propagator
+from app.propagation.subpoints import refresh_subpoints
 
-db = SessionLocal()
+SYNC_INTERVAL_HOURS = float(os.environ.get("SYNC_INTERVAL_HOURS", 6))
+CONJUNCTION_SCREEN_HOURS = float(os.environ.get("CONJUNCTION_SCREEN_HOURS", 24))
+# Must stay below SUBPOINT_HORIZON so the current slot is always stored.
+SUBPOINT_REFRESH_MINUTES = float(os.environ.get("SUBPOINT_REFRESH_MINUTES", 10))
+TLE_RETENTION_HOURS = float(os.environ.get("TLE_RETENTION_HOURS", 24))
+# The worker has no API, so its metrics get their own port when this is set.
+METRICS_PORT = os.environ.get("METRICS_PORT")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def locked(name):
+    """Run the job only if no other process currently holds its lock."""
+
+    def decorator(job):
+        def run():
+            with job_lock(engine, name) as acquired:
+                if not acquired:
+                    logger.info(f" Skipping {name}: already running elsewhere.")
+                    return
+                with JOBS.labels(name).time():
+                    job()
+                JOB_LAST_RUN.labels(name).set_to_current_time()
+
+        run.__name__ = job.__name__
+        return run
+
+    return decorator
+
+
+@locked("satellite_sync")
 def run_sync_job():
     logger.info(f" Running satellite sync job at {datetime.utcnow()}")
     try:
-        syncer = Syncer(db)
+        # Syncer closes the session it is given and opens its own for the
+        # sources it syncs concurrently.
+        syncer = Syncer(SessionLocal())
         syncer.sync()
         logger.info(" Satellite sync completed successfully.")
     except Exception as e:
         logger.error(f"❌ Sync job failed: {e}")
 
 
-def start_scheduler():
-    scheduler = BackgroundScheduler()
+@locked("conjunction_screening")
+def run_conjunction_job():
+    logger.info(f" Running conjunction screening at {datetime.utcnow()}")
+    session = SessionLocal()
+    try:
+        run_screening(session)
+    except Exception as e:
+        logger.error(f"❌ Conjunction screening failed: {e}")
+        session.rollback()
+    finally:
+        session.close()
+
+
+@locked("subpoint_refresh")
+def run_subpoint_job():
+    session = SessionLocal()
+    try:
+        refresh_subpoints(session, load_propagator(session))
+    except Exception as e:
+        logger.error(f"❌ Sub-point refresh failed: {e}")
+        session.rollback()
+    finally:
+        session.close()
 
-    # scheduler.add_job(
-    #     run_sync_job,
-    #     "interval",
-    #     hours=6,
-    #     id="satellite_sync",
-    #     next_run_time=datetime.now(),
-    # )
 
+@locked("tle_history")
+def run_history_job():
+    session = SessionLocal()
+    try:
+        create_upcoming_partitions(engine)
+        apply_retention(session)
+    except Exception as e:
+        logger.error(f"❌ TLE history maintenance failed: {e}")
+        session.rollback()
+    finally:
+        session.close()
+
+
+def start_scheduler(blocking=False):
+    """Schedule the periodic jobs.
+
+    The API only does this when `SCHEDULER_IN_API` is set; normally the jobs
+    run in their own process via `python -m app.worker`.
+    """
+    scheduler = BlockingScheduler() if blocking else BackgroundScheduler()
+    job_defaults = {"max_instances": 1, "coalesce": True}
+
+    scheduler.add_job(
+        run_sync_job,
+        "interval",
+        hours=SYNC_INTERVAL_HOURS,
+        id="satellite_sync",
+        next_run_time=datetime.now(),
+        **job_defaults,
+    )
+
+    scheduler.add_job(
+        run_conjunction_job,
+        "interval",
+        hours=CONJUNCTION_SCREEN_HOURS,
+        id="conjunction_screening",
+        **job_defaults,
+    )
+
+    scheduler.add_job(
+        run_subpoint_job,
+        "interval",
+        minutes=SUBPOINT_REFRESH_MINUTES,
+        id="subpoint_refresh",
+        next_run_time=datetime.now(),
+        **job_defaults,
+    )
+
+    scheduler.add_job(
+        run_history_job,
+        "interval",
+        hours=TLE_RETENTION_HOURS,
+        id="tle_history",
+        **job_defaults,
+    )
+
+    logger.info(
+        f" Scheduler started: sync every {SYNC_INTERVAL_HOURS:g} hours, "
+        f"conjunction screening every {CONJUNCTION_SCREEN_HOURS:g} hours, "
+        f"sub-points every {SUBPOINT_REFRESH_MINUTES:g} minutes, "
+        f"TLE retention every {TLE_RETENTION_HOURS:g} hours."
+    )
     scheduler.start()
-    logger.info(" Scheduler started: Sync job scheduled every 6 hours.")
+
+
+if __name__ == "__main__":
+    if METRICS_PORT:
+        start_http_server(int(METRICS_PORT))
+    Base.metadata.create_all(bind=engine)
+    partition_tles(engine)
+    create_upcoming_partitions(engine)
+    start_scheduler(blocking=True)
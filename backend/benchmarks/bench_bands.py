@@ -0,0 +1,90 @@
+"""Band lookups: the in-memory BandIndex vs. the SQL overlap filter of /rfs.
+
+    python -m benchmarks.bench_bands --transmitters 50000
+
+Runs against a throwaway SQLite file unless DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy import and_, or_, select  # noqa: E402
+
+from app.core.bands import build_band_index  # noqa: E402
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.schemas import RF  # noqa: E402
+from app.fetchers.bulk import BulkWriter  # noqa: E402
+from app.fetchers.parsers import rf_row, satellite_row  # noqa: E402
+from benchmarks.synthetic import make_satcat, make_transmitters  # noqa: E402
+
+
+def sql_overlap(db, low, high):
+    def overlaps(range_low, range_high):
+        return and_(
+            range_low.isnot(None),
+            range_low <= high,
+            or_(range_high >= low, and_(range_high.is_(None), range_low >= low)),
+        )
+
+    return db.execute(
+        select(RF.uuid).where(
+            or_(
+                overlaps(RF.downlink_low, RF.downlink_high),
+                overlaps(RF.uplink_low, RF.uplink_high),
+            )
+        )
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=5000)
+    parser.add_argument("--transmitters", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    writer = BulkWriter(db)
+    writer.upsert_satellites([satellite_row(s) for s in make_satcat(args.satellites)])
+    ids = writer.satellite_ids()
+    writer.upsert_rfs(
+        [
+            rf_row(r, ids[r["norad_cat_id"]])
+            for r in make_transmitters(args.transmitters, args.satellites)
+        ]
+    )
+    db.commit()
+
+    start = time.perf_counter()
+    index = build_band_index(db)
+    print(f"build: {len(index)} intervals in {time.perf_counter() - start:.3f}s")
+
+    rnd = random.Random(0)
+    bands = []
+    for _ in range(args.queries):
+        low = rnd.randint(137_000_000, 2_400_000_000)
+        bands.append((low, low + rnd.choice([0, 100_000, 3_000_000])))
+
+    start = time.perf_counter()
+    found = sum(len(index.query(low, high)) for low, high in bands)
+    indexed = (time.perf_counter() - start) / len(bands)
+
+    start = time.perf_counter()
+    expected = sum(len(sql_overlap(db, low, high)) for low, high in bands)
+    sql = (time.perf_counter() - start) / len(bands)
+
+    print(f"index {indexed * 1e6:8.1f} us/query   sql {sql * 1e6:8.1f} us/query")
+    print(f"matches: index {found}, sql {expected}")
+
+
+if __name__ == "__main__":
+    main()
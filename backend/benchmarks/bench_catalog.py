@@ -0,0 +1,126 @@
+"""Memory and lookup latency of the resident catalog against the ORM.
+
+    python -m benchmarks.bench_catalog --satellites 30000
+
+Loads a synthetic catalog with one element set per satellite into a
+throwaway SQLite file (unless DATABASE_URL is set), then compares:
+
+    memory   the catalog array and index vs. the CurrentTLE and Satellite
+             ORM instances for the same rows (tracemalloc)
+    lookup   `Catalog.get` vs. the query `/satellites/{id}/tle` used to run
+    filter   a country filter over the arrays vs. the same ORM query
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from app.core.catalog import TLE_FIELDS, Catalog  # noqa: E402
+from app.core.db import SessionLocal  # noqa: E402
+from app.core.schemas import CurrentTLE, Satellite  # noqa: E402
+from benchmarks.bench_export import load  # noqa: E402
+
+
+def allocated(fn):
+    """Result of `fn` and the bytes it still holds once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def latencies(fn, keys):
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=30000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+
+    load(args.satellites, args.satellites)
+    db = SessionLocal()
+
+    start = time.perf_counter()
+    Catalog.from_db(db)
+    build = time.perf_counter() - start
+    catalog, catalog_bytes = allocated(lambda: Catalog.from_db(db))
+    n = len(catalog)
+
+    def orm():
+        tles = db.query(CurrentTLE).all()
+        satellites = db.query(Satellite).all()
+        return tles, satellites
+
+    orm_rows, orm_bytes = allocated(orm)
+    del orm_rows
+    db.expunge_all()
+
+    print(f"{n} satellites, catalog built in {build:.2f}s")
+    print(
+        f"memory   catalog {catalog_bytes / n:7.0f} B/satellite  "
+        f"(array {catalog.nbytes / n:.0f} B)   "
+        f"ORM {orm_bytes / n:7.0f} B/satellite   "
+        f"{orm_bytes / catalog_bytes:5.1f}x smaller"
+    )
+
+    rng = random.Random(0)
+    ids = catalog.rows["norad_cat_id"].tolist()
+    keys = [rng.choice(ids) for _ in range(args.lookups)]
+
+    def query(norad_cat_id):
+        db.query(CurrentTLE).filter_by(norad_cat_id=norad_cat_id).first()
+        db.expunge_all()
+
+    for label, fn in (
+        ("catalog", lambda key: catalog.get(key, TLE_FIELDS)),
+        ("query", query),
+    ):
+        p50, p99 = latencies(fn, keys)
+        print(f"lookup   {label:8s} p50 {p50 * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us")
+
+    countries = [c.decode() for c in set(catalog.rows["country"].tolist()) if c] or [
+        "US"
+    ]
+
+    def catalog_filter(country):
+        positions = catalog.filter(country=country)
+        return catalog.rows["norad_cat_id"][positions].tolist()
+
+    def query_filter(country):
+        return (
+            db.query(CurrentTLE.norad_cat_id)
+            .join(Satellite, Satellite.id == CurrentTLE.satellite_id)
+            .filter(Satellite.country == country)
+            .all()
+        )
+
+    for label, fn in (("catalog", catalog_filter), ("query", query_filter)):
+        p50, p99 = latencies(fn, countries * 20)
+        print(f"filter   {label:8s} p50 {p50 * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
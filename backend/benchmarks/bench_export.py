@@ -0,0 +1,148 @@
+"""Peak server RSS and time to first byte: `db.query(TLE).all()` vs. NDJSON.
+
+    python -m benchmarks.bench_export --tles 200000
+
+Loads a synthetic TLE history into a throwaway SQLite file (unless
+DATABASE_URL is set), then for each mode starts a fresh uvicorn process
+serving this module's `app` and downloads the whole table once. The old
+endpoint (load every ORM object, encode the list) is kept here as
+`/baseline`; the streamed one is the real `/tles?stream=1`. Peak RSS is the
+server's VmHWM, so it includes the interpreter and the app (`idle`).
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.api.routes import router  # noqa: E402
+from app.core.db import get_db  # noqa: E402
+from app.core.schemas import TLE  # noqa: E402
+
+app = FastAPI()
+app.include_router(router)
+
+
+@app.get("/baseline")
+async def baseline(db: Session = Depends(get_db)):
+    return db.query(TLE).all()
+
+
+MODES = {"all": "/baseline", "stream": "/tles?stream=1"}
+
+
+def load(satellites, tles):
+    from app.core.db import Base, SessionLocal, engine
+    from app.fetchers.bulk import BulkWriter
+    from app.fetchers.parsers import satellite_row, tle_row
+    from benchmarks.synthetic import make_satcat, make_tles
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    writer = BulkWriter(db)
+    writer.upsert_satellites([satellite_row(s) for s in make_satcat(satellites)])
+    db.commit()
+    ids = writer.satellite_ids()
+    writer.insert_tles(
+        [
+            tle_row(t, ids[int(t["NORAD_CAT_ID"])])
+            for t in make_tles(tles, satellites=satellites)
+        ]
+    )
+    db.commit()
+    db.close()
+
+
+def peak_rss(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(mode):
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.bench_export:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ]
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{base}/docs", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        idle = peak_rss(server.pid)
+
+        start = time.perf_counter()
+        size = 0
+        first = None
+        with requests.get(f"{base}{MODES[mode]}", stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(64 * 1024):
+                if first is None:
+                    first = time.perf_counter() - start
+                size += len(chunk)
+        total = time.perf_counter() - start
+
+        return {
+            "idle": idle,
+            "peak": peak_rss(server.pid),
+            "ttfb": first,
+            "total": total,
+            "size": size,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=20000)
+    parser.add_argument("--tles", type=int, default=200000)
+    args = parser.parse_args()
+
+    load(args.satellites, args.tles)
+    print(f"{args.tles} TLE rows")
+    for mode in MODES:
+        r = run(mode)
+        print(
+            f"{mode:6s} idle {r['idle']:7.1f} MB  peak {r['peak']:7.1f} MB  "
+            f"ttfb {r['ttfb'] * 1e3:8.1f} ms  total {r['total']:6.2f}s  "
+            f"{r['size'] / 1e6:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""TLE history growth: insert throughput and history-query latency per year.
+
+    python -m benchmarks.bench_history --satellites 500 --years 3 --per-day 3
+
+Loads the history a year at a time and, after each year, times inserting
+it and random one-month `/satellites/{id}/tles` windows. Retention is then
+applied and the queries timed again. Runs against a throwaway SQLite file
+unless DATABASE_URL is set; on PostgreSQL `tles` is partitioned first.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+import numpy as np  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.history import (  # noqa: E402
+    apply_retention,
+    create_upcoming_partitions,
+    partition_tles,
+)
+from app.core.schemas import TLE  # noqa: E402
+from app.fetchers.bulk import BulkWriter  # noqa: E402
+from app.fetchers.parsers import satellite_row, tle_row  # noqa: E402
+from benchmarks.synthetic import make_satcat, make_tles  # noqa: E402
+
+START = datetime(2020, 1, 1)
+
+
+def year_of_tles(satellites, year, per_day, ids, seed):
+    """`per_day` element sets per satellite and day through one year."""
+    first = datetime(START.year + year, 1, 1)
+    days = (datetime(first.year + 1, 1, 1) - first).days
+    rnd = random.Random(seed)
+
+    template = [
+        tle_row(t, ids[int(t["NORAD_CAT_ID"])])
+        for t in make_tles(satellites, seed=seed)
+    ]
+    spacing = 86400 / per_day
+    for day in range(days):
+        for k in range(per_day):
+            base = first + timedelta(days=day, seconds=k * spacing)
+            for row in template:
+                yield {
+                    **row,
+                    "epoch": base + timedelta(seconds=rnd.uniform(0, spacing - 1)),
+                }
+
+
+def history(db, norad_cat_id, start, stop, limit=1000):
+    return (
+        db.query(TLE)
+        .filter(TLE.norad_cat_id == norad_cat_id, TLE.epoch >= start, TLE.epoch < stop)
+        .order_by(TLE.epoch, TLE.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def time_queries(db, satellites, years, queries, rnd):
+    span = (datetime(START.year + years, 1, 1) - START).days - 30
+    latencies = []
+    for _ in range(queries):
+        start = START + timedelta(days=rnd.randint(0, span))
+        norad = rnd.randint(1, satellites)
+        begin = time.perf_counter()
+        history(db, norad, start, start + timedelta(days=30))
+        latencies.append(time.perf_counter() - begin)
+        db.expunge_all()
+    return np.percentile(np.array(latencies) * 1000, [50, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=500)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--per-day", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partition_tles(engine)
+    create_upcoming_partitions(engine)
+
+    db = SessionLocal()
+    writer = BulkWriter(db)
+    writer.upsert_satellites([satellite_row(s) for s in make_satcat(args.satellites)])
+    db.commit()
+    ids = writer.satellite_ids()
+    rnd = random.Random(0)
+
+    print(
+        f"{'year':>4} {'rows':>10} {'insert/s':>10} {'total':>10} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for year in range(args.years):
+        begin = time.perf_counter()
+        written = writer.insert_tles(
+            year_of_tles(args.satellites, year, args.per_day, ids, seed=year)
+        )
+        db.commit()
+        elapsed = time.perf_counter() - begin
+
+        total = db.scalar(select(func.count()).select_from(TLE))
+        p50, p99 = time_queries(db, args.satellites, year + 1, args.queries, rnd)
+        print(
+            f"{START.year + year:>4} {written:>10} {written / elapsed:>10.0f} "
+            f"{total:>10} {p50:>8.2f} {p99:>8.2f}"
+        )
+
+    # Retention as of the end of the loaded history.
+    now = datetime(START.year + args.years, 1, 1)
+    begin = time.perf_counter()
+    removed = apply_retention(db, now=now)
+    elapsed = time.perf_counter() - begin
+    total = db.scalar(select(func.count()).select_from(TLE))
+    p50, p99 = time_queries(db, args.satellites, args.years, args.queries, rnd)
+    print(
+        f"retention: {removed} rows removed in {elapsed:.1f}s, {total} left, "
+        f"queries p50 {p50:.2f} ms p99 {p99:.2f} ms"
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Ingest throughput: BulkWriter vs. the old per-row query-then-add loop.
+
+    python -m benchmarks.bench_ingest --satellites 20000 --tles 40000 --rfs 5000
+
+Runs against a throwaway SQLite file unless DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.schemas import Satellite, TLE, RF  # noqa: E402
+from app.fetchers.bulk import BulkWriter  # noqa: E402
+from app.fetchers.parsers import satellite_row, tle_row, rf_row  # noqa: E402
+from benchmarks.synthetic import (  # noqa: E402
+    make_satcat,
+    make_tles,
+    make_transmitters,
+)
+
+
+def reset():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def run_bulk(satcat, tles, rfs, batch_size):
+    db = SessionLocal()
+    writer = BulkWriter(db, batch_size=batch_size)
+    timings = {}
+
+    start = time.perf_counter()
+    writer.upsert_satellites([satellite_row(s) for s in satcat])
+    db.commit()
+    timings["satellites"] = time.perf_counter() - start
+
+    ids = writer.satellite_ids()
+
+    start = time.perf_counter()
+    writer.insert_tles([tle_row(t, ids[int(t["NORAD_CAT_ID"])]) for t in tles])
+    db.commit()
+    timings["tles"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    writer.upsert_rfs([rf_row(r, ids[int(r["norad_cat_id"])]) for r in rfs])
+    db.commit()
+    timings["rfs"] = time.perf_counter() - start
+
+    db.close()
+    return timings
+
+
+def run_naive(satcat, tles, rfs):
+    db = SessionLocal()
+    timings = {}
+
+    start = time.perf_counter()
+    for sat in satcat:
+        row = satellite_row(sat)
+        if db.query(Satellite).filter_by(norad_cat_id=row["norad_cat_id"]).first():
+            continue
+        db.add(Satellite(**row))
+    db.commit()
+    timings["satellites"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for tle in tles:
+        sat = (
+            db.query(Satellite).filter_by(norad_cat_id=int(tle["NORAD_CAT_ID"])).first()
+        )
+        row = tle_row(tle, sat.id)
+        if db.query(TLE).filter_by(satellite_id=sat.id, epoch=row["epoch"]).first():
+            continue
+        db.add(TLE(**row))
+    db.commit()
+    timings["tles"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for rf in rfs:
+        sat = (
+            db.query(Satellite).filter_by(norad_cat_id=int(rf["norad_cat_id"])).first()
+        )
+        if db.query(RF).filter_by(uuid=rf["uuid"]).first():
+            continue
+        db.add(RF(**rf_row(rf, sat.id)))
+    db.commit()
+    timings["rfs"] = time.perf_counter() - start
+
+    db.close()
+    return timings
+
+
+def report(name, timings, counts):
+    for table, seconds in timings.items():
+        print(
+            f"{name:6s} {table:10s} {counts[table]:8d} rows "
+            f"{seconds:8.2f}s {counts[table] / seconds:10.0f} rows/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=20000)
+    parser.add_argument("--tles", type=int, default=40000)
+    parser.add_argument("--rfs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-naive", action="store_true")
+    args = parser.parse_args()
+
+    satcat = make_satcat(args.satellites)
+    tles = make_tles(args.tles, satellites=args.satellites)
+    rfs = make_transmitters(args.rfs, satellites=args.satellites)
+    counts = {"satellites": len(satcat), "tles": len(tles), "rfs": len(rfs)}
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+
+    reset()
+    report("bulk", run_bulk(satcat, tles, rfs, args.batch_size), counts)
+
+    if not args.skip_naive:
+        reset()
+        report("naive", run_naive(satcat, tles, rfs), counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""All-catalog pass prediction for one ground station.
+
+python -m benchmarks.bench_passes --satellites 20000 --hours 24
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.propagation.passes import (
+    COARSE_STEP,
+    FINE_STEP,
+    Observer,
+    predict_passes,
+    prefilter,
+)
+from app.propagation.propagator import Propagator
+from benchmarks.synthetic import make_tles
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=20000)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--lat", type=float, default=45.0)
+    parser.add_argument("--lon", type=float, default=26.0)
+    parser.add_argument("--min-elevation", type=float, default=10.0)
+    parser.add_argument("--step", type=float, default=COARSE_STEP)
+    parser.add_argument("--fine-step", type=float, default=FINE_STEP)
+    args = parser.parse_args()
+
+    tles = make_tles(args.satellites)
+    observer = Observer(args.lat, args.lon)
+    start = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    stop = start + timedelta(hours=args.hours)
+
+    begin = time.perf_counter()
+    mask = prefilter(
+        [float(t["INCLINATION"]) for t in tles],
+        [float(t["APOGEE"]) for t in tles],
+        observer,
+        args.min_elevation,
+    )
+    candidates = [t for t, keep in zip(tles, mask) if keep]
+    propagator = Propagator(
+        [int(t["NORAD_CAT_ID"]) for t in candidates],
+        [(t["TLE_LINE1"], t["TLE_LINE2"]) for t in candidates],
+    )
+    prepared = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    passes = predict_passes(
+        propagator,
+        observer,
+        start,
+        stop,
+        args.min_elevation,
+        args.step,
+        args.fine_step,
+    )
+    predicted = time.perf_counter() - begin
+
+    print(
+        f"prefilter kept {int(np.sum(mask))}/{len(tles)} satellites, "
+        f"setup {prepared:.2f}s"
+    )
+    print(
+        f"{len(passes)} passes over {args.hours:g}h in {predicted:.2f}s "
+        f"({len(propagator) / predicted:.0f} satellites/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
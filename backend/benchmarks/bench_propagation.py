@@ -0,0 +1,69 @@
+"""SGP4 throughput: batched SatrecArray vs. a per-satellite Python loop.
+
+python -m benchmarks.bench_propagation --satellites 2000 --times 1000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sgp4.api import Satrec
+
+from app.propagation.propagator import Propagator, julian_dates
+from benchmarks.synthetic import make_tles
+
+
+def naive(lines, jd, fr):
+    satrecs = [Satrec.twoline2rv(line1, line2) for line1, line2 in lines]
+    for satrec in satrecs:
+        for j, f in zip(jd, fr):
+            satrec.sgp4(j, f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=2000)
+    parser.add_argument("--times", type=int, default=1000)
+    parser.add_argument("--naive-satellites", type=int, default=200)
+    args = parser.parse_args()
+
+    tles = make_tles(args.satellites)
+    lines = [(t["TLE_LINE1"], t["TLE_LINE2"]) for t in tles]
+    norad_ids = [int(t["NORAD_CAT_ID"]) for t in tles]
+
+    start = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    times = [start + timedelta(minutes=i) for i in range(args.times)]
+    jd, fr = julian_dates(times)
+
+    begin = time.perf_counter()
+    propagator = Propagator(norad_ids, lines)
+    load = time.perf_counter() - begin
+
+    evaluations = args.satellites * args.times
+    rows = []
+
+    begin = time.perf_counter()
+    propagator.propagate(jd, fr)
+    rows.append(("batched teme", time.perf_counter() - begin, evaluations))
+
+    begin = time.perf_counter()
+    propagator.positions(times, "geodetic")
+    rows.append(("batched geodetic", time.perf_counter() - begin, evaluations))
+
+    subset = lines[: args.naive_satellites]
+    begin = time.perf_counter()
+    naive(subset, jd, fr)
+    rows.append(
+        ("naive loop teme", time.perf_counter() - begin, len(subset) * args.times)
+    )
+
+    print(f"loaded {len(propagator)} element sets in {load:.3f}s")
+    for name, seconds, count in rows:
+        print(
+            f"{name:18s} {count:10d} evals {seconds:8.3f}s "
+            f"{count / seconds / 1e6:8.2f} M evals/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Typeahead latency of the in-memory satellite search index.
+
+    python -m benchmarks.bench_search --satellites 60000
+
+Names are drawn from catalog-like patterns (constellations with serial
+numbers, debris and rocket bodies) so prefix ranges and trigram postings
+have realistic sizes.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.core.search import SearchIndex
+
+PATTERNS = [
+    "STARLINK-{n}",
+    "COSMOS {n}",
+    "COSMOS {n} DEB",
+    "FENGYUN 1C DEB",
+    "SL-{n} R/B",
+    "ONEWEB-{n:04d}",
+    "IRIDIUM {n}",
+    "NOAA {n}",
+    "GPS BIIR-{n} (PRN {m:02d})",
+    "CZ-{m}B R/B",
+    "FLOCK 4P-{n}",
+    "LEMUR-2-{n}",
+]
+COUNTRIES = ["US", "PRC", "CIS", "ESA", "JPN", "IND", "FR", "UK"]
+QUERIES = [
+    "s",
+    "st",
+    "star",
+    "starlink-1",
+    "starlink 1234",
+    "cosmos 22",
+    "cosmos deb",
+    "fengyun",
+    "starlnk",
+    "iridum 7",
+    "1998-067",
+    "25544",
+    "prc",
+    "gps prn 12",
+]
+
+
+def make_catalog(n, seed=0):
+    rnd = random.Random(seed)
+    satellites = []
+    for i in range(n):
+        norad = i + 1
+        name = rnd.choice(PATTERNS).format(n=rnd.randint(1, 6000), m=rnd.randint(1, 32))
+        year = 1960 + norad % 64
+        satellites.append(
+            {
+                "norad_cat_id": norad,
+                "satname": name[:25],
+                "object_name": name[:25],
+                "object_id": f"{year}-{norad % 999:03d}A",
+                "intldes": f"{year % 100:02d}{norad % 999:03d}A",
+                "country": rnd.choice(COUNTRIES),
+                "object_type": "PAYLOAD",
+            }
+        )
+    return satellites
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=60000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    satellites = make_catalog(args.satellites)
+    start = time.perf_counter()
+    index = SearchIndex(satellites)
+    print(f"build: {len(index)} satellites in {time.perf_counter() - start:.2f}s")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = index.search(query)
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1e3
+        top = results[0]["satname"] if results else "-"
+        print(
+            f"{query!r:18s} p50 {np.percentile(timings, 50):6.2f} ms  "
+            f"p99 {np.percentile(timings, 99):6.2f} ms  top {top}"
+        )
+
+
+if __name__ == "__main__":
+    main()
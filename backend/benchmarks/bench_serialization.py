@@ -0,0 +1,136 @@
+"""CPU time to query and encode 10k rows of the paged catalog routes.
+
+    python -m benchmarks.bench_serialization --tles 10000
+
+Loads a synthetic TLE history into a throwaway SQLite file (unless
+DATABASE_URL is set) and walks it in MAX_LIMIT pages the way `/tles` does,
+timing each way a page has been turned into a response body:
+
+    orm       ORM instances through the response model and jsonable_encoder
+    mappings  column mappings through the response model (the old paginate)
+    orjson    column tuples encoded directly (the current `/tles`)
+    msgpack   the same, as MessagePack (needs `msgpack`)
+
+Times are process CPU seconds per 10k rows, best of `--repeat`.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.api import encoding  # noqa: E402
+from app.api.models import Page, TLEOut  # noqa: E402
+from app.api.pagination import MAX_LIMIT, paginate  # noqa: E402
+from app.core.db import SessionLocal  # noqa: E402
+from app.core.schemas import TLE  # noqa: E402
+from benchmarks.bench_export import load  # noqa: E402
+
+FIELD = create_response_field(name="Response_tles", type_=Page[TLEOut])
+
+
+def _through_model(page):
+    content = asyncio.run(
+        serialize_response(field=FIELD, response_content=page, exclude_unset=True)
+    )
+    return JSONResponse(content).body
+
+
+def orm_page(db, cursor):
+    items = (
+        db.query(TLE)
+        .filter(TLE.id > (cursor or 0))
+        .order_by(TLE.id)
+        .limit(MAX_LIMIT + 1)
+        .all()
+    )
+    next_cursor = items[MAX_LIMIT - 1].id if len(items) > MAX_LIMIT else None
+    page = {"items": items[:MAX_LIMIT], "next_cursor": next_cursor}
+    return _through_model(page), next_cursor
+
+
+def mappings_page(db, cursor):
+    columns = list(TLE.__table__.columns)
+    query = select(*columns).order_by(TLE.id).limit(MAX_LIMIT + 1)
+    if cursor is not None:
+        query = query.where(TLE.id > cursor)
+    rows = db.execute(query).mappings().all()
+    next_cursor = rows[MAX_LIMIT - 1]["id"] if len(rows) > MAX_LIMIT else None
+    page = {
+        "items": [dict(row) for row in rows[:MAX_LIMIT]],
+        "next_cursor": next_cursor,
+    }
+    return _through_model(page), next_cursor
+
+
+def orjson_page(db, cursor):
+    page = paginate(db, TLE, [], cursor=cursor, limit=MAX_LIMIT)
+    return encoding.encode_json(page), page["next_cursor"]
+
+
+def msgpack_page(db, cursor):
+    page = paginate(db, TLE, [], cursor=cursor, limit=MAX_LIMIT)
+    return encoding.encode_msgpack(page), page["next_cursor"]
+
+
+MODES = {
+    "orm": orm_page,
+    "mappings": mappings_page,
+    "orjson": orjson_page,
+    "msgpack": msgpack_page,
+}
+
+
+def run(mode, rows):
+    db = SessionLocal()
+    try:
+        start = time.process_time()
+        cursor = None
+        size = 0
+        done = 0
+        while done < rows:
+            body, cursor = MODES[mode](db, cursor)
+            size += len(body)
+            done += MAX_LIMIT
+            if cursor is None:
+                break
+        return time.process_time() - start, size
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=2000)
+    parser.add_argument("--tles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    load(args.satellites, args.tles)
+    print(f"{args.tles} TLE rows in pages of {MAX_LIMIT}")
+    baseline = None
+    for mode in MODES:
+        if mode == "msgpack" and encoding.msgpack is None:
+            print(f"{mode:9s} skipped (msgpack is not installed)")
+            continue
+        best, size = min(run(mode, args.tles) for _ in range(args.repeat))
+        per_10k = best * 10000 / args.tles
+        baseline = baseline or per_10k
+        print(
+            f"{mode:9s} {per_10k * 1e3:8.1f} ms CPU / 10k rows  "
+            f"{baseline / per_10k:5.1f}x  {size / 1e6:6.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Catalog snapshot (.npz / memory-mapped .npy) vs. the JSON catalog.
+
+    python -m benchmarks.bench_snapshot --satellites 20000
+
+Loads a synthetic catalog into a throwaway SQLite file (unless DATABASE_URL
+is set), writes a snapshot and compares it with the same rows as the JSON a
+client pulls from /tles/latest: transfer size, client parse time and
+propagator cold start, plus building the API's resident catalog from the
+database vs. from the snapshot.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+import numpy as np  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.core.catalog import Catalog  # noqa: E402
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.schemas import CurrentTLE  # noqa: E402
+from app.core.snapshot import Snapshot, write_snapshot  # noqa: E402
+from app.fetchers.bulk import BulkWriter  # noqa: E402
+from app.fetchers.parsers import satellite_row, tle_row  # noqa: E402
+from app.propagation.propagator import Propagator  # noqa: E402
+from benchmarks.synthetic import make_satcat, make_tles  # noqa: E402
+
+
+def load_catalog(n):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    writer = BulkWriter(db)
+    writer.upsert_satellites([satellite_row(s) for s in make_satcat(n)])
+    db.commit()
+    ids = writer.satellite_ids()
+    writer.insert_tles([tle_row(t, ids[int(t["NORAD_CAT_ID"])]) for t in make_tles(n)])
+    db.commit()
+    return db
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=20000)
+    args = parser.parse_args()
+
+    db = load_catalog(args.satellites)
+    directory = tempfile.mkdtemp(prefix="snapshots-")
+    manifest = write_snapshot(db, directory)
+
+    rows = [
+        dict(row._mapping)
+        for row in db.execute(
+            select(*CurrentTLE.__table__.columns).order_by(CurrentTLE.norad_cat_id)
+        )
+    ]
+    body = json.dumps(rows, default=str).encode()
+    archive = os.path.join(directory, manifest["file"])
+    with open(archive, "rb") as f:
+        npz = f.read()
+
+    print(f"rows: {manifest['rows']}")
+    print(
+        f"size        json {len(body) / 1e6:8.2f} MB   "
+        f"json+gzip {len(gzip.compress(body)) / 1e6:8.2f} MB   "
+        f"npz {len(npz) / 1e6:8.2f} MB"
+    )
+
+    def parse_json():
+        return json.loads(body)
+
+    def parse_npz():
+        with np.load(archive) as data:
+            return {name: data[name] for name in data.files}
+
+    json_parse, _ = timed(parse_json)
+    npz_parse, _ = timed(parse_npz)
+    print(
+        f"parse       json {json_parse * 1e3:8.1f} ms   npz {npz_parse * 1e3:8.1f} ms"
+    )
+
+    def from_json():
+        records = json.loads(body)
+        return Propagator(
+            [r["norad_cat_id"] for r in records],
+            [(r["tle_line1"], r["tle_line2"]) for r in records],
+        )
+
+    def from_snapshot():
+        return Propagator.from_catalog(
+            Catalog.from_snapshot(Snapshot(manifest, directory))
+        )
+
+    json_start, _ = timed(from_json, 3)
+    snapshot_start, _ = timed(from_snapshot, 3)
+    print(
+        f"propagator  json {json_start * 1e3:8.1f} ms   "
+        f"snapshot {snapshot_start * 1e3:8.1f} ms"
+    )
+
+    catalog_db, _ = timed(lambda: Catalog.from_db(db), 3)
+    catalog_snapshot, _ = timed(
+        lambda: Catalog.from_snapshot(Snapshot(manifest, directory)), 3
+    )
+    print(
+        f"catalog     db   {catalog_db * 1e3:8.1f} ms   "
+        f"snapshot {catalog_snapshot * 1e3:8.1f} ms"
+    )
+
+    def open_snapshot():
+        snapshot = Snapshot(manifest, directory)
+        return snapshot["mean_motion"].sum()
+
+    mmap_open, _ = timed(open_snapshot)
+    print(f"mmap open + scan of one column {mmap_open * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
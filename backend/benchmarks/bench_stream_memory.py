@@ -0,0 +1,97 @@
+"""Peak memory of buffered `res.json()` vs. streaming ingestion.
+
+    python -m benchmarks.bench_stream_memory --records 100000
+
+Starts the stub server in a subprocess with a synthetic payload, then pulls
+`tle_latest` both ways and parses every record into row dicts in batches,
+the way `Syncer.sync_TLEs` does. Peak is measured with tracemalloc, so only
+Python allocations in this process are counted.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from app.fetchers.bulk import BATCH_SIZE, chunked
+from app.fetchers.parsers import tle_row
+from app.fetchers.stream import CHUNK_SIZE, iter_json_array
+
+URL = "http://127.0.0.1:{port}/basicspacedata/query/class/tle_latest/format/json"
+
+
+def buffered(url):
+    records = requests.get(url).json()
+    count = 0
+    for batch in chunked(records, BATCH_SIZE):
+        count += len([tle_row(tle, 1) for tle in batch])
+    return count
+
+
+def streamed(url):
+    res = requests.get(url, stream=True)
+    count = 0
+    for batch in chunked(iter_json_array(res.iter_content(CHUNK_SIZE)), BATCH_SIZE):
+        count += len([tle_row(tle, 1) for tle in batch])
+    return count
+
+
+def measure(fn, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn(url)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def wait_for(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.head(url, timeout=1)
+            return
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError("stub server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.stub_server",
+            "--port",
+            str(args.port),
+            "--synthetic",
+            str(args.records),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = URL.format(port=args.port)
+        wait_for(url)
+
+        for name, fn in (("buffered", buffered), ("streamed", streamed)):
+            count, elapsed, peak = measure(fn, url)
+            print(
+                f"{name:9s} {count:8d} records {elapsed:7.2f}s "
+                f"peak {peak / 2**20:8.1f} MiB"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
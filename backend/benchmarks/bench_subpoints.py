@@ -0,0 +1,128 @@
+"""Overhead queries through the sub-point table vs. propagating the catalog.
+
+    python -m benchmarks.bench_subpoints --sizes 1000 5000 20000
+
+For each catalog size the sub-point table is refreshed once, then random
+"within X km" and "visible from here" queries are timed through the index
+and against a full-catalog propagation, and their results compared. Uses a
+throwaway SQLite file (latitude-band index) unless DATABASE_URL points at
+PostGIS.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+import numpy as np  # noqa: E402
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.schemas import SubPoint  # noqa: E402
+from app.propagation.passes import Observer  # noqa: E402
+from app.propagation.propagator import Propagator  # noqa: E402
+from app.propagation.subpoints import (  # noqa: E402
+    ground_distance,
+    nearby,
+    refresh_subpoints,
+    visible,
+)
+from benchmarks.synthetic import make_tles  # noqa: E402
+
+START = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def full_nearby(propagator, t, lat, lon, radius):
+    sat_lat, sat_lon, _ = (x[:, 0] for x in propagator.positions([t]))
+    distance = ground_distance(lat, lon, sat_lat, sat_lon)
+    return set(propagator.norad_cat_ids[distance <= radius].tolist())
+
+
+def full_visible(propagator, t, observer, min_elevation):
+    ecef = propagator.positions([t], "ecef")[:, 0]
+    elevation, _ = observer.look_angles(ecef)
+    return set(propagator.norad_cat_ids[elevation >= min_elevation].tolist())
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(*q) for q in queries]
+    return (time.perf_counter() - start) / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    rnd = random.Random(0)
+
+    for size in args.sizes:
+        Base.metadata.drop_all(bind=engine, tables=[SubPoint.__table__])
+        Base.metadata.create_all(bind=engine, tables=[SubPoint.__table__])
+        db = SessionLocal()
+
+        tles = make_tles(size)
+        propagator = Propagator(
+            [int(t["NORAD_CAT_ID"]) for t in tles],
+            [(t["TLE_LINE1"], t["TLE_LINE2"]) for t in tles],
+        )
+        begin = time.perf_counter()
+        rows = refresh_subpoints(db, propagator, now=START)
+        refresh = time.perf_counter() - begin
+
+        queries = [
+            (
+                START + timedelta(seconds=rnd.uniform(0, 1700)),
+                rnd.uniform(-70, 70),
+                rnd.uniform(-180, 180),
+            )
+            for _ in range(args.queries)
+        ]
+
+        near, got = timed(
+            lambda t, lat, lon: {
+                s["norad_cat_id"]
+                for s in nearby(db, propagator, t, lat, lon, args.radius)
+            },
+            queries,
+        )
+        near_full, expected = timed(
+            lambda t, lat, lon: full_nearby(propagator, t, lat, lon, args.radius),
+            queries,
+        )
+        assert got == expected
+
+        seen, got = timed(
+            lambda t, lat, lon: {
+                s["norad_cat_id"]
+                for s in visible(db, propagator, t, Observer(lat, lon), 10.0)
+            },
+            queries,
+        )
+        seen_full, expected = timed(
+            lambda t, lat, lon: full_visible(propagator, t, Observer(lat, lon), 10.0),
+            queries,
+        )
+        assert got == expected
+        db.close()
+
+        print(
+            f"{size:7d} satellites  refresh {rows} rows {refresh:6.2f}s  "
+            f"within {args.radius:g} km {near * 1e3:6.2f} ms "
+            f"(full {near_full * 1e3:6.2f} ms)  "
+            f"visible {seen * 1e3:6.2f} ms (full {seen_full * 1e3:6.2f} ms)  "
+            f"avg hits {np.mean([len(e) for e in expected]):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Orbit trend analytics: full first run vs. incremental runs, by worker count.
+
+    python -m benchmarks.bench_trends --satellites 5000 --days 60 --workers 1 4
+
+Loads `days` of history (`--per-day` element sets a day) for each satellite,
+a fifth of which decay and a tenth of which manoeuvre once, then times the
+first run over everything and an incremental run after one more day is
+fetched. Runs against a throwaway SQLite file unless DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.schemas import (  # noqa: E402
+    Manoeuvre,
+    OrbitTrend,
+    SyncCursor,
+)
+from app.fetchers.bulk import BulkWriter  # noqa: E402
+from app.fetchers.parsers import satellite_row, tle_row  # noqa: E402
+from app.propagation.propagator import EARTH_A  # noqa: E402
+from app.propagation.trends import TRENDS, run_trends  # noqa: E402
+from benchmarks.synthetic import make_satcat, make_tles  # noqa: E402
+
+START = datetime(2024, 1, 1)
+
+
+def history(templates, first_day, days, per_day, seed):
+    rnd = random.Random(seed)
+    for norad_cat_id, row in templates.items():
+        profile = random.Random(norad_cat_id)
+        altitude = profile.uniform(250, 1200)
+        rate = -profile.uniform(0.05, 0.5) if norad_cat_id % 5 == 0 else -0.001
+        manoeuvre = profile.uniform(5, 55) if norad_cat_id % 10 == 3 else None
+
+        for day in range(first_day, first_day + days):
+            for k in range(per_day):
+                t = day + (k + rnd.random()) / per_day
+                a = EARTH_A + altitude + rate * t + rnd.gauss(0, 0.05)
+                if manoeuvre is not None and t > manoeuvre:
+                    a += 3.0
+                yield {
+                    **row,
+                    "epoch": START + timedelta(days=t),
+                    "semimajor_axis": a,
+                    "perigee": a - EARTH_A - 1,
+                    "apogee": a - EARTH_A + 1,
+                }
+
+
+def timed_run(workers):
+    db = SessionLocal()
+    begin = time.perf_counter()
+    satellites = run_trends(db, workers=workers)
+    elapsed = time.perf_counter() - begin
+    manoeuvres = db.scalar(select(func.count()).select_from(Manoeuvre))
+    db.close()
+    return satellites, manoeuvres, elapsed
+
+
+def reset_trends():
+    db = SessionLocal()
+    db.execute(delete(Manoeuvre))
+    db.execute(delete(OrbitTrend))
+    db.execute(delete(SyncCursor).where(SyncCursor.source == TRENDS))
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--satellites", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=2)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    writer = BulkWriter(db)
+    writer.upsert_satellites([satellite_row(s) for s in make_satcat(args.satellites)])
+    db.commit()
+    ids = writer.satellite_ids()
+    templates = {
+        int(t["NORAD_CAT_ID"]): tle_row(t, ids[int(t["NORAD_CAT_ID"])])
+        for t in make_tles(args.satellites)
+    }
+    begin = time.perf_counter()
+    rows = writer.insert_tles(history(templates, 0, args.days, args.per_day, 0))
+    db.commit()
+    print(f"loaded {rows} element sets in {time.perf_counter() - begin:.1f}s")
+
+    for workers in args.workers:
+        reset_trends()
+        satellites, manoeuvres, elapsed = timed_run(workers)
+        print(
+            f"full run, {workers} workers: {satellites} satellites, "
+            f"{manoeuvres} manoeuvres in {elapsed:.2f}s"
+        )
+
+    writer.insert_tles(history(templates, args.days, 1, args.per_day, 1))
+    db.commit()
+    satellites, manoeuvres, elapsed = timed_run(max(args.workers))
+    print(
+        f"incremental run (1 new day), {max(args.workers)} workers: "
+        f"{satellites} satellites in {elapsed:.2f}s"
+    )
+
+    decaying = db.scalar(
+        select(func.count())
+        .select_from(OrbitTrend)
+        .where(OrbitTrend.reentry.isnot(None))
+    )
+    print(
+        f"expected {args.satellites // 10} manoeuvres, found {manoeuvres}; "
+        f"{decaying} satellites with a re-entry estimate"
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Stub Space-Track / SatNOGS server that replays recorded responses.
+
+    python -m benchmarks.stub_server --port 8081 [--fixtures DIR | --synthetic N]
+
+Point the backend at it with
+
+    SPACE_TRACK_URL=http://localhost:8081 SATNOGS_URL=http://localhost:8081/api
+
+The `FILE/>n`, `EPOCH/>t` and `NORAD_CAT_ID/a--b` predicates used by the
+syncer are applied to the payloads so delta and range-split runs can be
+exercised end to end.
+"""
+
+import argparse
+import json
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PREDICATE = re.compile(r"/([A-Z_]+)/%3E([^/]+)|/([A-Z_]+)/>([^/]+)")
+RANGE = re.compile(r"/([A-Z_]+)/(\d+)--(\d+)")
+
+
+def load_fixtures(directory):
+    payloads = {}
+    for name in ("satcat", "tle_latest", "transmitters"):
+        with open(os.path.join(directory, f"{name}.json")) as f:
+            payloads[name] = json.load(f)
+    return payloads
+
+
+def synthetic_payloads(n):
+    from benchmarks.synthetic import make_satcat, make_tles, make_transmitters
+
+    return {
+        "satcat": make_satcat(n),
+        "tle_latest": make_tles(n),
+        "transmitters": make_transmitters(n),
+    }
+
+
+def apply_predicates(path, records):
+    for match in PREDICATE.finditer(path):
+        field = match.group(1) or match.group(3)
+        value = unquote(match.group(2) or match.group(4))
+        if field == "FILE":
+            records = [r for r in records if int(r["FILE"]) > int(value)]
+        elif field == "EPOCH":
+            value = value.replace("T", " ")
+            records = [r for r in records if r["EPOCH"] > value]
+        elif field == "NORAD_CAT_ID":
+            records = [r for r in records if int(r["NORAD_CAT_ID"]) > int(value)]
+    for match in RANGE.finditer(path):
+        field, low, high = match.group(1), int(match.group(2)), int(match.group(3))
+        records = [r for r in records if low <= int(r[field]) <= high]
+    return records
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    payloads = {}
+    requests_seen = []
+
+    def _send(self, status, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.requests_seen.append(("POST", self.path))
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.path.startswith("/ajaxauth/login"):
+            self._send(200, b'""')
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        self.requests_seen.append(("GET", self.path))
+        if "/class/satcat/" in self.path:
+            self._send(200, apply_predicates(self.path, self.payloads["satcat"]))
+        elif "/class/tle_latest/" in self.path:
+            self._send(200, apply_predicates(self.path, self.payloads["tle_latest"]))
+        elif self.path.startswith("/api/transmitters"):
+            self._send(200, self.payloads["transmitters"])
+        else:
+            self._send(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=8081, payloads=None, fixtures=FIXTURES):
+    StubHandler.payloads = payloads or load_fixtures(fixtures)
+    return ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="serve N generated records per class instead of the fixtures",
+    )
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.synthetic) if args.synthetic else None
+    server = serve(args.port, payloads=payloads, fixtures=args.fixtures)
+    print(f"stub server listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""End-to-end benchmark suite: sync throughput and API latency, as JSON.
+
+    python -m benchmarks.suite --scales fixtures 10000 100000 \\
+        --concurrency 1 8 32 --output results.json [--compare previous.json]
+
+For each scale the recorded fixtures (`fixtures`) or N synthetic SATCAT, TLE
+and transmitter records are served by `benchmarks.stub_server`, synced into a
+throwaway database with `Syncer`, and then `/satellites`, `/tles` and `/rfs`
+are load-tested through uvicorn at each concurrency level. Every stage runs
+in its own process so peak RSS is measured per stage.
+
+The database is a temporary SQLite file unless `--database-url` is given; a
+Postgres database passed there is dropped and recreated for every scale.
+Responses are not cached (`CACHE_TTL=0`) unless `--cache` is given, so the
+load test measures the query path. The 1M scale needs several GB of memory
+for the stub server alone.
+
+Results include the commit they were measured at; `--compare` prints the
+change of each headline number against an earlier results file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+ROUTES = ("/satellites", "/tles", "/rfs")
+PAGE_SIZE = 100
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"process exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout}s")
+
+
+def peak_rss(pid):
+    """High-water resident set size of a running process, in MB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return git("rev-parse", "HEAD"), bool(git("status", "--porcelain", "."))
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+# --- sync stage, run in a child process with the stub server's URLs ---
+
+
+def sync_child():
+    from prometheus_client import REGISTRY
+    from sqlalchemy import func, select
+
+    from app.core.db import Base, SessionLocal, engine
+    from app.core.history import partition_tles
+    from app.core.schemas import RF, TLE, CurrentTLE, Satellite
+    from app.fetchers import cursors
+    from app.fetchers.space_track_fetcher import SpaceTrackFetcher
+    from app.fetchers.sync import Syncer
+
+    # The stub server has no rate limit to protect.
+    SpaceTrackFetcher.RATE_LIMITS = [(1_000_000, 1)]
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partition_tles(engine)
+
+    # Syncer.sync() step by step, so each phase is timed separately.
+    syncer = Syncer(SessionLocal())
+    syncer.full = True
+    phases = {}
+    for name, step in (
+        ("ingest", lambda: asyncio.run(syncer._sync())),
+        ("snapshot", syncer.write_snapshot),
+        ("trends", syncer.update_trends),
+    ):
+        start = time.perf_counter()
+        step()
+        phases[name] = time.perf_counter() - start
+    syncer.db.close()
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    sources = (cursors.SATCAT, cursors.TLE_LATEST, cursors.SATNOGS_TRANSMITTERS)
+    received = {
+        source: int(sample("astrobridge_sync_records_total", source=source))
+        for source in sources
+    }
+    stages = {
+        source: {
+            stage: round(
+                sample(
+                    "astrobridge_sync_stage_seconds_sum", source=source, stage=stage
+                ),
+                3,
+            )
+            for stage in ("fetch", "parse", "write")
+        }
+        for source in sources
+    }
+
+    db = SessionLocal()
+    tables = {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model))
+        for model in (Satellite, TLE, CurrentTLE, RF)
+    }
+    db.close()
+
+    total = sum(received.values())
+    result = {
+        "records": received,
+        "rows": tables,
+        "seconds": {name: round(value, 3) for name, value in phases.items()},
+        "rows_per_second": round(total / phases["ingest"]) if phases["ingest"] else 0,
+        "stages": stages,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    print(json.dumps(result))
+
+
+def run_sync(env):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--sync-child"],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# --- load test against uvicorn ---
+
+
+async def load(base, route, concurrency, requests, rows, seed=0):
+    """Fire `requests` page requests at random cursors, `concurrency` at a time."""
+    rnd = random.Random(seed)
+    paths = [
+        f"{route}?limit={PAGE_SIZE}&cursor={rnd.randrange(max(rows, 1))}"
+        for _ in range(requests)
+    ]
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        for path in paths[: min(concurrency, 10)]:
+            await client.get(path)
+
+        async def worker():
+            nonlocal errors
+            while paths:
+                path = paths.pop()
+                start = time.perf_counter()
+                try:
+                    res = await client.get(path)
+                    if res.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "route": route,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1e3, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1e3, 2),
+    }
+
+
+def run_load(env, rows, concurrency, requests):
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        wait_for_port(port, server)
+        idle = peak_rss(server.pid)
+        results = []
+        for route in ROUTES:
+            for level in concurrency:
+                results.append(
+                    asyncio.run(
+                        load(
+                            f"http://127.0.0.1:{port}",
+                            route,
+                            level,
+                            requests,
+                            rows[route],
+                        )
+                    )
+                )
+        return {"idle_rss_mb": idle, "peak_rss_mb": peak_rss(server.pid)}, results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# --- one scale end to end ---
+
+
+def run_scale(scale, args):
+    port = free_port()
+    command = [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port)]
+    if scale != "fixtures":
+        command += ["--synthetic", scale]
+    stub = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    tmp = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        database_url = f"sqlite:///{tmp.name}"
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SPACE_TRACK_URL": f"http://127.0.0.1:{port}",
+        "SATNOGS_URL": f"http://127.0.0.1:{port}/api",
+        "SPACE_TRACK_USERNAME": "benchmark",
+        "SPACE_TRACK_PASSWORD": "benchmark",
+        "SATNOGS_API_KEY": "benchmark",
+        "CACHE_GENERATION_FILE": "",
+    }
+    if not args.cache:
+        env["CACHE_TTL"] = "0"
+
+    try:
+        wait_for_port(port, stub)
+        stub_rss = peak_rss(stub.pid)
+        sync = run_sync(env)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    rows = {
+        "/satellites": sync["rows"]["satellites"],
+        "/tles": sync["rows"]["tles"],
+        "/rfs": sync["rows"]["rfs"],
+    }
+    try:
+        server, load = run_load(env, rows, args.concurrency, args.requests)
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+    return {
+        "scale": scale,
+        "stub_rss_mb": stub_rss,
+        "sync": sync,
+        "server": server,
+        "load": load,
+    }
+
+
+# --- reporting ---
+
+
+def headline(results):
+    """Flatten a results file into {metric name: value} for comparison."""
+    metrics = {}
+    for run in results["runs"]:
+        scale = run["scale"]
+        metrics[f"{scale} sync rows/s"] = run["sync"]["rows_per_second"]
+        metrics[f"{scale} sync peak MB"] = run["sync"]["peak_rss_mb"]
+        metrics[f"{scale} server peak MB"] = run["server"]["peak_rss_mb"]
+        for r in run["load"]:
+            name = f"{scale} {r['route']} c={r['concurrency']}"
+            metrics[f"{name} req/s"] = r["requests_per_second"]
+            metrics[f"{name} p50 ms"] = r["p50_ms"]
+            metrics[f"{name} p99 ms"] = r["p99_ms"]
+    return metrics
+
+
+def compare(previous, current):
+    before, after = headline(previous), headline(current)
+    print(f"\nchange since {(previous.get('commit') or 'unknown')[:10]}:")
+    for name, value in after.items():
+        old = before.get(name)
+        if not old or value is None:
+            continue
+        print(f"  {name:40s} {old:12.1f} -> {value:12.1f}  {value / old - 1:+7.1%}")
+
+
+def summarise(run):
+    sync = run["sync"]
+    seconds = sync["seconds"]
+    print(
+        f"{run['scale']}: {sum(sync['records'].values())} records synced in "
+        f"{seconds['ingest']:.2f}s ({sync['rows_per_second']} rows/s), "
+        f"snapshot {seconds['snapshot']:.2f}s, trends {seconds['trends']:.2f}s, "
+        f"peak {sync['peak_rss_mb']:.0f} MB"
+    )
+    for r in run["load"]:
+        print(
+            f"  {r['route']:12s} c={r['concurrency']:<3d} "
+            f"{r['requests_per_second']:8.1f} req/s  p50 {r['p50_ms']:8.2f} ms  "
+            f"p99 {r['p99_ms']:8.2f} ms  errors {r['errors']}"
+        )
+    if run["server"]["peak_rss_mb"] is not None:
+        print(f"  server peak {run['server']['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        default=["fixtures", "10000", "100000"],
+        help="`fixtures` and/or synthetic record counts, e.g. 1000000",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="per level")
+    parser.add_argument("--database-url", help="Postgres to use instead of SQLite")
+    parser.add_argument("--cache", action="store_true", help="keep response caching")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--sync-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.sync_child:
+        return sync_child()
+
+    commit, dirty = git_commit()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": (args.database_url or "sqlite").split(":")[0],
+        "cache": args.cache,
+        "requests": args.requests,
+        "runs": [],
+    }
+    for scale in args.scales:
+        run = run_scale(scale, args)
+        summarise(run)
+        results["runs"].append(run)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+
+MODES = ["FM", "CW", "AFSK", "BPSK", "GMSK", "LoRa"]
+SERVICES = ["Amateur", "Earth Exploration", "Meteorological", "Space Research"]
+MU = 398600.4418
+EARTH_RADIUS = 6378.135
+
+COUNTRIES = ["US", "PRC", "CIS", "ESA", "JPN", "IND", "FR", "UK"]
+
+
+def make_satcat(n, seed=0):
+    rnd = random.Random(seed)
+    records = []
+    for i in range(n):
+        norad = i + 1
+        year = 1960 + norad % 64
+        perigee = rnd.randint(300, 20000)
+        records.append(
+            {
+                "INTLDES": f"{year % 100:02d}{norad % 999:03d}A",
+                "NORAD_CAT_ID": str(norad),
+                "OBJECT_TYPE": rnd.choice(["PAYLOAD", "ROCKET BODY", "DEBRIS"]),
+                "SATNAME": f"SAT {norad}",
+                "COUNTRY": rnd.choice(COUNTRIES),
+                "LAUNCH": f"{year}-01-01",
+                "SITE": "AFETR",
+                "DECAY": None,
+                "PERIOD": f"{rnd.uniform(88, 1440):.2f}",
+                "INCLINATION": f"{rnd.uniform(0, 110):.2f}",
+                "APOGEE": str(perigee + rnd.randint(0, 2000)),
+                "PERIGEE": str(perigee),
+                "COMMENT": None,
+                "COMMENTCODE": None,
+                "RCSVALUE": "0",
+                "RCS_SIZE": "SMALL",
+                "FILE": str(8000 + norad % 100),
+                "LAUNCH_YEAR": str(year),
+                "LAUNCH_NUM": str(norad % 999),
+                "LAUNCH_PIECE": "A",
+                "CURRENT": "Y",
+                "OBJECT_NAME": f"SAT {norad}",
+                "OBJECT_ID": f"{year}-{norad % 999:03d}A",
+                "OBJECT_NUMBER": str(norad),
+            }
+        )
+    return records
+
+
+def _checksum(line):
+    total = sum(int(c) if c.isdigit() else c == "-" for c in line[:68])
+    return line[:68] + str(total % 10)
+
+
+def make_tles(n, satellites=None, seed=0, start=datetime(2024, 1, 1)):
+    rnd = random.Random(seed)
+    satellites = satellites or n
+    records = []
+    for i in range(n):
+        norad = i % satellites + 1
+        epoch = start + timedelta(hours=i // satellites, seconds=rnd.randint(0, 3599))
+        day = (
+            epoch.timetuple().tm_yday
+            + (epoch.hour * 3600 + epoch.minute * 60 + epoch.second) / 86400
+        )
+        mean_motion = rnd.uniform(11.0, 16.4)
+        inclination = rnd.uniform(0, 110)
+        raan = rnd.uniform(0, 360)
+        ecc = rnd.uniform(0, 0.02)
+        argp = rnd.uniform(0, 360)
+        anomaly = rnd.uniform(0, 360)
+        semimajor_axis = (MU / (mean_motion * 2 * math.pi / 86400) ** 2) ** (1 / 3)
+        line1 = _checksum(
+            f"1 {norad:05d}U 24001A   {epoch.year % 100:02d}{day:012.8f} "
+            f" .00001000  00000-0  10000-3 0  999"
+        )
+        line2 = _checksum(
+            f"2 {norad:05d} {inclination:8.4f} {raan:8.4f} {int(ecc * 1e7):07d} "
+            f"{argp:8.4f} {anomaly:8.4f} {mean_motion:11.8f}{10:5d}"
+        )
+        records.append(
+            {
+                "COMMENT": "GENERATED VIA SPACE-TRACK.ORG API",
+                "ORIGINATOR": "18 SPCS",
+                "NORAD_CAT_ID": str(norad),
+                "OBJECT_NAME": f"SAT {norad}",
+                "OBJECT_TYPE": "PAYLOAD",
+                "CLASSIFICATION_TYPE": "U",
+                "INTLDES": "24001A",
+                "EPOCH": epoch.strftime("%Y-%m-%d %H:%M:%S"),
+                "EPOCH_MICROSECONDS": "0",
+                "MEAN_MOTION": f"{mean_motion:.8f}",
+                "ECCENTRICITY": f"{ecc:.7f}",
+                "INCLINATION": f"{inclination:.4f}",
+                "RA_OF_ASC_NODE": f"{raan:.4f}",
+                "ARG_OF_PERICENTER": f"{argp:.4f}",
+                "MEAN_ANOMALY": f"{anomaly:.4f}",
+                "EPHEMERIS_TYPE": "0",
+                "ELEMENT_SET_NO": "999",
+                "REV_AT_EPOCH": "10",
+                "BSTAR": "0.0001",
+                "MEAN_MOTION_DOT": "0.00001",
+                "MEAN_MOTION_DDOT": "0",
+                "FILE": str(4000000 + i),
+                "TLE_LINE0": f"0 SAT {norad}",
+                "TLE_LINE1": line1,
+                "TLE_LINE2": line2,
+                "OBJECT_ID": "2024-001A",
+                "OBJECT_NUMBER": str(norad),
+                "SEMIMAJOR_AXIS": f"{semimajor_axis:.3f}",
+                "PERIOD": f"{1440 / mean_motion:.3f}",
+                "APOGEE": f"{semimajor_axis * (1 + ecc) - EARTH_RADIUS:.3f}",
+                "PERIGEE": f"{semimajor_axis * (1 - ecc) - EARTH_RADIUS:.3f}",
+                "DECAYED": "0",
+            }
+        )
+    return records
+
+
+def make_transmitters(n, satellites=None, seed=0):
+    rnd = random.Random(seed)
+    satellites = satellites or n
+    records = []
+    for i in range(n):
+        downlink = rnd.randint(137_000_000, 2_400_000_000)
+        records.append(
+            {
+                "uuid": str(uuid.UUID(int=rnd.getrandbits(128))),
+                "description": f"Transmitter {i}",
+                "alive": True,
+                "type": "Transmitter",
+                "uplink_low": None,
+                "uplink_high": None,
+                "uplink_drift": None,
+                "downlink_low": downlink,
+                "downlink_high": downlink + rnd.choice([0, 0, 25_000, 500_000]),
+                "downlink_drift": None,
+                "mode": rnd.choice(MODES),
+                "mode_id": rnd.randint(1, 50),
+                "uplink_mode": None,
+                "invert": False,
+                "baud": rnd.choice([None, 1200.0, 9600.0]),
+                "norad_cat_id": i % satellites + 1,
+                "sat_id": f"SAT-{i % satellites + 1}",
+                "norad_follow_id": None,
+                "status": rnd.choice(["active", "active", "inactive"]),
+                "updated": "2024-01-01T00:00:00.000000Z",
+                "citation": "",
+                "service": rnd.choice(SERVICES),
+                "iaru_coordination": "N/A",
+                "iaru_coordination_url": "",
+                "frequency_violation": False,
+                "unconfirmed": False,
+            }
+        )
+    return records
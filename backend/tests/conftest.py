@@ -0,0 +1,65 @@
+import copy
+import os
+import tempfile
+import threading
+
+# The engine, snapshot directory and generation file are set up at import
+# time, so the environment has to point at throwaway locations before `app`
+# is imported.
+_state = tempfile.mkdtemp(prefix="astrobridge-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_state, 'test.db')}"
+os.environ["SNAPSHOT_DIR"] = os.path.join(_state, "snapshots")
+os.environ["CACHE_GENERATION_FILE"] = os.path.join(_state, "generation")
+os.environ["SYNC_PARSE_WORKERS"] = "0"
+os.environ.setdefault("SPACE_TRACK_USERNAME", "test")
+os.environ.setdefault("SPACE_TRACK_PASSWORD", "test")
+
+import pytest  # noqa: E402
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.fetchers.satnogs_fetcher import SatNOGSFetcher  # noqa: E402
+from app.fetchers.space_track_fetcher import SpaceTrackFetcher  # noqa: E402
+from benchmarks.stub_server import (  # noqa: E402
+    FIXTURES,
+    StubHandler,
+    load_fixtures,
+    serve,
+)
+
+PAYLOADS = load_fixtures(FIXTURES)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """The stub Space-Track/SatNOGS server replaying `benchmarks/fixtures`.
+
+    `stub.payloads` can be edited between syncs; `stub.requests` lists the
+    (method, path) pairs received since the last `stub.clear()`.
+    """
+    server = serve(port=0, payloads=copy.deepcopy(PAYLOADS))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(SpaceTrackFetcher, "HOST", host)
+    monkeypatch.setattr(SpaceTrackFetcher, "BASE_URL", f"{host}/basicspacedata/query")
+    monkeypatch.setattr(SpaceTrackFetcher, "RATE_LIMITS", [(1_000_000, 1)])
+    monkeypatch.setattr(SatNOGSFetcher, "BASE_URL", f"{host}/api")
+
+    StubHandler.requests_seen = []
+    server.payloads = StubHandler.payloads
+    server.requests = StubHandler.requests_seen
+    server.clear = StubHandler.requests_seen.clear
+    yield server
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from app.core.cache import CATALOG, RESULTS, Entry, MemoryBackend, Resident
+
+
+@pytest.mark.parametrize("in_file", [True, False])
+def test_bump_only_invalidates_its_scope(tmp_path, in_file):
+    backend = MemoryBackend(
+        generation_file=str(tmp_path / "generation") if in_file else ""
+    )
+    backend.set(f"{CATALOG}:0:/tles?", Entry.build(b"[]", "application/json"))
+    backend.set(f"{RESULTS}:0:/conjunctions?", Entry.build(b"[]", "application/json"))
+
+    assert backend.bump_generation(RESULTS) == 1
+
+    assert backend.generation(CATALOG) == 0
+    assert backend.generation(RESULTS) == 1
+    assert backend.get(f"{CATALOG}:0:/tles?") is not None
+    assert backend.get(f"{RESULTS}:0:/conjunctions?") is None
+
+
+def test_generation_file_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "generation")
+    api = MemoryBackend(generation_file=path)
+    worker = MemoryBackend(generation_file=path)
+
+    worker.bump_generation()
+    worker.bump_generation(RESULTS)
+
+    assert api.generation() == 1
+    assert api.generation(RESULTS) == 1
+
+
+def test_resident_serves_the_previous_value_while_rebuilding():
+    key = ["a"]
+    started, release = threading.Event(), threading.Event()
+
+    def build(db):
+        if key[0] == "b":
+            started.set()
+            release.wait(5)
+        return key[0]
+
+    resident = Resident("Test", build, key=lambda db: key[0], check_seconds=0)
+    assert resident.get(None) == "a"
+
+    key[0] = "b"
+    rebuild = threading.Thread(target=resident.get, args=(None,))
+    rebuild.start()
+    assert started.wait(5)
+    assert resident.get(None) == "a"
+
+    release.set()
+    rebuild.join()
+    assert resident.get(None) == "b"
@@ -0,0 +1,28 @@
+from sqlalchemy import update
+
+from app.core.catalog import Catalog, _build, _snapshot_is_current
+from app.core.db import SessionLocal
+from app.core.schemas import Satellite
+from app.core.snapshot import Snapshot, read_manifest
+from app.fetchers.sync import Syncer
+
+
+def test_catalog_from_snapshot_matches_database(db, stub):
+    Syncer(SessionLocal()).sync()
+    manifest = read_manifest()
+
+    from_snapshot = Catalog.from_snapshot(Snapshot(manifest))
+    from_db = Catalog.from_db(db)
+    assert len(from_snapshot) == len(stub.payloads["satcat"])
+    assert from_snapshot.rows.tobytes() == from_db.rows.tobytes()
+    assert _snapshot_is_current(db, manifest)
+
+
+def test_stale_snapshot_is_not_used(db, stub):
+    Syncer(SessionLocal()).sync()
+    db.execute(update(Satellite).values(country="XX"))
+    db.commit()
+
+    assert not _snapshot_is_current(db, read_manifest())
+    catalog = _build(db)
+    assert set(catalog.rows["country"].tolist()) == {b"XX"}
@@ -0,0 +1,17 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_oversized_doppler_window_is_rejected_up_front(db):
+    with TestClient(app) as client:
+        begin = time.perf_counter()
+        response = client.get(
+            "/frequencies?frequency=437000000&lat=52&lon=0"
+            "&start=2024-01-01T00:00:00Z&stop=2025-01-01T00:00:00Z&step=0.001"
+        )
+    assert response.status_code == 400
+    assert "steps" in response.json()["detail"]
+    assert time.perf_counter() - begin < 5
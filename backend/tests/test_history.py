@@ -0,0 +1,128 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+
+from app.core.db import SessionLocal
+from app.core.db import Base
+from app.core.history import (
+    RETENTION,
+    _months_to_thin,
+    apply_retention,
+    is_partitioned,
+    partition_tles,
+)
+from app.core.schemas import TLE, Satellite
+from app.fetchers.bulk import BulkWriter
+from app.fetchers.cursors import get_cursor
+from app.fetchers.sync import Syncer
+
+NOW = datetime(2024, 6, 1)
+
+
+def insert_day(db, template, day, count=4):
+    """`count` element sets of one satellite spread over `day`."""
+    BulkWriter(db).insert_tles(
+        [{**template, "epoch": day + timedelta(hours=5 * i)} for i in range(count)]
+    )
+    db.commit()
+
+
+def per_day(db, day):
+    return db.scalar(
+        select(func.count())
+        .select_from(TLE)
+        .where(TLE.epoch >= day, TLE.epoch < day + timedelta(days=1))
+    )
+
+
+def synced_template(db):
+    """A TLE row from a sync against the stub, with its history thinned."""
+    Syncer(SessionLocal()).sync()
+    apply_retention(db, now=NOW)
+    template = dict(db.execute(select(*TLE.__table__.columns)).mappings().first())
+    del template["id"]
+    return template
+
+
+def test_retention_thins_history_back_filled_after_a_run(db, stub):
+    template = synced_template(db)
+
+    insert_day(db, template, datetime(2023, 12, 10))
+    assert apply_retention(db, now=NOW) == 3
+    assert per_day(db, datetime(2023, 12, 10)) == 1
+    assert apply_retention(db, now=NOW) == 0
+
+    # Older than anything thinned so far.
+    insert_day(db, template, datetime(2023, 6, 10))
+    assert apply_retention(db, now=NOW) == 3
+    assert per_day(db, datetime(2023, 6, 10)) == 1
+
+
+def test_retention_keeps_recent_history(db, stub):
+    template = synced_template(db)
+
+    insert_day(db, template, NOW - timedelta(days=10))
+    assert apply_retention(db, now=NOW) == 0
+    assert per_day(db, NOW - timedelta(days=10)) == 4
+
+
+def test_retention_only_reads_months_written_since_the_last_run(db, stub):
+    template = synced_template(db)
+    cursor = get_cursor(db, RETENTION)
+    # Only the month the synced element sets are in.
+    assert _months_to_thin(db, cursor, cursor.last_epoch) == [datetime(2024, 1, 1)]
+
+    insert_day(db, template, datetime(2023, 6, 10))
+    assert _months_to_thin(db, cursor, cursor.last_epoch) == [
+        datetime(2023, 6, 1),
+        datetime(2024, 1, 1),
+    ]
+
+
+# partition_tles is PostgreSQL only; point this at a scratch PostGIS database
+# (the schema needs it) to run it.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_partitioning_drops_duplicate_epochs(db, stub):
+    Syncer(SessionLocal()).sync()
+    template = dict(db.execute(select(*TLE.__table__.columns)).mappings().first())
+    del template["id"]
+    satellite = db.get(Satellite, template["satellite_id"])
+
+    engine = create_engine(POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # A table from before the (satellite_id, epoch) constraint existed.
+        conn.execute(
+            text("ALTER TABLE tles DROP CONSTRAINT idx_tle_unique_per_satellite")
+        )
+        conn.execute(
+            Satellite.__table__.insert(),
+            {
+                column.name: getattr(satellite, column.name)
+                for column in Satellite.__table__.columns
+            },
+        )
+        conn.execute(
+            TLE.__table__.insert(),
+            [
+                {**template, "comment": "older"},
+                {**template, "comment": "newer"},
+                {**template, "epoch": template["epoch"] + timedelta(hours=1)},
+            ],
+        )
+
+    try:
+        partition_tles(engine)
+        with engine.connect() as conn:
+            assert is_partitioned(conn)
+            comments = conn.execute(select(TLE.comment).order_by(TLE.epoch)).scalars()
+            assert list(comments) == ["newer", template["comment"]]
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
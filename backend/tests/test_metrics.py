@@ -0,0 +1,11 @@
+from fastapi.testclient import TestClient
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.main import app
+
+
+def test_metrics_content_type_has_a_single_charset():
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    assert response.headers["content-type"].count("charset") == 1
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.db import SessionLocal
+from app.fetchers.sync import Syncer
+from app.main import app
+
+
+@pytest.fixture
+def client(db, stub):
+    Syncer(SessionLocal()).sync()
+    with TestClient(app) as client:
+        yield client
+
+
+def satellites(response):
+    assert response.status_code == 200, response.text
+    return [s["norad_cat_id"] for s in response.json()["satellites"]]
+
+
+def test_positions_accepts_comma_separated_ids(client):
+    repeated = client.get("/positions?norad_ids=1&norad_ids=2")
+    separated = client.get("/positions?norad_ids=1,2")
+    mixed = client.get("/positions?norad_ids=1,%202&norad_ids=3")
+
+    assert satellites(repeated) == satellites(separated) == [1, 2]
+    assert satellites(mixed) == [1, 2, 3]
+
+
+def test_passes_accepts_comma_separated_ids(client):
+    query = "/passes?lat=52&lon=0&norad_ids=1,2"
+    response = client.get(query)
+    assert response.status_code == 200, response.text
+    assert {p["norad_cat_id"] for p in response.json()["passes"]} <= {1, 2}
+
+
+def test_bad_norad_ids_are_rejected(client):
+    assert client.get("/positions?norad_ids=1,ISS").status_code == 400
+    assert client.get("/passes?lat=52&lon=0&norad_ids=1;2").status_code == 400
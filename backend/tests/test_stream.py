@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from app.fetchers import stream
+from app.fetchers.stream import JSONArrayParser, iter_json_array
+
+RECORDS = [
+    {"NORAD_CAT_ID": "25544", "EPOCH": "2024-01-01 00:00:00"},
+    {"name": 'Ca\u00f1ada "2"', "live": True, "mode": None, "drift": -1.5e-3},
+    123,
+    1.5,
+    [],
+]
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1024])
+def test_elements_survive_any_chunk_boundary(size):
+    data = json.dumps(RECORDS).encode()
+    assert list(iter_json_array(chunked(data, size))) == RECORDS
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ ] \n", b"[1]", b"[ 1 , 2 ]\n"])
+def test_valid_arrays(data):
+    assert list(iter_json_array([data])) == json.loads(data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"[1,,2]",
+        b"[,1]",
+        b"[1,]",
+        b"[1 2]",
+        b"[1]x",
+        b"[1] [2]",
+        b"[1],",
+        b"[1",
+        b"",
+        b"{}",
+    ],
+)
+@pytest.mark.parametrize("size", [1, 1024])
+def test_malformed_arrays_are_rejected(data, size):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(data, size)))
+
+
+@pytest.mark.parametrize("data", [b'[{"a" 1', b"[{1: 2}", b"[tx, 1", b'[{"a": 1}}'])
+def test_malformed_elements_fail_before_the_stream_ends(data):
+    parser = JSONArrayParser()
+    with pytest.raises(ValueError):
+        parser.feed(data + b" " * 16)
+
+
+def test_oversized_elements_are_rejected(monkeypatch):
+    monkeypatch.setattr(stream, "MAX_ELEMENT_SIZE", 100)
+    parser = JSONArrayParser()
+    assert parser.feed(b'[{"a": 1}, "' + b"x" * 50) == [{"a": 1}]
+    with pytest.raises(ValueError, match="exceeds 100"):
+        parser.feed(b"x" * 100)
@@ -0,0 +1,183 @@
+import copy
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.core.db import SessionLocal
+from app.core.schemas import (
+    RF,
+    TLE,
+    Change,
+    CurrentTLE,
+    DeadLetter,
+    Satellite,
+    SyncCursor,
+)
+from app.fetchers import cursors
+from app.fetchers.sync import Syncer
+
+TABLES = (Satellite, TLE, CurrentTLE, RF, Change, DeadLetter)
+
+
+def sync(full=False):
+    Syncer(SessionLocal()).sync(full=full)
+
+
+def counts(db):
+    return {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model))
+        for model in TABLES
+    }
+
+
+def cursor(db, source):
+    db.expire_all()
+    return db.get(SyncCursor, source)
+
+
+def queries(stub, cls):
+    return [path for _, path in stub.requests if f"/class/{cls}/" in path]
+
+
+def add_records(stub):
+    """A new satellite and a newer element set for it, past every cursor."""
+    satellite = copy.deepcopy(stub.payloads["satcat"][-1])
+    last_file = max(int(r["FILE"]) for r in stub.payloads["satcat"])
+    satellite.update(
+        NORAD_CAT_ID="99999",
+        SATNAME="NEW SAT",
+        OBJECT_NAME="NEW SAT",
+        INTLDES="24999A",
+        FILE=str(last_file + 1),
+    )
+    stub.payloads["satcat"].append(satellite)
+
+    tle = copy.deepcopy(stub.payloads["tle_latest"][-1])
+    last_file = max(int(r["FILE"]) for r in stub.payloads["tle_latest"])
+    last_epoch = max(r["EPOCH"] for r in stub.payloads["tle_latest"])
+    tle.update(
+        NORAD_CAT_ID="99999",
+        OBJECT_NAME="NEW SAT",
+        FILE=str(last_file + 1),
+        EPOCH=last_epoch[:11] + "23:59:59",
+    )
+    stub.payloads["tle_latest"].append(tle)
+
+
+def test_first_sync_is_full(db, stub):
+    sync()
+
+    assert counts(db)["satellites"] == len(stub.payloads["satcat"])
+    assert counts(db)["tles"] == len(stub.payloads["tle_latest"])
+    assert counts(db)["rfs"] == len(stub.payloads["transmitters"])
+
+    # A full pull is split into NORAD id ranges with no cursor predicate.
+    assert all("NORAD_CAT_ID/" in path for path in queries(stub, "tle_latest"))
+    assert not any("/FILE/" in path for path in queries(stub, "tle_latest"))
+
+    for source in (cursors.SATCAT, cursors.TLE_LATEST, cursors.SATNOGS_TRANSMITTERS):
+        assert cursor(db, source).last_full_sync is not None
+    assert cursor(db, cursors.SATCAT).last_file == max(
+        int(r["FILE"]) for r in stub.payloads["satcat"]
+    )
+    assert cursor(db, cursors.TLE_LATEST).last_file == max(
+        int(r["FILE"]) for r in stub.payloads["tle_latest"]
+    )
+
+
+def test_delta_sync_fetches_only_past_the_cursor(db, stub):
+    sync()
+    satcat_file = cursor(db, cursors.SATCAT).last_file
+    tle_file = cursor(db, cursors.TLE_LATEST).last_file
+    before = counts(db)
+
+    add_records(stub)
+    stub.clear()
+    sync()
+
+    assert queries(stub, "satcat") and all(
+        f"/FILE/%3E{satcat_file}/" in path for path in queries(stub, "satcat")
+    )
+    assert queries(stub, "tle_latest") and all(
+        f"/FILE/%3E{tle_file}/" in path for path in queries(stub, "tle_latest")
+    )
+
+    after = counts(db)
+    assert after["satellites"] == before["satellites"] + 1
+    assert after["tles"] == before["tles"] + 1
+    assert (
+        db.scalar(
+            select(CurrentTLE.object_name).where(CurrentTLE.norad_cat_id == 99999)
+        )
+        == "NEW SAT"
+    )
+    assert cursor(db, cursors.SATCAT).last_file == satcat_file + 1
+    assert cursor(db, cursors.TLE_LATEST).last_file == tle_file + 1
+
+
+def test_full_sync_resets_the_cursor(db, stub):
+    sync()
+    expected = cursor(db, cursors.TLE_LATEST).last_file
+
+    # A cursor that ran ahead of the source would hide every record from a
+    # delta sync; a full sync refetches everything and re-derives it.
+    ahead = cursor(db, cursors.TLE_LATEST)
+    ahead.last_file = expected + 1000
+    ahead.last_epoch = datetime(2100, 1, 1)
+    db.commit()
+
+    stub.clear()
+    sync(full=True)
+
+    assert all("/FILE/" not in path for path in queries(stub, "tle_latest"))
+    assert cursor(db, cursors.TLE_LATEST).last_file == expected
+    assert cursor(db, cursors.TLE_LATEST).last_epoch < datetime(2100, 1, 1)
+
+
+def test_second_run_writes_nothing_new(db, stub):
+    sync()
+    before = counts(db)
+    assert before["changes"] > 0
+
+    stub.clear()
+    sync()
+
+    assert counts(db) == before
+    # Space-Track returned nothing past the cursors.
+    assert queries(stub, "satcat") and queries(stub, "tle_latest")
+
+
+def test_repeated_full_sync_writes_nothing_new(db, stub):
+    sync()
+    before = counts(db)
+
+    sync(full=True)
+
+    assert counts(db) == before
+
+
+def test_delta_sync_updates_a_changed_transmitter(db, stub):
+    sync()
+    before = counts(db)
+
+    transmitter = stub.payloads["transmitters"][0]
+    transmitter.update(
+        description="Transmitter 0 (new mode)",
+        mode="GMSK",
+        updated="2024-02-01T00:00:00.000000Z",
+    )
+    stub.clear()
+    sync()
+
+    db.expire_all()
+    rf = db.scalar(select(RF).where(RF.uuid == transmitter["uuid"]))
+    assert (rf.description, rf.mode) == ("Transmitter 0 (new mode)", "GMSK")
+    assert rf.updated == datetime(2024, 2, 1)
+    assert cursor(db, cursors.SATNOGS_TRANSMITTERS).last_updated == datetime(2024, 2, 1)
+
+    after = counts(db)
+    assert after["rfs"] == before["rfs"]
+    assert after["changes"] == before["changes"] + 1
+    assert db.scalar(
+        select(Change.norad_cat_id).order_by(Change.id.desc()).limit(1)
+    ) == int(transmitter["norad_cat_id"])